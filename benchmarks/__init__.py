@@ -0,0 +1,7 @@
+"""
+Benchmarks for the virus simulation.
+
+Each benchmark is a script which is run from the repository root, e.g.
+
+    python -m benchmarks.bench_startup
+"""
@@ -0,0 +1,148 @@
+"""
+Compares collision detection for people who are all the same size and for
+people whose sizes vary.
+
+Usage:
+    python -m benchmarks.bench_collision [--people N] [--repeat N]
+
+People are spread at the same density as the graphical simulation and each
+benchmark reports the best of several runs:
+
+    uniform infections   World.update_infections_fast with everyone the
+                         default size, as it was before people had their own
+                         attributes vs now, which works from the hour's
+                         contact pairs so no contact is missed
+    <distribution>       EfficientCollision(28) vs the collision table a
+                         world picks for radii drawn from the distribution,
+                         which is a MultiLevelGrid if anyone is more than
+                         twice the median size, both finding every pair of
+                         people in contact
+"""
+
+import argparse
+import random
+import timeit
+
+from virus_sim import Distribution, EfficientCollision, World
+
+# People per square pixel in the default graphical world (200 people in
+# 700 x 500 pixels)
+DENSITY = 200 / (700 * 500)
+
+# Radius distributions with the same median as the default radius of 7
+DISTRIBUTIONS = {
+    'uniform 4-10': Distribution.uniform(4, 10),
+    'normal sd 3': Distribution.normal(7, 3, low=1),
+    'lognormal': Distribution.lognormal(1.95, 0.6),
+    'children/adults': Distribution.choice([4, 7], [1, 3]),
+    'few giants': Distribution.choice([7, 100], [500, 1]),
+    'tiny': Distribution.uniform(0.5, 2),
+    'big': Distribution.uniform(20, 40),
+}
+
+
+def make_world(n, radius=7, seed=0):
+    """Returns a seeded world with n people at the default density, some of
+    whom are infected.
+    """
+    random.seed(seed)
+    side = int((n / DENSITY)**0.5) // 2 * 2
+    world = World(side, side, n, attributes={'radius': radius})
+    for _ in range(n // 20):
+        world.infect_person()
+    return world
+
+
+def update_infections_before(world):
+    """World.update_infections_fast as it was before people had their own
+    sizes and susceptibility, which looked up the collision table for each
+    infected person. That method no longer exists, so this calls the
+    collision table and Person methods it was made of, none of which have
+    changed.
+    """
+    table = world.collision_table
+    table.update(world.people)
+    to_infect = {}
+    for infected in (p for p in world.people if p.is_infected()):
+        viruses = [v.__class__ for v in infected.viruses]
+        for person in infected.collision_list(table.nearby(infected)):
+            if person in to_infect:
+                to_infect[person].update(viruses)
+            else:
+                to_infect[person] = set(viruses)
+    for person, viruses in to_infect.items():
+        if not person.resists_infection():
+            for virus in viruses:
+                virus().infect(person)
+
+
+def update_infections_after(world):
+    """World.update_infections_fast as it is now."""
+    world.update_infections_fast()
+
+
+def infected(update, n):
+    """Returns the indices of the people infected in a new world of n people
+    after the given update.
+    """
+    world = make_world(n)
+    update(world)
+    return {i for i, person in enumerate(world.people) if person.viruses}
+
+
+def best(before, after, *args, repeat=5, setup=None):
+    """Returns the fastest of several runs of each of the given functions in
+    ms, alternating between them so both see the same machine load. If a
+    setup function is given, it's called before each run to make the
+    arguments.
+    """
+    times = ([], [])
+    for _ in range(repeat):
+        for function, runs in zip((before, after), times):
+            if setup is not None:
+                args = setup()
+            runs.append(timeit.timeit(lambda: function(*args), number=1))
+    return min(times[0]) * 1000, min(times[1]) * 1000
+
+
+def main():
+    """Runs each benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--people', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{args.people} people')
+    print(f'{"benchmark":<20} {"before":>10} {"after":>10} {"speedup":>8}')
+
+    assert isinstance(make_world(args.people).collision_table,
+                      EfficientCollision)
+    # Only the cell containing each infected person's location used to be
+    # looked in, which missed some contacts in neighbouring cells
+    assert infected(update_infections_before, args.people) <= \
+        infected(update_infections_after, args.people)
+
+    def new_world():
+        """Infecting people changes the world, so each run gets a new one."""
+        return (make_world(args.people),)
+
+    before, after = best(update_infections_before, update_infections_after,
+                         repeat=args.repeat, setup=new_world)
+    print(f'{"uniform infections":<20} {before:>8.1f}ms {after:>8.1f}ms '
+          f'{before / after:>7.2f}x')
+
+    for name, radius in DISTRIBUTIONS.items():
+        world = make_world(args.people, radius)
+        table = world.collision_table
+        uniform = EfficientCollision(28)
+        assert uniform.contact_pairs(world.people) == \
+            table.contact_pairs(world.people)
+
+        before, after = best(uniform.contact_pairs, table.contact_pairs,
+                             world.people, repeat=args.repeat)
+        print(f'{name:<20} {before:>8.1f}ms {after:>8.1f}ms '
+              f'{before / after:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares running many replicate worlds one after another against running
+them together in an Ensemble.
+
+Usage:
+    python -m benchmarks.bench_ensemble [--replicates 100 1000] [--hours N]
+
+Each replicate is the default graphical world (200 people in 700 x 500
+pixels) with a few people infected and the batchable default viruses, which
+are the ones an Ensemble can simulate, and each benchmark reports replicate
+hours simulated per second:
+
+    worlds     a World per replicate simulated in turn, timed for a few
+               replicates and assumed to scale linearly
+    ensemble   every replicate in one Ensemble
+"""
+
+import argparse
+import random
+import time
+
+from virus_ensemble import Ensemble
+from virus_sim import RainbowVirus, ZebraVirus, ImmunisableVirus, World
+
+PEOPLE = 200
+SIZE = (700, 500)
+INFECTIONS = 5
+VIRUSES = [RainbowVirus, ZebraVirus, ImmunisableVirus]
+
+# Worlds are simulated one at a time, so timing a few is enough
+WORLDS = 10
+
+
+def time_worlds(hours):
+    """Returns the replicate hours per second of simulating separate worlds.
+    """
+    elapsed = 0
+    for seed in range(WORLDS):
+        random.seed(seed)
+        world = World(*SIZE, PEOPLE, VIRUSES)
+        for _ in range(INFECTIONS):
+            world.infect_person()
+        start = time.perf_counter()
+        for _ in range(hours):
+            world.simulate()
+        elapsed += time.perf_counter() - start
+    return WORLDS * hours / elapsed
+
+
+def time_ensemble(replicates, hours):
+    """Returns the replicate hours per second of simulating an ensemble."""
+    ensemble = Ensemble(*SIZE, PEOPLE, replicates, VIRUSES)
+    for _ in range(INFECTIONS):
+        ensemble.infect_person()
+    start = time.perf_counter()
+    ensemble.simulate(hours)
+    return replicates * hours / (time.perf_counter() - start)
+
+
+def main():
+    """Runs each benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--replicates', type=int, nargs='+',
+                        default=[100, 1000])
+    parser.add_argument('--hours', type=int, default=100)
+    args = parser.parse_args()
+
+    worlds = time_worlds(args.hours)
+    print(f'{args.hours} hours of {PEOPLE} people')
+    print(f'{"replicates":>10} {"worlds":>12} {"ensemble":>12} '
+          f'{"speedup":>8}')
+    for replicates in args.replicates:
+        ensemble = time_ensemble(replicates, args.hours)
+        print(f'{replicates:>10} {worlds:>10.0f}/s {ensemble:>10.0f}/s '
+              f'{ensemble / worlds:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Compares the geometry in the simulation's hot paths against the square root
+based versions it replaced.
+
+Usage:
+    python -m benchmarks.bench_geometry [--sizes 10000 100000] [--repeat N]
+
+For each population size, people are spread at the same density as the
+graphical simulation and each benchmark reports the best of several runs:
+
+    collision check   distance_2d(a, b) <= reach vs within_2d(a, b, reach)
+                      over every pair of people sharing a collision cell
+    move + reached    moving everyone an hour and checking if they reached
+                      their destination, working out the distance to the
+                      destination twice vs reusing it from the move
+    contact pairs     EfficientCollision.contact_pairs vs the batched NumPy
+                      virus_geometry.contact_pairs (skipped without NumPy)
+"""
+
+import argparse
+import random
+import timeit
+
+from virus_sim import World, distance_2d, within_2d
+
+# People per square pixel in the default graphical world (200 people in
+# 700 x 500 pixels)
+DENSITY = 200 / (700 * 500)
+
+
+def make_world(n):
+    """Returns a seeded world with n people at the default density."""
+    random.seed(n)
+    side = int((n / DENSITY)**0.5) // 2 * 2
+    return World(side, side, n, viruses=[])
+
+
+def candidate_pairs(world):
+    """Returns a list of every pair of people sharing a collision cell."""
+    world.collision_table.update(world.people)
+    pairs = []
+    for people in world.collision_table.cells.values():
+        for i, person in enumerate(people):
+            pairs.extend((person, other) for other in people[i + 1:])
+    return pairs
+
+
+def collides_sqrt(pairs):
+    """Checks each pair for contact by comparing distances."""
+    return sum(
+        distance_2d(a.location, b.location) <= a.radius + b.radius
+        for a, b in pairs)
+
+
+def collides_squared(pairs):
+    """Checks each pair for contact by comparing squared distances."""
+    return sum(
+        within_2d(a.location, b.location, a.radius + b.radius)
+        for a, b in pairs)
+
+
+def move_sqrt(person):
+    """Person.move as it was before, which takes the distance to the
+    destination with a square root.
+    """
+    distance = distance_2d(person.location, person.destination)
+    if distance == 0:
+        return
+    half_radius = person.radius / 2
+    step = half_radius / distance if distance > half_radius else 1
+    x, y = person.location
+    dest_x, dest_y = person.destination
+    person.location = (x + (dest_x - x) * step, y + (dest_y - y) * step)
+
+
+def reached_destination_sqrt(person):
+    """Person.reached_destination as it was before, which takes the distance
+    to the destination again.
+    """
+    return distance_2d(person.location, person.destination) <= person.radius
+
+
+def update_sqrt(people):
+    """Moves everyone like Person.update did before."""
+    for person in people:
+        move_sqrt(person)
+        if reached_destination_sqrt(person):
+            person.destination = person._get_random_location()
+
+
+def update_squared(people):
+    """Moves everyone like Person.update does now."""
+    for person in people:
+        person.move()
+        if person.reached_destination():
+            person.destination = person._get_random_location()
+
+
+def best(function, *args, repeat=5):
+    """Returns the fastest of several runs of the given function in ms."""
+    return min(timeit.repeat(lambda: function(*args), number=1,
+                             repeat=repeat)) * 1000
+
+
+def main():
+    """Runs each benchmark for each population size."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        import numpy
+        from virus_geometry import contact_pairs
+    except ImportError:
+        numpy = None
+
+    print(f'{"people":>8}  {"benchmark":<16} {"before":>10} {"after":>10} '
+          f'{"speedup":>8}')
+
+    for n in args.sizes:
+        world = make_world(n)
+        results = []
+
+        pairs = candidate_pairs(world)
+        assert collides_sqrt(pairs) == collides_squared(pairs)
+        results.append(('collision check',
+                        best(collides_sqrt, pairs, repeat=args.repeat),
+                        best(collides_squared, pairs, repeat=args.repeat)))
+
+        results.append(('move + reached',
+                        best(update_sqrt, world.people, repeat=args.repeat),
+                        best(update_squared, world.people, repeat=args.repeat)))
+
+        if numpy is not None:
+            table = world.collision_table
+            locations = numpy.array([p.location for p in world.people])
+            radii = numpy.array([p.radius for p in world.people])
+            results.append(('contact pairs',
+                            best(table.contact_pairs, world.people,
+                                 repeat=args.repeat),
+                            best(contact_pairs, locations, radii,
+                                 repeat=args.repeat)))
+
+        for name, before, after in results:
+            print(f'{n:>8}  {name:<16} {before:>8.1f}ms {after:>8.1f}ms '
+                  f'{before / after:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Measures how much memory a World costs as its population grows.
+
+Usage:
+    python -m benchmarks.bench_memory [--sizes 1000 ... 1000000] [--hours N]
+                                      [--report]
+
+Each population size is measured in a new interpreter, so that one size's
+peak doesn't hide the next. People are spread at the same density as the
+graphical simulation with 5% of them infected, and the world is simulated
+for a few hours so its cached contacts and virus state fill up. For each
+size this reports:
+
+    peak RSS        the process' peak resident set size
+    RSS/person      growth of the peak RSS from before the world was made,
+                    per person
+    counted/person  bytes per person counted by virus_memory.memory_report,
+                    the rest being allocator and interpreter overhead
+    top subsystem   the subsystem using the most memory
+
+--report also prints each size's full breakdown by subsystem.
+
+Peak RSS comes from resource.getrusage, so this needs a Unix-like system.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Builds and simulates a world of the given size and prints the peak RSS in
+# kilobytes before and after, followed by its memory report, as JSON
+PROBE = """
+import json, random, resource
+from virus_memory import memory_report
+from virus_sim import World
+
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+random.seed(0)
+n = {n}
+side = int((n / {density})**0.5) // 2 * 2
+world = World(side, side, n)
+for _ in range(n // 20):
+    world.infect_person()
+for _ in range({hours}):
+    world.simulate()
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps([before, after, memory_report(world)]))
+"""
+
+# People per square pixel in the default graphical world (200 people in
+# 700 x 500 pixels)
+DENSITY = 200 / (700 * 500)
+
+
+def measure(n, hours):
+    """Returns the peak RSS in bytes before and after making and simulating a
+    world of n people in a new interpreter, and the world's memory report.
+    """
+    output = subprocess.run([sys.executable, '-c',
+                             PROBE.format(n=n, density=DENSITY,
+                                          hours=hours)],
+                            cwd=ROOT,
+                            capture_output=True,
+                            text=True,
+                            check=True).stdout
+    before, after, report = json.loads(output)
+    return before * 1024, after * 1024, report
+
+
+def main():
+    """Measures each population size."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--hours', type=int, default=2)
+    parser.add_argument('--report', action='store_true',
+                        help='print the breakdown by subsystem for each size')
+    args = parser.parse_args()
+
+    from virus_memory import format_report
+
+    print(f'{"people":>9} {"peak RSS":>10} {"RSS/person":>11} '
+          f'{"counted/person":>15}  top subsystem')
+    reports = []
+    for n in args.sizes:
+        before, after, report = measure(n, args.hours)
+        top = max(report, key=report.get)
+        share = report[top] / sum(report.values()) * 100
+        print(f'{n:>9} {after / 2**20:>8.1f}MB {(after - before) / n:>11.0f} '
+              f'{sum(report.values()) / n:>15.0f}  {top} ({share:.0f}%)')
+        reports.append((n, report))
+
+    if args.report:
+        for n, report in reports:
+            print(f'\n{n} people')
+            print(format_report(report, n))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Compares people moving themselves against a World using the RandomWaypoint
+movement model, which moves them the same way.
+
+Usage:
+    python -m benchmarks.bench_movement [--sizes 10000 50000 100000]
+                                        [--repeat N]
+
+For each population size, people are spread at the same density as the
+graphical simulation and each benchmark reports the best of several runs:
+
+    movement   moving everyone for an hour and progressing their viruses,
+               the part of World.simulate a movement model replaces
+    hour       a whole World.simulate, including finding infections
+
+The update column is people moving themselves as Person.update does, and
+the model column is RandomWaypoint.
+"""
+
+import argparse
+import random
+import timeit
+
+from virus_movement import RandomWaypoint
+from virus_sim import World
+
+# People per square pixel in the default graphical world (200 people in
+# 700 x 500 pixels)
+DENSITY = 200 / (700 * 500)
+
+
+def make_world(n, movement=None):
+    """Returns a seeded world with n people at the default density, 5% of
+    whom are infected.
+    """
+    random.seed(n)
+    side = int((n / DENSITY)**0.5) // 2 * 2
+    world = World(side, side, n, movement=movement)
+    for _ in range(n // 20):
+        world.infect_person()
+    return world
+
+
+def move_people(world):
+    """The movement stage of World.simulate without a movement model."""
+    world.hours += 1
+    for person in world.people:
+        person.move()
+        if person.reached_destination():
+            person.destination = person._get_random_location()
+    world.progress_illnesses()
+
+
+def move_model(world):
+    """The movement stage of World.simulate with a movement model."""
+    world.hours += 1
+    world.movement.move(world)
+    world.progress_illnesses()
+
+
+def best(before, after, repeat=5):
+    """Returns the fastest of several runs of each of the given functions in
+    ms, alternating between them so both see the same machine load.
+    """
+    times = ([], [])
+    for _ in range(repeat):
+        for function, runs in zip((before, after), times):
+            runs.append(timeit.timeit(function, number=1) * 1000)
+    return min(times[0]), min(times[1])
+
+
+def main():
+    """Runs each benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10000, 50000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"people":>8} {"benchmark":<10} {"update":>10} {"model":>10} '
+          f'{"speedup":>8}')
+    for n in args.sizes:
+        people = make_world(n)
+        model = make_world(n, RandomWaypoint(seed=n))
+        for name, before, after in (
+                ('movement', lambda: move_people(people),
+                 lambda: move_model(model)),
+                ('hour', people.simulate, model.simulate)):
+            before, after = best(before, after, args.repeat)
+            print(f'{n:>8} {name:<10} {before:>8.1f}ms {after:>8.1f}ms '
+                  f'{before / after:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
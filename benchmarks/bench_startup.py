@@ -0,0 +1,78 @@
+"""
+Measures how long it takes to import the simulation core in a fresh
+interpreter and checks it stays within a budget without loading turtle.
+
+Usage:
+    python -m benchmarks.bench_startup [--budget MS] [--repeat N]
+
+Exits with a non-zero status if the median import time is over budget or if
+importing the core loads a GUI module.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports the module and prints the import time in seconds followed by any GUI
+# modules that were loaded as a result
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+gui = [m for m in ('turtle', 'tkinter', '_tkinter') if m in sys.modules]
+print(elapsed, *gui)
+"""
+
+
+def time_import(module, repeat):
+    """Returns a tuple of the import times of the given module in seconds,
+    each measured in a new interpreter, and the GUI modules it loaded.
+    """
+    times = []
+    gui = set()
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c',
+                                 PROBE.format(module=module)],
+                                cwd=ROOT,
+                                capture_output=True,
+                                text=True,
+                                check=True).stdout.split()
+        times.append(float(output[0]))
+        gui.update(output[1:])
+    return times, gui
+
+
+def main():
+    """Times the import of the core and the graphical entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--budget', type=float, default=50,
+                        help='maximum median import time of the core in ms')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    failed = False
+    for module, budget in (('virus_sim', args.budget), ('VIRUS_PART_A', None)):
+        times, gui = time_import(module, args.repeat)
+        median = statistics.median(times) * 1000
+        print(f'{module:<14} median {median:7.2f} ms  '
+              f'min {min(times) * 1000:7.2f} ms  '
+              f'gui: {", ".join(sorted(gui)) or "none"}')
+
+        if budget is not None:
+            if median > budget:
+                print(f'  over budget of {budget} ms')
+                failed = True
+            if gui:
+                print('  the core must not load GUI modules')
+                failed = True
+
+    sys.exit(failed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+"""
+Lets the tests in tests/ import the simulation modules from the repository
+root when run with pytest.
+"""
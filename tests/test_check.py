@@ -0,0 +1,15 @@
+"""Runs every check in virus_check with its default seeds and hours, which
+are enough for the statistical checks to pass well clear of their
+significance level.
+"""
+
+import pytest
+
+from virus_check import CHECKS, HOURS, SEEDS, check_seeds
+
+
+@pytest.mark.parametrize('name', CHECKS)
+def test_check(name):
+    function, kind = CHECKS[name]
+    passed, detail = function(check_seeds(kind, SEEDS), HOURS)
+    assert passed, detail
@@ -0,0 +1,54 @@
+"""Tests for the collision tables in virus_sim."""
+
+import random
+
+import pytest
+
+from virus_sim import (Distribution, EfficientCollision, MultiLevelGrid,
+                       World)
+
+
+def brute_force(people):
+    """Returns a set of the (i, j) pairs, i < j, of people in contact, found
+    by checking every pair.
+    """
+    return {(i, j)
+            for i, a in enumerate(people)
+            for j in range(i + 1, len(people))
+            if a.collides(people[j])}
+
+
+@pytest.mark.parametrize('radius', [
+    7,
+    Distribution.uniform(3, 12),
+    Distribution.choice([4, 7, 40], [3, 6, 1]),
+])
+def test_contact_pairs_match_brute_force(radius):
+    random.seed(0)
+    world = World(600, 400, 400, attributes={'radius': radius})
+    people = world.people
+    radii = [person.radius for person in people]
+    expected = brute_force(people)
+
+    tables = [
+        world.collision_table,
+        # Cells wide enough to put each person in one cell
+        EfficientCollision(2 * max(radii)),
+        # Cells too narrow, so people go in every cell they overlap
+        EfficientCollision(min(radii)),
+        MultiLevelGrid(2 * min(radii)),
+    ]
+    for table in tables:
+        assert table.contact_pairs(people) == expected, table
+
+
+def test_world_picks_table_for_sizes():
+    random.seed(0)
+    assert isinstance(World(200, 200, 50).collision_table,
+                      EfficientCollision)
+    world = World(200, 200, 50,
+                  attributes={'radius': Distribution.choice([4, 7], [1, 3])})
+    assert isinstance(world.collision_table, EfficientCollision)
+    world = World(200, 200, 50,
+                  attributes={'radius': Distribution.choice([7, 40], [9, 1])})
+    assert isinstance(world.collision_table, MultiLevelGrid)
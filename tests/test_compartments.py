@@ -0,0 +1,145 @@
+"""Tests for virus_compartments."""
+
+import random
+
+import pytest
+
+from virus_compartments import (EXPOSED, INFECTIOUS, RECOVERED, SUSCEPTIBLE,
+                                Compartments, Parameters, mean_field)
+from virus_sim import ImmunisableVirus, Virus, World
+
+# The only pair in contact, between person 0 and person 1
+PAIR = ([0], [1])
+
+
+def states(model, virus=0):
+    """Returns a list of (compartment, timer) of each person in the given
+    model for the given virus.
+    """
+    return list(zip(model.state[virus].tolist(),
+                    model.timer[virus].tolist()))
+
+
+def test_seir_transitions():
+    model = Compartments(3, [Parameters(latency=2, duration=3)], seed=0)
+    model.infect([0])
+    assert states(model) == [(EXPOSED, 2), (SUSCEPTIBLE, 0),
+                             (SUSCEPTIBLE, 0)]
+
+    # Exposed people don't pass the virus on
+    model.step(*PAIR)
+    assert states(model)[:2] == [(EXPOSED, 1), (SUSCEPTIBLE, 0)]
+
+    # Until they become infectious, when their contact is exposed
+    model.step(*PAIR)
+    assert states(model)[:2] == [(INFECTIOUS, 3), (EXPOSED, 2)]
+
+    model.step()
+    model.step()
+    assert states(model)[:2] == [(INFECTIOUS, 1), (INFECTIOUS, 3)]
+
+    # Recovered for good, and nobody out of contact caught anything
+    model.step()
+    assert states(model) == [(RECOVERED, 0), (INFECTIOUS, 2),
+                             (SUSCEPTIBLE, 0)]
+    for _ in range(10):
+        model.step(*PAIR)
+    assert model.counts() == {'susceptible': 1, 'exposed': 0,
+                              'infectious': 0, 'recovered': 2}
+
+
+def test_sir_without_latency():
+    model = Compartments(2, [Parameters(duration=2)])
+    model.infect([0])
+    assert states(model) == [(INFECTIOUS, 2), (SUSCEPTIBLE, 0)]
+    model.step(*PAIR)
+    assert states(model) == [(INFECTIOUS, 1), (INFECTIOUS, 2)]
+
+
+def test_waning_immunity():
+    model = Compartments(1, [Parameters(duration=2, immunity=3)])
+    model.infect([0])
+    compartments = []
+    for _ in range(6):
+        model.step()
+        compartments.append(states(model)[0])
+    assert compartments == [(INFECTIOUS, 1), (RECOVERED, 3), (RECOVERED, 2),
+                            (RECOVERED, 1), (SUSCEPTIBLE, 0),
+                            (SUSCEPTIBLE, 0)]
+
+
+def test_no_immunity():
+    model = Compartments(1, [Parameters(duration=2, immunity=0)])
+    model.infect([0])
+    model.step()
+    model.step()
+    assert states(model) == [(SUSCEPTIBLE, 0)]
+
+
+def test_beta():
+    never = Compartments(2, [Parameters(beta=0)])
+    never.infect([0])
+    never.step(*PAIR)
+    assert never.counts()['infectious'] == 1
+
+    # Each susceptible person is caught with chance beta
+    n = 4000
+    model = Compartments(n + 1, [Parameters(beta=0.3, duration=None)],
+                         seed=0)
+    model.infect([0])
+    model.step([0] * n, list(range(1, n + 1)))
+    assert 0.27 < (model.counts()['infectious'] - 1) / n < 0.33
+
+
+def test_from_world():
+    random.seed(0)
+    world = World(300, 300, 10, [Virus, ImmunisableVirus])
+    infected, immune, both = world.people[:3]
+    infected.infect(Virus())
+    infected.viruses[0].remaining_duration = 4
+    ImmunisableVirus.immune.add(immune)
+    both.infect(ImmunisableVirus())
+
+    model = Compartments.from_world(
+        world, {Virus: Parameters(latency=5, duration=7, immunity=0)})
+    assert [p.duration for p in model.parameters] == [7, 28]
+    assert model.immunity.tolist() == [0, -1]
+
+    assert states(model, 0)[:3] == [(INFECTIOUS, 4), (SUSCEPTIBLE, 0),
+                                    (SUSCEPTIBLE, 0)]
+    assert states(model, 1)[:3] == [(SUSCEPTIBLE, 0), (RECOVERED, -1),
+                                    (INFECTIOUS, 28)]
+    assert model.counts(0)['susceptible'] == 9
+    assert model.counts(1) == {'susceptible': 8, 'exposed': 0,
+                               'infectious': 1, 'recovered': 1}
+
+    # Advanced with the world until detached
+    world.simulate()
+    world.simulate()
+    assert model.hours == 2
+    assert states(model, 0)[0] == (INFECTIOUS, 2)
+    model.detach()
+    world.simulate()
+    assert model.hours == 2
+
+
+@pytest.mark.parametrize('latency, duration, immunity', [
+    (0, 48, None),
+    (12, 48, None),
+    (12, 48, 0),
+    (12, 48, 100),
+    (0, None, None),
+])
+def test_mean_field_conserves_people(latency, duration, immunity):
+    initial = (990, 5, 5, 0)
+    solution = mean_field(500, initial, 0.3, latency, duration, immunity)
+    assert len(solution) == 501
+    assert solution[0] == initial
+    for counts in solution:
+        assert sum(counts) == pytest.approx(1000)
+        assert min(counts) > -1e-9
+
+
+def test_mean_field_without_immunity_keeps_nobody_recovered():
+    solution = mean_field(200, (990, 0, 10, 0), 0.3, 0, 24, immunity=0)
+    assert all(r == 0 for _, _, _, r in solution)
@@ -0,0 +1,82 @@
+"""Tests for virus_contacts."""
+
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from virus_contacts import ContactRecorder
+from virus_sim import World
+
+
+@pytest.fixture
+def recording():
+    """Returns a recorder of a small, crowded world after 20 hours and the
+    pairs in contact each hour.
+    """
+    random.seed(0)
+    world = World(200, 200, 40)
+    recorder = ContactRecorder(world)
+    recorder.attach()
+    hours = []
+    for _ in range(20):
+        world.simulate()
+        hours.append(set(world.contact_pairs()))
+    return recorder, hours
+
+
+def test_contacts_found_once_per_hour():
+    random.seed(0)
+    world = World(200, 200, 40)
+    for _ in range(5):
+        world.infect_person()
+    recorder = ContactRecorder(world)
+    recorder.attach()
+
+    table = world.collision_table
+    searches = []
+    contact_pairs = table.contact_pairs
+    table.contact_pairs = lambda people: searches.append(world.hours) or \
+        contact_pairs(people)
+
+    for _ in range(10):
+        world.simulate()
+    assert searches == list(range(1, 11))
+    assert {tuple(pair) for pair in recorder.pairs(10)} == \
+        world.contact_pairs()
+
+
+def test_graph_matches_pairs(recording):
+    recorder, hours = recording
+    counts = Counter()
+    for pairs in hours[5:15]:
+        for i, j in pairs:
+            counts[i, j] += 1
+            counts[j, i] += 1
+
+    indptr, indices, contact_hours = recorder.graph(6, 16)
+    found = {}
+    for person in range(recorder.n):
+        row = slice(indptr[person], indptr[person + 1])
+        assert (np.diff(indices[row]) > 0).all()
+        for other, count in zip(indices[row].tolist(),
+                                contact_hours[row].tolist()):
+            found[person, other] = count
+    assert found == dict(counts)
+
+
+def test_save_load_round_trip(recording, tmp_path):
+    recorder, hours = recording
+    path = tmp_path / 'contacts.npz'
+    recorder.save(path)
+    loaded = ContactRecorder.load(path)
+
+    assert (loaded.first_hour, loaded.hours, loaded.n) == \
+        (recorder.first_hour, recorder.hours, recorder.n)
+    for hour, pairs in enumerate(hours, 1):
+        assert {tuple(pair) for pair in loaded.pairs(hour).tolist()} == pairs
+    for expected, actual in zip(recorder.graph(), loaded.graph()):
+        assert (expected == actual).all()
+    with pytest.raises(IndexError):
+        loaded.pairs(len(hours) + 1)
@@ -0,0 +1,35 @@
+"""Tests for virus_ensemble."""
+
+from virus_ensemble import Ensemble
+from virus_tiles import TiledWorld
+
+SEEDS = [3, 7, 11]
+INFECTED = ((0, 0), (1, 2), (5, 1))
+
+
+def ensemble_states(seeds, hours):
+    """Returns the state of each replicate of a seeded ensemble after the
+    given number of hours.
+    """
+    ensemble = Ensemble(420, 280, 120, seeds=seeds)
+    for person, virus in INFECTED:
+        ensemble.infect(person, virus)
+    ensemble.simulate(hours)
+    return [ensemble.replicate(i) for i in range(len(seeds))]
+
+
+def test_replicates_match_tiled_worlds():
+    states = ensemble_states(SEEDS, 40)
+    for seed, state in zip(SEEDS, states):
+        with TiledWorld(420, 280, 120, tiles=(1, 1), seed=seed) as world:
+            for person, virus in INFECTED:
+                world.population.remaining[virus][person] = \
+                    world.config['durations'][virus]
+            world.simulate(40)
+            assert world.state() == state, seed
+
+
+def test_replicates_only_depend_on_their_seed():
+    together = ensemble_states(SEEDS, 20)
+    alone = [ensemble_states([seed], 20)[0] for seed in SEEDS]
+    assert together == alone
@@ -0,0 +1,53 @@
+"""Tests for virus_geometry."""
+
+import numpy as np
+import pytest
+
+from virus_geometry import contact_pairs
+
+
+def brute_force(locations, radii, groups=None):
+    """Returns a set of the (i, j) pairs, i < j, of touching circles found by
+    checking every pair.
+    """
+    n = len(locations)
+    pairs = set()
+    for i in range(n):
+        for j in range(i + 1, n):
+            if groups is not None and groups[i] != groups[j]:
+                continue
+            reach = radii[i] + radii[j]
+            if ((locations[i] - locations[j])**2).sum() <= reach * reach:
+                pairs.add((i, j))
+    return pairs
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_contact_pairs_match_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = 400
+    locations = rng.uniform(-300, 300, (n, 2))
+    radii = rng.uniform(1, 15, n)
+    groups = rng.integers(0, 3, n)
+
+    first, second = contact_pairs(locations, radii)
+    assert (first < second).all()
+    assert set(zip(first.tolist(), second.tolist())) == \
+        brute_force(locations, radii)
+
+    first, second = contact_pairs(locations, radii, groups)
+    assert set(zip(first.tolist(), second.tolist())) == \
+        brute_force(locations, radii, groups)
+
+
+def test_contact_pairs_touching_and_degenerate():
+    # Circles exactly touching are in contact
+    first, second = contact_pairs([(0.0, 0.0), (10.0, 0.0)], 5.0)
+    assert list(zip(first, second)) == [(0, 1)]
+
+    # Points with no radius only touch if they're in the same place
+    first, second = contact_pairs([(1.0, 1.0), (1.0, 1.0), (2.0, 1.0)], 0.0)
+    assert list(zip(first, second)) == [(0, 1)]
+
+    first, second = contact_pairs([(0.0, 0.0)], 5.0)
+    assert len(first) == len(second) == 0
@@ -0,0 +1,68 @@
+"""Tests for virus_memory."""
+
+import random
+from pathlib import Path
+
+from virus_contacts import ContactRecorder
+from virus_memory import format_report, memory_report
+from virus_movement import RandomWaypoint
+from virus_regions import Layout
+from virus_sim import World
+
+CATEGORIES = ['people', 'locations', 'viruses', 'collision table',
+              'contacts', 'virus classes', 'layout', 'engines',
+              'update hooks']
+
+
+def make_world(n, **kwargs):
+    """Returns a seeded world of n people, a tenth of them infected, after a
+    few hours.
+    """
+    random.seed(n)
+    world = World(700, 500, n, **kwargs)
+    for _ in range(n // 10):
+        world.infect_person()
+    for _ in range(3):
+        world.simulate()
+    return world
+
+
+def test_categories():
+    report = memory_report(make_world(100))
+    assert list(report) == CATEGORIES
+    for name in ('people', 'locations', 'viruses', 'collision table'):
+        assert report[name] > 0, name
+    # Nothing optional was given
+    assert report['layout'] == report['engines'] == 0
+    assert report['update hooks'] == 0
+
+
+def test_optional_subsystems():
+    layout = Layout.load(Path(__file__).parent.parent / 'layouts' /
+                         'office.txt')
+    world = make_world(100, movement=RandomWaypoint(seed=0), layout=layout)
+    ContactRecorder(world).attach()
+    world.simulate()
+    report = memory_report(world)
+    for name in ('layout', 'engines', 'update hooks'):
+        assert report[name] > 0, name
+
+
+def test_grows_with_population():
+    small = memory_report(make_world(100))
+    large = memory_report(make_world(1000))
+    # Per person costs stay about the same, so the total grows roughly
+    # tenfold
+    assert 5 < sum(large.values()) / sum(small.values()) < 15
+    for name in ('people', 'locations'):
+        assert large[name] > 9 * small[name], name
+
+
+def test_format_report():
+    report = memory_report(make_world(100))
+    lines = format_report(report, 100).splitlines()
+    assert lines[0].split() == ['subsystem', 'bytes', 'share', 'per',
+                                'person']
+    assert [line[:16].strip() for line in lines[1:]] == CATEGORIES + ['total']
+    total = sum(report.values())
+    assert lines[-1].split()[1:3] == [f'{total:,}', '100.0%']
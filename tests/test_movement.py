@@ -0,0 +1,28 @@
+"""Tests for virus_movement."""
+
+import random
+
+import numpy as np
+
+from virus_movement import RandomWaypoint
+from virus_sim import World
+
+
+def test_arrays_follow_people():
+    random.seed(0)
+    world = World(200, 200, 20, movement=RandomWaypoint(seed=0))
+    world.simulate()
+
+    # Destinations given outside of the model, like a ZombieVirus does,
+    # are picked up the next hour
+    person = world.people[3]
+    person.destination = (150.0, 150.0)
+    world.movement.move(world)
+    assert np.allclose(world.arrays.destinations[3], (150.0, 150.0))
+
+    for _ in range(5):
+        world.simulate()
+    assert world.arrays.locations.tolist() == [
+        list(person.location) for person in world.people]
+    assert world.arrays.destinations.tolist() == [
+        list(person.destination) for person in world.people]
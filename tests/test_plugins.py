@@ -0,0 +1,78 @@
+"""Tests for virus capabilities and how World uses them."""
+
+import random
+
+import pytest
+
+from virus_plugins import batch_parameters
+from virus_sim import (World, Virus, RainbowVirus, ZebraVirus,
+                       ImmunisableVirus, ZombieVirus, SnakeVirus)
+
+VIRUSES = [Virus, RainbowVirus, ZebraVirus, ImmunisableVirus, ZombieVirus,
+           SnakeVirus]
+
+
+def run(batched):
+    """Returns everyone's viruses each hour in a seeded world, with its
+    batchable viruses counted down together or through their own methods.
+    """
+    random.seed(0)
+    world = World(300, 300, 60, VIRUSES)
+    if not batched:
+        world.batched = frozenset()
+    for _ in range(10):
+        world.infect_person()
+
+    states = []
+    for _ in range(40):
+        world.simulate()
+        states.append([[(type(virus), virus.remaining_duration)
+                        for virus in person.viruses]
+                       for person in world.people])
+    return states
+
+
+def test_batched_classes():
+    world = World(100, 100, 1, VIRUSES)
+    assert world.batched == {Virus, RainbowVirus, ZebraVirus,
+                             ImmunisableVirus}
+
+
+def test_batched_matches_instances():
+    assert run(batched=True) == run(batched=False)
+
+
+class FastVirus(Virus):
+    """A virus which inherits STATELESS_DURATION but counts down faster."""
+
+    def progress(self):
+        self.remaining_duration = max(self.remaining_duration - 3, 0)
+
+
+class CuredEarlyVirus(Virus):
+    """A virus which inherits STATELESS_DURATION but is cured early."""
+
+    def is_cured(self):
+        return self.remaining_duration <= 4
+
+
+def test_overriding_subclass_not_batched():
+    assert not FastVirus.is_batchable()
+    assert not CuredEarlyVirus.is_batchable()
+    world = World(100, 100, 1, [Virus, FastVirus, CuredEarlyVirus])
+    assert world.batched == {Virus}
+    with pytest.raises(ValueError):
+        batch_parameters([FastVirus])
+
+
+@pytest.mark.parametrize('cls, hours', [(FastVirus, 3), (CuredEarlyVirus, 3)])
+def test_overriding_subclass_uses_own_methods(cls, hours):
+    world = World(100, 100, 1, [cls])
+    person = world.people[0]
+    virus = cls()
+    person.infect(virus)
+    for _ in range(hours - 1):
+        world.progress_illnesses()
+    assert virus in person.viruses
+    world.progress_illnesses()
+    assert virus not in person.viruses
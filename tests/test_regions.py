@@ -0,0 +1,148 @@
+"""Tests for virus_regions."""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from virus_regions import Layout, Region
+from virus_sim import Virus, World
+
+OFFICE = Path(__file__).parent.parent / 'layouts' / 'office.txt'
+
+TEXT = """
+# Two rooms joined by a doorway
+size 200 100
+
+wall 0 -50 0 -10
+wall 0 10 0 50
+obstacle 50 -20 70 20
+
+region left -100 -50 0 50
+region right 0 -50 100 50 2
+region corner 80 30 100 50 0.5
+"""
+
+
+@pytest.fixture
+def layout():
+    return Layout.parse(TEXT)
+
+
+def test_parse(layout):
+    assert layout.size == (200, 100)
+    assert layout.walls == [(0, -50, 0, -10), (0, 10, 0, 50)]
+    assert layout.obstacles == [(50, -20, 70, 20)]
+    assert [region.name for region in layout.regions] == \
+        ['left', 'right', 'corner']
+    assert [region.multiplier for region in layout.regions] == [1, 2, 0.5]
+
+
+@pytest.mark.parametrize('text', [
+    'wall 0 0 1 1',
+    'size 200 100\nwall 0 0 1',
+    'size 200 100\nregion name 0 0 1',
+    'size 200 100\ndoor 0 0 1 1',
+    'size 200 100\nobstacle 0 0 1 one',
+])
+def test_parse_invalid(text):
+    with pytest.raises(ValueError):
+        Layout.parse(text)
+
+
+def test_region_at(layout):
+    assert layout.region_at((-50, 0)).name == 'left'
+    assert layout.region_at((50, 0)).name == 'right'
+    # Later regions take priority over the ones they overlap
+    assert layout.region_at((90, 40)).name == 'corner'
+    assert layout.region_at((150, 0)) is None
+
+
+def test_multiplier_at(layout):
+    assert layout.multiplier_at((-50, 0)) == 1
+    assert layout.multiplier_at((50, 0)) == 2
+    assert layout.multiplier_at((90, 40)) == 0.5
+    assert layout.multiplier_at((150, 0)) == 1
+
+    # Relative to the largest multiplier, which is 2
+    assert layout.max_multiplier == 2
+    assert layout.relative_multiplier_at((-50, 0)) == 0.5
+    assert layout.relative_multiplier_at((50, 0)) == 1
+    assert layout.relative_multiplier_at((90, 40)) == 0.25
+
+
+def test_relative_multiplier_without_raised_regions():
+    layout = Layout(200, 100, regions=[Region('quiet', 0, 0, 50, 50, 0.5)])
+    assert layout.max_multiplier == 1
+    assert layout.relative_multiplier_at((10, 10)) == 0.5
+    assert layout.relative_multiplier_at((-10, -10)) == 1
+
+
+def test_blocks(layout):
+    # Through a wall, and through the doorway between them
+    assert layout.blocks((-5, 30), (5, 30))
+    assert not layout.blocks((-5, 0), (5, 0))
+    # Into an obstacle, and alongside it
+    assert layout.blocks((45, 0), (55, 0))
+    assert not layout.blocks((45, 30), (55, 30))
+    # Out of the world
+    assert layout.blocks((95, 0), (105, 0))
+    # Someone too wide to stand next to the wall
+    assert layout.blocks((-20, 30), (-3, 30), radius=5)
+
+
+def test_is_free(layout):
+    assert layout.is_free((-50, 0), radius=5)
+    assert not layout.is_free((60, 0))
+    assert not layout.is_free((45, 0), radius=6)
+    assert not layout.is_free((2, 30), radius=3)
+    assert not layout.is_free((-98, 0), radius=5)
+
+
+def test_random_location(layout):
+    random.seed(0)
+    for _ in range(500):
+        point = layout.random_location(radius=4)
+        assert layout.is_free(point, radius=4)
+
+
+def test_random_location_without_space():
+    layout = Layout(100, 100, obstacles=[(-50, -50, 50, 50)])
+    with pytest.raises(ValueError):
+        layout.random_location()
+
+
+def caught(layout, location, hours=2000):
+    """Returns how many hours out of the given number someone standing at
+    the given location next to an infected person catches their virus.
+    """
+    random.seed(0)
+    world = World(*layout.size, 2, viruses=[Virus], layout=layout)
+    infected, person = world.people
+    infected.location = person.location = location
+    infected.infect(Virus())
+
+    count = 0
+    for _ in range(hours):
+        world.hours += 1
+        person.viruses.clear()
+        world.update_infections_fast()
+        count += person.is_infected()
+    return count
+
+
+def test_multiplier_raises_infections(layout):
+    left = caught(layout, (-50, 0))
+    right = caught(layout, (30, 0))
+    assert 0.45 < left / 2000 < 0.55
+    assert right == 2000
+
+
+def test_office_regions_raise_infections():
+    layout = Layout.load(OFFICE)
+    hall = caught(layout, (0, -200))
+    office = caught(layout, (-200, 0))
+    kitchen = caught(layout, (300, 200))
+    assert hall < office < kitchen
+    assert 1.3 < office / hall < 1.7
+    assert kitchen == 2000
@@ -0,0 +1,132 @@
+"""Tests for the command protocol of virus_server."""
+
+import asyncio
+import json
+import random
+
+from virus_server import SimulationRunner
+from virus_sim import Virus
+from virus_stop import Extinct
+
+
+def session(runner, lines, replies=None, run=False):
+    """Connects to the given runner over a loopback socket, sends it each of
+    the given lines and returns its replies, one per line unless replies
+    says how many to read. The simulation runs in the background if run is
+    True.
+    """
+
+    async def talk():
+        server = await asyncio.start_server(runner.handle_client,
+                                            '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        task = asyncio.ensure_future(runner.run()) if run else None
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            for line in lines:
+                writer.write(line.encode() + b'\n')
+            await writer.drain()
+            count = len(lines) if replies is None else replies
+            return [json.loads(await asyncio.wait_for(reader.readline(), 5))
+                    for _ in range(count)]
+        finally:
+            writer.close()
+            if task is not None:
+                task.cancel()
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(talk())
+
+
+def make_runner(**kwargs):
+    random.seed(0)
+    return SimulationRunner(200, 200, 20, [Virus], **kwargs)
+
+
+def test_status():
+    runner = make_runner()
+    (status,) = session(runner, ['status'])
+    assert status == {'hours': 0, 'people': 20, 'infected': 0,
+                      'viruses': {'Virus': 0}, 'running': False,
+                      'stopped': None}
+
+
+def test_infect_and_cure():
+    runner = make_runner()
+    infected, again, cured = session(runner, ['infect 3', 'infect', 'cure'])
+    assert 1 <= infected['infected'] <= 3
+    assert infected['infected'] <= again['infected'] <= 4
+    assert again['viruses']['Virus'] == again['infected']
+    assert cured['infected'] == 0
+
+
+def test_pause_and_resume():
+    runner = make_runner()
+    resumed, paused = session(runner, ['resume', 'pause'])
+    assert resumed['running']
+    assert not paused['running']
+    assert not runner.running
+
+
+def test_speed():
+    runner = make_runner()
+    (reply,) = session(runner, ['speed 4'])
+    assert 'error' not in reply
+    assert (runner.speed, runner.delay) == (4, 0.25)
+
+    session(runner, ['speed 0'])
+    assert (runner.speed, runner.delay) == (0, 0)
+
+
+def test_reset():
+    runner = make_runner()
+    world = runner.world
+    (reply,) = session(runner, ['infect 5', 'reset'], replies=2)[1:]
+    assert runner.world is not world
+    assert reply['infected'] == 0
+
+
+def test_errors():
+    runner = make_runner()
+    replies = session(runner, ['dance', 'speed', 'speed fast', 'speed -1',
+                               'infect lots', 'status'])
+    assert replies[0] == {'error': "unknown command 'dance'"}
+    assert replies[1] == {'error': 'speed requires a number of hours/sec'}
+    assert replies[3] == {'error': 'speed must not be negative'}
+    for reply in (replies[2], replies[4]):
+        assert set(reply) == {'error'}
+    # The connection carries on after an error
+    assert replies[5]['hours'] == 0
+
+
+def test_subscribe():
+    runner = make_runner()
+    runner.infect(2)
+    runner.resume()
+    hours = [metrics['hours']
+             for metrics in session(runner, ['subscribe'], replies=5,
+                                    run=True)]
+    assert hours == sorted(hours)
+    assert len(set(hours)) == 5
+    # The subscriber is removed once they disconnect
+    assert not runner.subscribers
+
+
+def test_stop_condition_pauses():
+    runner = make_runner(conditions=[Extinct()])
+    runner.infect()
+    runner.resume()
+
+    async def until_stopped():
+        task = asyncio.ensure_future(runner.run())
+        while runner.running:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(until_stopped(), 5))
+    (status,) = session(runner, ['status'])
+    assert not status['running']
+    assert status['infected'] == 0
+    assert status['stopped'] == {'hours': runner.world.hours,
+                                 'reason': 'extinct'}
@@ -0,0 +1,55 @@
+"""Tests for virus_shared."""
+
+import random
+
+import pytest
+
+from virus_shared import (SharedPopulation, SharedPopulationReader,
+                          virus_bits, virus_mask)
+from virus_sim import World
+
+
+def test_round_trip():
+    random.seed(0)
+    world = World(200, 200, 20)
+    for _ in range(3):
+        world.infect_person()
+
+    shared = SharedPopulation(world)
+    try:
+        shared.attach()
+        for _ in range(3):
+            world.simulate()
+
+        reader = SharedPopulationReader(shared.name)
+        try:
+            snapshot = reader.snapshot()
+            assert reader.virus_names == [cls.__name__
+                                          for cls in world.viruses]
+        finally:
+            reader.close()
+    finally:
+        shared.close()
+
+    bits = virus_bits(world.viruses)
+    assert snapshot['hours'] == 3
+    assert list(zip(snapshot['x'], snapshot['y'])) == \
+        [person.location for person in world.people]
+    assert snapshot['mask'] == [virus_mask(person, bits)
+                                for person in world.people]
+    colours = [snapshot['colour'][i:i + 3]
+               for i in range(0, len(snapshot['colour']), 3)]
+    for colour, person in zip(colours, world.people):
+        assert colour == pytest.approx(person.get_colour(), abs=1e-6)
+
+
+def test_too_many_people():
+    random.seed(0)
+    world = World(200, 200, 5)
+    shared = SharedPopulation(world)
+    try:
+        world.add_person()
+        with pytest.raises(ValueError):
+            shared.publish(world)
+    finally:
+        shared.close()
@@ -0,0 +1,54 @@
+"""Tests for virus_stop."""
+
+import random
+
+import pytest
+
+from virus_sim import SnakeVirus, Virus, World
+from virus_stop import Steady, run_until
+
+
+def test_extinct():
+    random.seed(0)
+    world = World(200, 200, 1, [Virus])
+    world.infect_person()
+
+    outcome = run_until(world)
+    assert (outcome.hours, outcome.reason, outcome.final) == \
+        (7, 'extinct', True)
+    assert outcome.curve(10) == [1] * 7 + [0] * 4
+
+
+def test_saturated():
+    random.seed(0)
+    world = World(200, 200, 5, [SnakeVirus])
+    for person in world.people:
+        SnakeVirus().infect(person)
+
+    outcome = run_until(world, hours=100)
+    assert (outcome.hours, outcome.reason) == (0, 'saturated')
+    assert outcome.curve(3) == [5] * 4
+
+
+def test_steady():
+    random.seed(0)
+    world = World(200, 200, 5, [Virus])
+
+    outcome = run_until(world, [Steady(5)], hours=100)
+    assert (outcome.hours, outcome.reason, outcome.final) == \
+        (5, 'steady', False)
+    assert outcome.curve(5) == [0] * 6
+    with pytest.raises(ValueError):
+        outcome.curve(6)
+
+    with pytest.raises(ValueError):
+        Steady(0)
+
+
+def test_out_of_hours():
+    random.seed(0)
+    world = World(200, 200, 5, [Virus])
+
+    outcome = run_until(world, [Steady(1000)], hours=3)
+    assert (outcome.start, outcome.hours, outcome.reason) == (0, 3, None)
+    assert len(outcome.counts) == 4
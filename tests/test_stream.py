@@ -0,0 +1,122 @@
+"""Tests for virus_stream and its sinks."""
+
+import csv
+import json
+import random
+
+import pytest
+
+from virus_sim import World
+from virus_stream import (ColumnarSink, CSVSink, JSONLinesSink,
+                          RingBufferSink, Sink, ThreadedSink, flatten,
+                          observe, pump, read_column)
+
+HOURS = 10
+
+
+@pytest.fixture
+def observations():
+    """Returns the observations of a seeded world over a few hours, with the
+    positions of a few people sampled.
+    """
+    random.seed(0)
+    world = World(300, 300, 40)
+    for _ in range(4):
+        world.infect_person()
+    return list(observe(world, hours=HOURS, sample=3, seed=0))
+
+
+def test_observe(observations):
+    assert [o['hours'] for o in observations] == list(range(1, HOURS + 1))
+    for observation in observations:
+        counts = observation['counts'].values()
+        assert max(counts) <= observation['infected'] <= sum(counts)
+        assert len(observation['positions']) == 3
+
+
+def test_csv(tmp_path, observations):
+    path = tmp_path / 'run.csv'
+    with CSVSink(path) as sink:
+        assert pump(observations, sink) == HOURS
+
+    with open(path, newline='') as file:
+        rows = list(csv.DictReader(file))
+    assert rows == [{key: str(value)
+                     for key, value in flatten(observation).items()}
+                    for observation in observations]
+
+
+def test_json_lines(tmp_path, observations):
+    path = tmp_path / 'run.jsonl'
+    with JSONLinesSink(path) as sink:
+        pump(observations, sink)
+
+    with open(path) as file:
+        lines = [json.loads(line) for line in file]
+    # Tuples of positions come back as lists
+    assert lines == json.loads(json.dumps(observations))
+
+
+def test_columnar(tmp_path, observations):
+    directory = tmp_path / 'run'
+    sink = ColumnarSink(directory, row_group=4)
+    pump(observations, sink)
+
+    # Only whole row groups have been written before closing
+    with open(directory / 'schema.json') as file:
+        assert json.load(file)['rows'] == 8
+    assert len(read_column(directory, 'hours')) == 8
+
+    sink.close()
+    with open(directory / 'schema.json') as file:
+        schema = json.load(file)
+    rows = [flatten(observation) for observation in observations]
+    assert schema == {'columns': list(rows[0]), 'dtype': 'int64',
+                      'rows': HOURS}
+    for name in schema['columns']:
+        assert read_column(directory, name).tolist() == \
+            [row[name] for row in rows]
+
+
+def test_threaded_flushes_on_close(tmp_path, observations):
+    path = tmp_path / 'run.jsonl'
+    sink = ThreadedSink(JSONLinesSink(path), maxsize=2)
+    pump(observations, sink)
+    sink.close()
+
+    assert not sink.thread.is_alive()
+    assert sink.sink.file.closed
+    with open(path) as file:
+        hours = [json.loads(line)['hours'] for line in file]
+    assert hours == list(range(1, HOURS + 1))
+
+
+class FailingSink(Sink):
+    """A sink which fails on its first write."""
+
+    def write(self, observation):
+        raise OSError('disk full')
+
+
+def test_threaded_raises_sink_errors(observations):
+    sink = ThreadedSink(FailingSink())
+    sink.write(observations[0])
+    with pytest.raises(OSError, match='disk full'):
+        sink.close()
+
+
+def test_ring_buffer(observations):
+    rows = [flatten(observation) for observation in observations]
+    sink = RingBufferSink(4)
+    assert sink.to_array().shape == (0, 0)
+
+    pump(observations[:3], sink)
+    assert sink.column('hours').tolist() == [1, 2, 3]
+
+    # Wraps around, keeping the newest rows from oldest to newest
+    pump(observations[3:], sink)
+    array = sink.to_array()
+    assert array.shape == (4, len(sink.columns))
+    assert array.tolist() == [[row[name] for name in sink.columns]
+                              for row in rows[-4:]]
+    assert sink.column('hours').tolist() == [7, 8, 9, 10]
@@ -0,0 +1,28 @@
+"""Tests for virus_tiles."""
+
+import pytest
+
+from virus_sim import ZombieVirus
+from virus_tiles import TiledWorld
+
+
+def run(tiles, hours=30):
+    """Returns the state of a seeded TiledWorld split into the given tiles
+    after the given number of hours.
+    """
+    with TiledWorld(420, 280, 120, tiles=tiles, seed=3) as world:
+        for _ in range(5):
+            world.infect_person()
+        world.simulate(hours)
+        return world.state()
+
+
+def test_splits_give_identical_results():
+    reference = run((1, 1))
+    for tiles in ((2, 2), (3, 1), (1, 3)):
+        assert run(tiles) == reference, tiles
+
+
+def test_unsupported_virus_is_named():
+    with pytest.raises(ValueError, match='ZombieVirus'):
+        TiledWorld(420, 280, 10, [ZombieVirus], tiles=(1, 1))
@@ -0,0 +1,59 @@
+"""Tests for virus_trajectory."""
+
+import random
+
+import pytest
+
+from virus_shared import virus_bits, virus_mask
+from virus_sim import World
+from virus_trajectory import TrajectoryReader, TrajectoryRecorder
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """Returns the path of a recording of a small world and the state of its
+    people at each hour recorded.
+    """
+    random.seed(0)
+    world = World(200, 200, 20)
+    for _ in range(3):
+        world.infect_person()
+
+    path = str(tmp_path / 'run.vtrj')
+    bits = virus_bits(world.viruses)
+    states = [[(p.location, virus_mask(p, bits)) for p in world.people]]
+    recorder = TrajectoryRecorder(path, world, capacity=2)
+    recorder.attach()
+    for _ in range(5):
+        world.simulate()
+        states.append([(p.location, virus_mask(p, bits))
+                       for p in world.people])
+    recorder.close()
+    return path, states
+
+
+def test_round_trip(recording):
+    path, states = recording
+    with TrajectoryReader(path) as reader:
+        assert len(reader) == len(states)
+        for hour, people in enumerate(states):
+            locations = reader.locations(hour)
+            assert list(reader.masks(hour)) == [mask for _, mask in people]
+            for (x, y), ((ex, ey), _) in zip(locations, people):
+                assert x == pytest.approx(ex, abs=1e-4)
+                assert y == pytest.approx(ey, abs=1e-4)
+
+        (x, y), mask = reader.person(3, 7)
+        assert (x, y) == pytest.approx(states[3][7][0], abs=1e-4)
+        assert mask == states[3][7][1]
+        assert len(reader.track(7)) == len(states)
+
+
+def test_person_out_of_range(recording):
+    path, _ = recording
+    with TrajectoryReader(path) as reader:
+        for person in (-1, 20, 1000):
+            with pytest.raises(IndexError):
+                reader.person(0, person)
+        with pytest.raises(IndexError):
+            reader.person(len(reader), 0)
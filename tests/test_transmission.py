@@ -0,0 +1,84 @@
+"""Tests for virus_transmission."""
+
+import random
+
+import pytest
+
+from virus_sim import Virus, World
+from virus_transmission import Transmission
+
+
+def test_susceptibility_is_per_person():
+    """Someone with susceptibility s in contact with several infected people
+    catches anything with chance s, as in Person.resists_infection.
+    """
+    random.seed(0)
+    world = World(200, 200, 6, viruses=[Virus],
+                  attributes={'susceptibility': 0.5})
+    for person in world.people:
+        person.location = (0.0, 0.0)
+    for person in world.people[1:]:
+        Virus().infect(person)
+
+    transmission = Transmission(seed=0)
+    caught = 0
+    for _ in range(2000):
+        targets, _ = transmission.transmissions(world)
+        caught += 0 in targets.tolist()
+    assert 0.45 < caught / 2000 < 0.55
+
+
+def pair_world(start, end):
+    """Returns a world of two people in contact, the second having moved
+    from start to end while the first stood at (0, 0), and a transmission
+    stage weighted by duration which saw them at the start of the hour.
+    """
+    random.seed(0)
+    world = World(200, 200, 2, viruses=[Virus])
+    first, second = world.people
+    first.location, second.location = (0.0, 0.0), start
+    transmission = Transmission({Virus: 0.5}, duration_weighting=True,
+                                seed=0)
+    transmission.fractions(world, *transmission.contacts(world))
+    world.hours += 1
+    second.location = end
+    return world, transmission
+
+
+def test_fractions():
+    # Standing still in contact, and walking into contact half way through
+    # the hour (both have a radius of 7)
+    for start, fraction in (((5.0, 0.0), 1), ((28.0, 0.0), 0.5),
+                            ((14.0, 0.0), 1)):
+        world, transmission = pair_world(start, (0.0, 0.0))
+        first, second = transmission.contacts(world)
+        assert transmission.fractions(world, first, second) == \
+            pytest.approx([fraction])
+
+
+def test_fractions_without_last_hour():
+    random.seed(0)
+    world = World(200, 200, 2, viruses=[Virus])
+    for person in world.people:
+        person.location = (0.0, 0.0)
+    transmission = Transmission(duration_weighting=True)
+    first, second = transmission.contacts(world)
+    assert transmission.fractions(world, first, second).tolist() == [1]
+
+
+@pytest.mark.parametrize('start, chance', [((0.0, 0.0), 0.5),
+                                           ((28.0, 0.0), 1 - 0.5**0.5)])
+def test_duration_weighting(start, chance):
+    """A pair in contact for a fraction f of the hour passes on a virus with
+    probability p with chance 1 - (1 - p)^f.
+    """
+    world, transmission = pair_world(start, (0.0, 0.0))
+    world.people[0].infect(Virus())
+    begin = transmission.locations
+
+    caught = 0
+    for _ in range(4000):
+        transmission.locations = begin
+        targets, _ = transmission.transmissions(world)
+        caught += 1 in targets.tolist()
+    assert chance - 0.03 < caught / 4000 < chance + 0.03
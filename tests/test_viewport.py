@@ -0,0 +1,39 @@
+"""Tests for culling people outside of a Viewport."""
+
+import random
+
+import pytest
+
+from virus_sim import Distribution, Viewport, World
+
+
+def overlaps(person, bounds):
+    """Returns True if the given person's circle overlaps the given
+    (xmin, ymin, xmax, ymax) bounds.
+    """
+    xmin, ymin, xmax, ymax = bounds
+    x, y = person.location
+    dx = max(xmin - x, 0, x - xmax)
+    dy = max(ymin - y, 0, y - ymax)
+    return dx * dx + dy * dy <= person.radius * person.radius
+
+
+@pytest.mark.parametrize('radius', [7, Distribution.choice([2, 7, 40],
+                                                           [2, 6, 1])])
+def test_visible_people_include_everyone_in_view(radius):
+    random.seed(0)
+    world = World(2000, 1400, 1500, attributes={'radius': radius})
+    viewport = Viewport(300, 200)
+
+    for hour in range(20):
+        world.simulate()
+        viewport.centre = (random.uniform(-1000, 1000),
+                           random.uniform(-700, 700))
+        viewport.zoom = random.choice([0.3, 1.0, 2.5])
+
+        visible = world.visible_people(viewport)
+        assert len({id(person) for person in visible}) == len(visible)
+        expected = {id(person) for person in world.people
+                    if overlaps(person, viewport.bounds())}
+        assert expected <= {id(person) for person in visible}
+        assert len(visible) < len(world.people)
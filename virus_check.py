@@ -0,0 +1,471 @@
+"""
+Checks that the faster engines reproduce the reference simulation.
+
+Usage:
+    python virus_check.py [--seeds N] [--hours N] [--only NAME ...]
+                          [--budget SECONDS]
+
+The reference is the original simulation: people moving themselves with
+Person.update, infections found with World.update_infections_slow and the
+virus classes' on_world_update hooks. Each candidate is run on the same
+seeded worlds as its reference and checked in one of two ways:
+
+    exact          the candidate must end up in exactly the same state every
+                   hour, which is possible when both use the same random
+                   numbers in the same order
+    statistical    the candidate uses different random numbers, so instead
+                   the distributions of its epidemic curves (infected count
+                   at several hours and the peak) over many seeds are
+                   compared against the reference's with two-sample
+                   Kolmogorov-Smirnov tests
+
+TiledWorld and Ensemble draw their random numbers differently from World,
+so they're only compared with the reference statistically. The tiles check
+is exact, but compares TiledWorld split into tiles with the same world in
+one tile, so it only shows that splitting a world changes nothing, and the
+ensemble check compares Ensemble with TiledWorld.
+
+Worlds for the exact checks are generated from each seed with varying sizes,
+populations and radius distributions, so every run covers a spread of cases.
+Every seed is fixed, so a run gives the same results each time rather than
+failing at random, and the statistical checks use a significance level
+split between their tests.
+
+With --seeds N each statistical check compares 4N curves from each engine,
+and only fails once the Kolmogorov-Smirnov statistic D (the largest gap
+between the two cumulative distributions) reaches about:
+
+    --seeds    curves    D
+    2          8         1.0, only entirely separate distributions
+    5          20        0.65
+    10         40        0.48, the default
+    25         100       0.30
+
+so fewer than 10 seeds only catches gross errors, and with 1 nothing can
+fail. Curves are summarised a quarter and half of the way through, so the
+checks need at least 100 hours (the default) for those points to be past
+the first hours, where every engine is still close to the number infected
+at the start. tests/test_check.py runs every check with these defaults.
+
+The exit status is 1 if any check fails or the run takes longer than the
+budget, so it can be run as a CI step.
+
+Requires NumPy.
+"""
+
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from virus_ensemble import Ensemble
+from virus_geometry import contact_pairs
+from virus_movement import RandomWaypoint
+from virus_sim import (Distribution, EfficientCollision, MultiLevelGrid,
+                       RainbowVirus, ZebraVirus, ImmunisableVirus, World,
+                       within_2d)
+from virus_tiles import TiledWorld
+from virus_transmission import Transmission
+
+# Viruses every engine can simulate
+BATCHABLE = [RainbowVirus, ZebraVirus, ImmunisableVirus]
+
+# Radii for generated worlds, as distributions drawing from the random module
+RADII = [
+    lambda: 7,
+    Distribution.uniform(3, 12),
+    Distribution.choice([4, 7, 20], [3, 6, 1]),
+]
+
+# Size and population of the worlds used for the statistical checks, at the
+# same density as the graphical simulation
+CURVE_WORLD = (490, 350, 100)
+
+# Overall significance level of each statistical check
+ALPHA = 0.001
+
+# Default seeds and hours, the least the statistical checks should be run
+# with (see above)
+SEEDS = 10
+HOURS = 100
+
+
+def random_world(seed, viruses=BATCHABLE, **kwargs):
+    """Returns a world generated from the given seed, with a random size,
+    population and radius distribution and a few people infected, leaving
+    the random module seeded so that worlds made from the same seed are
+    simulated the same way.
+    """
+    rng = random.Random(seed)
+    width = rng.randrange(60, 600, 2)
+    height = rng.randrange(60, 600, 2)
+    n = rng.randrange(2, 150)
+    radius = rng.choice(RADII)
+
+    random.seed(seed)
+    world = World(width, height, n, viruses,
+                  attributes={'radius': radius}, **kwargs)
+    for _ in range(max(1, n // 20)):
+        world.infect_person()
+    return world
+
+
+def world_state(world):
+    """Returns a list of everyone's location, destination and viruses with
+    their remaining durations, for comparing worlds.
+    """
+    return [(person.location, person.destination,
+             sorted((virus.__class__.__name__, virus.remaining_duration)
+                    for virus in person.viruses))
+            for person in world.people]
+
+
+def run_states(world, hours):
+    """Simulates the given world and returns its state after each hour."""
+    states = []
+    for _ in range(hours):
+        world.simulate()
+        states.append(world_state(world))
+    return states
+
+
+def first_difference(reference, candidate):
+    """Returns the first hour the given lists of states differ at, or None if
+    they're the same.
+    """
+    for hour, (a, b) in enumerate(zip(reference, candidate), 1):
+        if a != b:
+            return hour
+    return None
+
+
+def use_slow_infections(world):
+    """Makes the given world find infections by checking every pair of
+    people, as the reference does.
+    """
+    world.update_infections_fast = world.update_infections_slow
+
+
+def brute_force_pairs(people):
+    """Returns a set of the (i, j) pairs, i < j, of people in contact, found
+    by checking every pair.
+    """
+    return {(i, j)
+            for i, a in enumerate(people)
+            for j in range(i + 1, len(people))
+            if within_2d(a.location, people[j].location,
+                         a.radius + people[j].radius)}
+
+
+def ks_2samp(a, b):
+    """Returns the two-sample Kolmogorov-Smirnov statistic of the given
+    samples and its asymptotic p-value.
+    """
+    a, b = np.sort(a), np.sort(b)
+    values = np.concatenate((a, b))
+    statistic = np.max(np.abs(
+        np.searchsorted(a, values, side='right') / len(a) -
+        np.searchsorted(b, values, side='right') / len(b)))
+
+    # Kolmogorov distribution with a small sample correction
+    en = math.sqrt(len(a) * len(b) / (len(a) + len(b)))
+    x = (en + 0.12 + 0.11 / en) * statistic
+    if x < 0.2:
+        return statistic, 1.0
+    p = 2 * sum((-1)**(j - 1) * math.exp(-2 * j * j * x * x)
+                for j in range(1, 101))
+    return statistic, min(max(p, 0.0), 1.0)
+
+
+def curve_summary(counts):
+    """Returns the infected counts at a quarter, half and all of the way
+    through the given curve, and its peak.
+    """
+    hours = len(counts)
+    return (counts[hours // 4 - 1], counts[hours // 2 - 1], counts[-1],
+            max(counts))
+
+
+def compare_curves(reference, candidate):
+    """Returns whether each summary of the given lists of curves has the
+    same distribution, and a description of the worst one.
+    """
+    names = ('quarter', 'half', 'end', 'peak')
+    reference = np.array([curve_summary(c) for c in reference])
+    candidate = np.array([curve_summary(c) for c in candidate])
+
+    results = [(ks_2samp(reference[:, i], candidate[:, i]), name)
+               for i, name in enumerate(names)]
+    (statistic, p), name = min(results, key=lambda result: result[0][1])
+    passed = p >= ALPHA / len(names)
+    return passed, f'worst {name}: D={statistic:.3f} p={p:.3f}'
+
+
+def check_fast_infections(seeds, hours):
+    """update_infections_fast vs update_infections_slow, exact."""
+    for seed in seeds:
+        reference = random_world(seed)
+        use_slow_infections(reference)
+        expected = run_states(reference, hours)
+        actual = run_states(random_world(seed), hours)
+
+        hour = first_difference(expected, actual)
+        if hour is not None:
+            return False, f'seed {seed} differs at hour {hour}'
+    return True, f'{len(seeds)} worlds identical for {hours} hours'
+
+
+def check_transmission(seeds, hours):
+    """Transmission with every probability 1 vs update_infections_slow,
+    exact.
+    """
+    for seed in seeds:
+        reference = random_world(seed)
+        use_slow_infections(reference)
+        expected = run_states(reference, hours)
+        actual = run_states(random_world(seed, transmission=Transmission()),
+                            hours)
+
+        hour = first_difference(expected, actual)
+        if hour is not None:
+            return False, f'seed {seed} differs at hour {hour}'
+    return True, f'{len(seeds)} worlds identical for {hours} hours'
+
+
+def check_contact_pairs(seeds, hours):
+    """Collision tables and virus_geometry.contact_pairs vs checking every
+    pair, exact, every 10 hours.
+    """
+    checked = 0
+    for seed in seeds:
+        world = random_world(seed)
+        for hour in range(0, hours, 10):
+            people = world.people
+            expected = brute_force_pairs(people)
+            radii = [person.radius for person in people]
+            reach = 4 * max(radii)
+
+            first, second = contact_pairs([p.location for p in people],
+                                          radii)
+            candidates = {
+                'world': world.collision_table.contact_pairs(people),
+                'spatial hash': EfficientCollision(reach).contact_pairs(
+                    people),
+                # Cells narrower than people, so each is put in every cell
+                # their bounding box overlaps
+                'spatial hash boxes': EfficientCollision(
+                    min(radii)).contact_pairs(people),
+                'multi-level': MultiLevelGrid(4 * min(radii)).contact_pairs(
+                    people),
+                'geometry': set(zip(first.tolist(), second.tolist())),
+            }
+            for name, pairs in candidates.items():
+                if pairs != expected:
+                    return False, (f'{name} differs for seed {seed} at hour '
+                                   f'{hour}')
+            checked += 1
+            for _ in range(10):
+                world.simulate()
+    return True, f'{checked} hours of {len(seeds)} worlds identical'
+
+
+def check_waypoint_step(seeds, hours):
+    """RandomWaypoint.step vs Person.move and reached_destination, equal to
+    within rounding as NumPy's square root is correctly rounded while ** 0.5
+    isn't always.
+    """
+    model = RandomWaypoint(seed=0)
+    worst = 0.0
+    for seed in seeds:
+        world = random_world(seed)
+        people = world.people
+        for _ in range(hours):
+            locations = np.array([p.location for p in people])
+            destinations = np.array([p.destination for p in people])
+            radii = np.array([p.radius for p in people], dtype=float)
+            speeds = np.array([p.speed for p in people], dtype=float)
+            moved, _ = model.step(locations, destinations, radii, world.size,
+                                  world.hours, speeds)
+
+            for person in people:
+                person.move()
+            expected = np.array([p.location for p in people])
+            worst = max(worst, float(np.abs(moved - expected).max()))
+            if worst > 1e-9:
+                return False, f'seed {seed} moved {worst:.3g} apart'
+
+            # Reached destinations from the model's own check
+            reached = np.einsum('ij,ij->i', moved - destinations,
+                                moved - destinations) <= radii * radii
+            expected = [p.reached_destination() for p in people]
+            if reached.tolist() != expected:
+                return False, f'seed {seed} reached different destinations'
+            world.simulate()
+    return True, f'{len(seeds)} worlds, at most {worst:.3g} apart'
+
+
+def check_tiles(seeds, hours):
+    """TiledWorld split into 2 x 2 tiles vs 1 x 1, exact, which checks the
+    engine against itself rather than the reference.
+    """
+    for seed in seeds[:2]:
+        states = []
+        for tiles in ((1, 1), (2, 2)):
+            with TiledWorld(700, 500, 200, tiles=tiles, seed=seed) as world:
+                for _ in range(3):
+                    world.infect_person()
+                world.simulate(hours)
+                states.append(world.state())
+        if states[0] != states[1]:
+            return False, f'seed {seed} differs after {hours} hours'
+    return True, f'{len(seeds[:2])} worlds identical after {hours} hours'
+
+
+def check_ensemble(seeds, hours):
+    """Ensemble replicates vs TiledWorld with the same seeds, exact."""
+    ensemble = Ensemble(700, 500, 200, seeds=seeds)
+    ensemble.infect(0, 0)
+    ensemble.infect(1, 2)
+    ensemble.simulate(hours)
+
+    for i, seed in enumerate(seeds):
+        with TiledWorld(700, 500, 200, tiles=(1, 1), seed=seed) as world:
+            for person, virus in ((0, 0), (1, 2)):
+                world.population.remaining[virus][person] = \
+                    world.config['durations'][virus]
+            world.simulate(hours)
+            if world.state() != ensemble.replicate(i):
+                return False, f'seed {seed} differs after {hours} hours'
+    return True, f'{len(seeds)} replicates identical after {hours} hours'
+
+
+def reference_curves(seeds, hours, viruses=None, **kwargs):
+    """Returns the infected count after each hour of a reference world for
+    each seed, with 3 people infected at the start.
+    """
+    width, height, n = CURVE_WORLD
+    curves = []
+    for seed in seeds:
+        random.seed(seed)
+        if viruses is None:
+            world = World(width, height, n, **kwargs)
+        else:
+            world = World(width, height, n, viruses, **kwargs)
+        use_slow_infections(world)
+        for _ in range(3):
+            world.infect_person()
+        counts = []
+        for _ in range(hours):
+            world.simulate()
+            counts.append(world.count_infected())
+        curves.append(counts)
+    return curves
+
+
+def check_waypoint_curves(seeds, hours):
+    """World with RandomWaypoint movement vs the reference, with every
+    default virus and its hooks, statistical.
+    """
+    reference = reference_curves(seeds, hours)
+    candidate = [
+        reference_curves([seed], hours, movement=RandomWaypoint(seed))[0]
+        for seed in seeds
+    ]
+    return compare_curves(reference, candidate)
+
+
+def check_tiles_curves(seeds, hours):
+    """TiledWorld vs the reference, statistical. Every split gives the same
+    results (see check_tiles), so one tile is used.
+    """
+    width, height, n = CURVE_WORLD
+    reference = reference_curves(seeds, hours, BATCHABLE)
+    candidate = []
+    for seed in seeds:
+        with TiledWorld(width, height, n, BATCHABLE, tiles=(1, 1),
+                        seed=seed) as world:
+            for _ in range(3):
+                world.infect_person()
+            counts = []
+            for _ in range(hours):
+                world.simulate()
+                counts.append(world.count_infected())
+            candidate.append(counts)
+    return compare_curves(reference, candidate)
+
+
+def check_ensemble_curves(seeds, hours):
+    """Ensemble vs the reference, statistical."""
+    width, height, n = CURVE_WORLD
+    reference = reference_curves(seeds, hours, BATCHABLE)
+    ensemble = Ensemble(width, height, n, seeds=seeds)
+    for _ in range(3):
+        ensemble.infect_person()
+    candidate = ensemble.run(hours).T.tolist()
+    return compare_curves(reference, candidate)
+
+
+def check_seeds(kind, seeds):
+    """Returns the list of seeds to run a check of the given kind with,
+    given the number of seeds for exact checks.
+    """
+    count = seeds * 4 if kind == 'statistical' else seeds
+    return list(range(1, count + 1))
+
+
+CHECKS = {
+    'fast infections': (check_fast_infections, 'exact'),
+    'transmission': (check_transmission, 'exact'),
+    'contact pairs': (check_contact_pairs, 'exact'),
+    'waypoint step': (check_waypoint_step, 'exact'),
+    'tiles': (check_tiles, 'exact'),
+    'ensemble': (check_ensemble, 'exact'),
+    'waypoint curves': (check_waypoint_curves, 'statistical'),
+    'tiles curves': (check_tiles_curves, 'statistical'),
+    'ensemble curves': (check_ensemble_curves, 'statistical'),
+}
+
+
+def main():
+    """Runs each check and exits with status 1 if any fail."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--seeds', type=int, default=SEEDS,
+                        help='seeds for exact checks, 4 times as many are '
+                        'used for statistical checks, which need at least '
+                        f'{SEEDS} to mean much')
+    parser.add_argument('--hours', type=int, default=HOURS,
+                        help=f'statistical checks need at least {HOURS}')
+    parser.add_argument('--only', nargs='+', choices=CHECKS, metavar='NAME')
+    parser.add_argument('--budget', type=float,
+                        help='fail if the checks take longer than this many '
+                        'seconds')
+    args = parser.parse_args()
+
+    print(f'{"check":<18} {"kind":<12} {"result":<6} {"time":>7}  detail')
+    failed = False
+    start = time.perf_counter()
+    for name in args.only or CHECKS:
+        function, kind = CHECKS[name]
+        seeds = check_seeds(kind, args.seeds)
+
+        began = time.perf_counter()
+        passed, detail = function(seeds, args.hours)
+        elapsed = time.perf_counter() - began
+        failed = failed or not passed
+        print(f'{name:<18} {kind:<12} {"pass" if passed else "FAIL":<6} '
+              f'{elapsed:>6.1f}s  {detail}')
+
+    elapsed = time.perf_counter() - start
+    print(f'total {elapsed:.1f}s')
+    if args.budget is not None and elapsed > args.budget:
+        print(f'over the budget of {args.budget:.0f}s')
+        failed = True
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""
+Records who was in contact with who every hour, so contacts can be traced,
+summarised and replayed without simulating the world again.
+
+Each hour's contacts are kept as an edge list of int32 (i, j) pairs, i < j,
+with the offset of each hour's first pair kept separately, which costs 8
+bytes per contact per hour. Graphs of who has been in contact over a range
+of hours are built from the edge list in compressed sparse row (CSR) form
+when they're first asked for, and cached until more hours are recorded.
+
+A recording can be replayed with different virus parameters, e.g.
+
+    recorder = ContactRecorder(world)
+    recorder.attach()
+    for _ in range(500):
+        world.simulate()
+
+    for beta in (0.05, 0.1, 0.2):
+        curve = recorder.replay([Parameters(beta, duration=48)], {0: [0]})
+
+where each replay moves people between compartments (see
+virus_compartments) using the recorded contacts instead of moving anyone.
+
+Requires NumPy.
+"""
+
+import numpy as np
+
+from virus_compartments import Compartments
+
+
+class ContactRecorder:
+    """Keeps the pairs of people in contact in a world for every hour."""
+
+    def __init__(self, world):
+        """Creates a new, empty recording of the contacts in the given world.
+
+        Args:
+            world (World): world to record, must keep the same people for the
+                whole recording
+        """
+        self.world = world
+        self.n = len(world.people)
+        self.first_hour = None
+        self.hours = 0
+
+        # Pairs recorded since the edge list was last put together
+        self.pending = []
+        self.edges = np.zeros((0, 2), dtype=np.int32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.graphs = {}
+
+    def attach(self):
+        """Records the world's contacts at the end of every hour from now on,
+        using the world's virus update methods.
+        """
+        self.world.on_update_methods.append(self.record)
+
+    def detach(self):
+        """Stops recording the world's contacts every hour."""
+        if self.record in self.world.on_update_methods:
+            self.world.on_update_methods.remove(self.record)
+
+    def record(self, world):
+        """Appends the pairs of people in contact in the given world this
+        hour.
+
+        Raises:
+            ValueError: world's number of people has changed
+        """
+        if len(world.people) != self.n:
+            raise ValueError("world's number of people has changed")
+
+        if self.first_hour is None:
+            self.first_hour = world.hours
+
+        pairs = world.contact_pairs()
+        edges = np.array(sorted(pairs), dtype=np.int32).reshape(-1, 2)
+        self.pending.append(edges)
+        self.hours += 1
+        self.graphs.clear()
+
+    def __compact(self):
+        """Adds any pending pairs to the edge list."""
+        if self.pending:
+            counts = [len(edges) for edges in self.pending]
+            self.offsets = np.concatenate(
+                (self.offsets, self.offsets[-1] + np.cumsum(counts)))
+            self.edges = np.concatenate([self.edges] + self.pending)
+            self.pending = []
+
+    def __range(self, start, stop):
+        """Returns the indices of the first and last + 1 of the recorded
+        hours from start up to but not including stop, defaulting to every
+        hour recorded.
+        """
+        first = self.first_hour or 0
+        start = 0 if start is None else max(start - first, 0)
+        stop = self.hours if stop is None else min(stop - first, self.hours)
+        return start, max(stop, start)
+
+    def pairs(self, hour):
+        """Returns an (m, 2) array of the (i, j) pairs, i < j, of people in
+        contact during the given hour.
+
+        Raises:
+            IndexError: hour wasn't recorded
+        """
+        index = hour - (self.first_hour or 0)
+        if not 0 <= index < self.hours:
+            raise IndexError("hour wasn't recorded")
+
+        self.__compact()
+        return self.edges[self.offsets[index]:self.offsets[index + 1]]
+
+    def edge_list(self, start=None, stop=None):
+        """Returns an (m, 2) array of every pair of people in contact during
+        each hour from start up to but not including stop, with a pair
+        appearing once for each hour they were in contact.
+        """
+        self.__compact()
+        start, stop = self.__range(start, stop)
+        return self.edges[self.offsets[start]:self.offsets[stop]]
+
+    def graph(self, start=None, stop=None):
+        """Returns the graph of who was in contact with who during the hours
+        from start up to but not including stop as (indptr, indices, hours)
+        CSR arrays, where person p's contacts are indices[indptr[p]:indptr[p
+        + 1]] and hours gives how many hours they were in contact for.
+        """
+        key = self.__range(start, stop)
+        if key not in self.graphs:
+            self.graphs[key] = self.__build_graph(*key)
+        return self.graphs[key]
+
+    def __build_graph(self, start, stop):
+        """Builds the CSR graph for the given range of hour indices."""
+        self.__compact()
+        edges = self.edges[self.offsets[start]:self.offsets[stop]]
+
+        # Both directions, with repeated pairs merged into a count of hours
+        keys = np.concatenate((edges[:, 0].astype(np.int64) * self.n +
+                               edges[:, 1], edges[:, 1].astype(np.int64) *
+                               self.n + edges[:, 0]))
+        keys, hours = np.unique(keys, return_counts=True)
+        sources = keys // self.n
+
+        indptr = np.zeros(self.n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=self.n), out=indptr[1:])
+        indices = (keys % self.n).astype(np.int32)
+        return indptr, indices, hours.astype(np.int32)
+
+    def neighbours(self, person, start=None, stop=None):
+        """Returns an array of everyone the given person was in contact with
+        during the hours from start up to but not including stop.
+        """
+        indptr, indices, _ = self.graph(start, stop)
+        return indices[indptr[person]:indptr[person + 1]]
+
+    def degrees(self, start=None, stop=None):
+        """Returns an array of how many different people each person was in
+        contact with during the hours from start up to but not including
+        stop.
+        """
+        indptr, _, _ = self.graph(start, stop)
+        return np.diff(indptr)
+
+    def degree_distribution(self, start=None, stop=None):
+        """Returns an array of how many people were in contact with 0, 1,
+        2, ... different people during the hours from start up to but not
+        including stop.
+        """
+        return np.bincount(self.degrees(start, stop))
+
+    def trace(self, person, start=None, stop=None, generations=None):
+        """Traces everyone who could have caught something from the given
+        person, directly or through others, during the hours from start up to
+        but not including stop. Contacts only pass things on to people met
+        afterwards, so chains have to follow the order things happened in.
+
+        Args:
+            person (int): index of the person to trace from
+            start (int): first hour to trace from, defaulting to the first
+                hour recorded
+            stop (int): hour to trace up to but not including, defaulting to
+                every hour recorded
+            generations (int): longest chain of contacts to follow, None for
+                no limit and 1 for only direct contacts
+
+        Returns:
+            dict: (hour, generation) of when each person traced was first
+                reached and how many contacts away from the given person they
+                are, keyed by their index
+        """
+        start, stop = self.__range(start, stop)
+        self.__compact()
+        limit = np.iinfo(np.int32).max if generations is None else generations
+
+        generation = np.full(self.n, -1, dtype=np.int32)
+        reached = np.full(self.n, -1, dtype=np.int64)
+        generation[person] = 0
+
+        for index in range(start, stop):
+            edges = self.edges[self.offsets[index]:self.offsets[index + 1]]
+            if not len(edges):
+                continue
+
+            # People reached this hour can pass it on in the same hour, so
+            # repeat until nobody new is reached
+            first, second = edges[:, 0], edges[:, 1]
+            while True:
+                sources = np.concatenate((first, second))
+                targets = np.concatenate((second, first))
+                passing = ((generation[sources] >= 0) &
+                           (generation[sources] < limit) &
+                           (generation[targets] < 0))
+                if not passing.any():
+                    break
+
+                # Anyone reached by more than one person takes the shortest
+                # chain
+                new = np.full(self.n, np.iinfo(np.int32).max, dtype=np.int64)
+                np.minimum.at(new, targets[passing],
+                              generation[sources[passing]] + 1)
+                caught = new < np.iinfo(np.int32).max
+                generation[caught] = new[caught]
+                reached[caught] = (self.first_hour or 0) + index
+
+        return {
+            int(i): (int(reached[i]), int(generation[i]))
+            for i in np.flatnonzero(generation > 0)
+        }
+
+    def replay(self, parameters, infected, seed=None, start=None, stop=None):
+        """Replays the spread of viruses with the given parameters over the
+        recorded contacts, without moving anyone.
+
+        Args:
+            parameters (list): Parameters for each virus to replay (see
+                virus_compartments)
+            infected (dict): indices of the people infected with each virus
+                (index) at the start
+            seed (int): seed for the random numbers used for transmissions
+            start (int): first hour to replay, defaulting to the first hour
+                recorded
+            stop (int): hour to replay up to but not including, defaulting to
+                every hour recorded
+
+        Returns:
+            array: number of people in each compartment for each virus at the
+                start and after each hour, with shape (hours + 1, viruses, 4)
+        """
+        start, stop = self.__range(start, stop)
+        self.__compact()
+
+        model = Compartments(self.n, parameters, seed)
+        for virus, people in infected.items():
+            model.infect(people, virus)
+
+        viruses = len(model.parameters)
+        counts = np.zeros((stop - start + 1, viruses, 4), dtype=np.int64)
+        counts[0] = [np.bincount(model.state[v], minlength=4)
+                     for v in range(viruses)]
+
+        for row, index in enumerate(range(start, stop), 1):
+            edges = self.edges[self.offsets[index]:self.offsets[index + 1]]
+            model.step(edges[:, 0], edges[:, 1])
+            counts[row] = [np.bincount(model.state[v], minlength=4)
+                           for v in range(viruses)]
+        return counts
+
+    def save(self, path):
+        """Saves the recording to the given .npz file."""
+        self.__compact()
+        np.savez(path, n=self.n, first_hour=self.first_hour or 0,
+                 edges=self.edges, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path):
+        """Returns a recording loaded from the given .npz file, which isn't
+        attached to a world.
+        """
+        with np.load(path) as data:
+            recorder = cls.__new__(cls)
+            recorder.world = None
+            recorder.n = int(data['n'])
+            recorder.edges = data['edges']
+            recorder.offsets = data['offsets']
+            recorder.hours = len(recorder.offsets) - 1
+            recorder.first_hour = int(data['first_hour'])
+            recorder.pending = []
+            recorder.graphs = {}
+        return recorder
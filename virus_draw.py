@@ -0,0 +1,87 @@
+"""
+Turtle drawing functions used to display the virus simulation.
+"""
+
+import turtle
+
+
+def draw_dot(location, size, colour):
+    """Draws a dot of the given diameter and colour at the given location."""
+    turtle.penup()  # Ensure nothing is drawn while moving
+    turtle.setpos(location)
+    turtle.dot(size, colour)
+
+
+def draw_text(x, y, text, colour='black', *args, **kwargs):
+    """Wrapper for turtle.write which takes an (x, y) position to write the
+    text at and an optional text colour.
+    """
+    turtle.penup()  # Ensure nothing is drawn while moving
+    turtle.color(colour)
+    turtle.setpos(x, y)
+    turtle.write(text, *args, **kwargs)
+
+
+def draw_rect(x, y, width, height, colour='black'):
+    """Draws a rectangle starting from the top-left corner."""
+
+    # Draw the top-left corner of the rectangle
+    draw_line(x, y, width, orientation="horizontal", colour='black')
+    draw_line(x, y, height, colour='black')
+
+    # Draw the bottom-right corner of the rectangle
+    x += width
+    y -= height
+    draw_line(x,
+              y,
+              width,
+              orientation="horizontal",
+              reverse=True,
+              colour='black')
+    draw_line(x, y, height, reverse=True, colour='black')
+
+
+def draw_line(x,
+              y,
+              length,
+              orientation="vertical",
+              reverse=False,
+              colour='black'):
+    """Draws a line starting at the given coordinates.
+
+    Args:
+        x (int): horizontal coordinate on the default turtle screen
+        y (int): vertical coordinate on the default turtle screen
+        length (int): length of the line in pixels
+        orientation (str): 'vertical' to draw a vertical line from the top-down
+            starting at the given x, y coordinates, 'horizontal' to draw the
+            line left-to-right
+        reverse (bool): True to reverse the draw direction, e.g. draw
+            bottom-top instead of top-down
+        colour: colour of the line, can be any valid colour accepted by the
+            turtle module
+    """
+    if orientation == "vertical":
+        turtle.setheading(180)  # South
+    elif orientation == "horizontal":
+        turtle.setheading(90)  # East
+
+    if reverse:
+        length *= -1
+
+    turtle.color(colour)
+    turtle.penup()  # Ensure nothing is drawn while moving
+    turtle.setpos(x, y)
+    turtle.pendown()
+    turtle.forward(length)
+    turtle.penup()
+
+
+def draw_segment(start, end, colour='black'):
+    """Draws a straight line between two (x, y) points."""
+    turtle.color(colour)
+    turtle.penup()  # Ensure nothing is drawn while moving
+    turtle.setpos(start)
+    turtle.pendown()
+    turtle.setpos(end)
+    turtle.penup()
@@ -0,0 +1,345 @@
+"""
+Simulates many small replicate worlds at once in one set of arrays.
+
+Monte Carlo studies run the same scenario thousands of times with different
+random numbers. Rather than a World per replicate, an Ensemble keeps every
+replicate in arrays with a replicate axis and advances them all together
+each hour:
+
+    locations, destinations    float64 (replicates, n, 2)
+    remaining                  int32 (viruses, replicates, n), hours left of
+                               each virus, 0 if not infected
+    immune                     bool (viruses, replicates, n)
+
+Each hour everyone moves and their viruses progress exactly as in a
+TiledWorld, then contacts are found for every replicate in one grid search
+where each replicate has its own cells.
+
+Every random number is derived from the replicate's seed, the person and the
+hour, using the same counter-based generator as virus_tiles, so each
+replicate's results only depend on its own seed and not on how many other
+replicates there are. A replicate matches a TiledWorld created with the same
+seed that's infected the same way. Movement models (see virus_movement) can
+be used instead of random waypoints, but their random numbers are shared by
+every replicate.
+
+Replicates which can't change any more, where nobody is infected or
+everyone has every virus for good (it never ends or they're immune to it),
+keep moving but aren't searched for contacts,
+and run_until stops as soon as every replicate is decided, reporting the hour
+each one was.
+
+Only batchable viruses (see virus_plugins) can be simulated this way.
+
+Requires NumPy.
+"""
+
+import numpy as np
+
+from virus_geometry import contact_pairs, step_towards, within
+from virus_plugins import batch_parameters
+from virus_sim import RainbowVirus, ZebraVirus, ImmunisableVirus
+
+
+def _mix(z):
+    """Returns a well mixed 64-bit hash of each of the given uint64s
+    (SplitMix64).
+    """
+    with np.errstate(over='ignore'):
+        z = z + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _uniform(seeds, people, hour, draw, a, b):
+    """Returns an array of random floats between a and b which only depend on
+    each of the given seeds and people and the given hour and draw number,
+    the same as virus_tiles would give.
+    """
+    z = _mix(_mix(_mix(seeds ^ people) ^ np.uint64(hour)) ^ np.uint64(draw))
+    return a + (b - a) * ((z >> np.uint64(11)) / float(1 << 53))
+
+
+class Ensemble:
+    """A number of replicate worlds of the same size and population which
+    are simulated together.
+    """
+
+    def __init__(self,
+                 width,
+                 height,
+                 n=200,
+                 replicates=100,
+                 viruses=[RainbowVirus, ZebraVirus, ImmunisableVirus],
+                 seeds=None,
+                 radius=7,
+                 movement=None):
+        """Creates replicate worlds centered on (0, 0) each containing n
+        people.
+
+        Args:
+            width (int): horizontal length of each world in pixels
+            height (int): vertical length of each world in pixels
+            n (int): number of people in each world
+            replicates (int): number of worlds, ignored if seeds are given
+            viruses (iterable): virus classes that will be used to infect
+                people in these worlds
+            seeds (iterable): seed of each replicate, defaulting to 0, 1, 2...
+            radius (int): radius of every person in pixels
+            movement (MovementModel): moves everyone in every replicate each
+                hour, if this is None people move towards random
+                destinations like Person.update
+
+        Raises:
+            ValueError: width and height must be even
+            ValueError: virus can't be simulated in array form
+        """
+        if width % 2 != 0 or height % 2 != 0:
+            raise ValueError("width and height must be even")
+
+        self.size = (width, height)
+        self.n = n
+        self.radius = radius
+        self.movement = movement
+        self.hours = 0
+        self.viruses = list(viruses)
+        parameters = batch_parameters(self.viruses)
+        self.durations = np.array([p['duration'] for p in parameters],
+                                  dtype=np.int32)
+        self.immunising = np.array([p['immunising'] for p in parameters],
+                                   dtype=bool)
+
+        seeds = range(replicates) if seeds is None else seeds
+        self.seeds = np.array(list(seeds), dtype=np.uint64)
+        self.replicates = len(self.seeds)
+        self.infections = 0  # Calls to infect_person, for its random numbers
+
+        shape = (len(self.viruses), self.replicates, n)
+        self.remaining = np.zeros(shape, dtype=np.int32)
+        self.immune = np.zeros(shape, dtype=bool)
+
+        self.low = np.array([radius - width // 2, radius - height // 2],
+                            dtype=float)
+        self.high = np.array(
+            [width - radius - width // 2, height - radius - height // 2],
+            dtype=float)
+
+        people = np.arange(n, dtype=np.uint64)
+        seeds = self.seeds[:, None]
+        self.locations = np.stack(
+            (self.__uniform(seeds, people, 0, 0, 0),
+             self.__uniform(seeds, people, 0, 1, 1)), axis=-1)
+        self.destinations = np.stack(
+            (self.__uniform(seeds, people, 0, 2, 0),
+             self.__uniform(seeds, people, 0, 3, 1)), axis=-1)
+
+        # Which replicate each person belongs to, for finding contacts
+        self.groups = np.repeat(np.arange(self.replicates), n)
+
+    def __uniform(self, seeds, people, hour, draw, axis):
+        """Returns random coordinates along the given axis (0 for x, 1 for
+        y) where someone can stand.
+        """
+        return _uniform(seeds, people, hour, draw, self.low[axis],
+                        self.high[axis])
+
+    def simulate(self, hours=1):
+        """Simulates the given number of hours in every replicate."""
+        for _ in range(hours):
+            self.hours += 1
+            self.move()
+            self.progress()
+            self.update_infections()
+
+    def move(self):
+        """Moves everyone in every replicate for this hour."""
+        if self.movement is not None:
+            radii = np.full((self.replicates, self.n), self.radius, float)
+            self.locations, self.destinations = self.movement.step(
+                self.locations, self.destinations, radii, self.size,
+                self.hours)
+            return
+
+        self.locations = step_towards(self.locations, self.destinations,
+                                      self.radius / 2)
+        reached = within(self.locations, self.destinations, self.radius)
+        if reached.any():
+            replicates, people = np.nonzero(reached)
+            seeds = self.seeds[replicates]
+            counters = people.astype(np.uint64)
+            self.destinations[replicates, people] = np.stack(
+                (self.__uniform(seeds, counters, self.hours, 0, 0),
+                 self.__uniform(seeds, counters, self.hours, 1, 1)), axis=-1)
+
+    def progress(self):
+        """Counts down everyone's viruses, curing (and immunising) anyone
+        whose virus has run out.
+        """
+        infected = self.remaining != 0
+        self.remaining[infected] -= 1
+        cured = infected & (self.remaining == 0)
+        self.immune |= cured & self.immunising[:, None, None]
+
+    def contacts(self, replicates=None):
+        """Returns arrays of the first and second flat index (replicate * n +
+        person) of each pair of people in contact in the given replicates
+        (indices), defaulting to every replicate.
+        """
+        if replicates is None:
+            return contact_pairs(self.locations.reshape(-1, 2), self.radius,
+                                 self.groups)
+
+        groups = np.repeat(np.arange(len(replicates)), self.n)
+        first, second = contact_pairs(
+            self.locations[replicates].reshape(-1, 2), self.radius, groups)
+
+        # Back from indices into the given replicates to flat indices
+        offsets = replicates * self.n - np.arange(len(replicates)) * self.n
+        return (first + offsets[first // self.n],
+                second + offsets[second // self.n])
+
+    def finished(self):
+        """Returns a boolean array which is True for each replicate where
+        nobody is infected, or where everyone either has each virus for good
+        or is immune to it, as nothing more can change in them.
+        """
+        extinct = ~(self.remaining != 0).any(axis=(0, 2))
+        saturated = ((self.remaining < 0) | self.immune).all(axis=(0, 2))
+        return extinct | saturated
+
+    def update_infections(self):
+        """Infects anyone in contact with someone infected with a virus they
+        aren't immune to, which restarts the virus for anyone who already has
+        it.
+        """
+        finished = self.finished()
+        if finished.all():
+            return
+        if finished.any():
+            first, second = self.contacts(np.flatnonzero(~finished))
+        else:
+            first, second = self.contacts()
+        if not len(first):
+            return
+
+        sources = np.concatenate((first, second))
+        targets = np.concatenate((second, first))
+        remaining = self.remaining.reshape(len(self.viruses), -1)
+        immune = self.immune.reshape(len(self.viruses), -1)
+        for v, duration in enumerate(self.durations):
+            catching = (remaining[v, sources] != 0) & ~immune[v, targets]
+            remaining[v, targets[catching]] = duration
+
+    def infect(self, person, virus=0, replicates=None):
+        """Infects the given person (index) with the given virus (index) in
+        the given replicates (indices), defaulting to every replicate, unless
+        they're immune to it.
+        """
+        replicates = (slice(None) if replicates is None else
+                      np.asarray(replicates, dtype=np.intp))
+        remaining = self.remaining[virus, replicates, person]
+        immune = self.immune[virus, replicates, person]
+        self.remaining[virus, replicates, person] = np.where(
+            immune, remaining, self.durations[virus])
+
+    def infect_person(self):
+        """Infects a random person in each replicate with a random virus,
+        which is chosen using the replicate's own seed.
+
+        It is possible for the chosen person to already be infected
+        with a virus.
+        """
+        if not self.viruses:
+            return
+
+        # Numbers past the last person are used so that these random numbers
+        # don't repeat ones used to move people
+        counter = np.uint64(self.n + self.infections)
+        self.infections += 1
+        people = _uniform(self.seeds, counter, self.hours, 0, 0,
+                          self.n).astype(np.intp)
+        viruses = _uniform(self.seeds, counter, self.hours, 1, 0,
+                           len(self.viruses)).astype(np.intp)
+        people = np.minimum(people, self.n - 1)
+        viruses = np.minimum(viruses, len(self.viruses) - 1)
+
+        replicates = np.arange(self.replicates)
+        immune = self.immune[viruses, replicates, people]
+        self.remaining[viruses[~immune], replicates[~immune],
+                       people[~immune]] = self.durations[viruses[~immune]]
+
+    def cure_all(self):
+        """Cures everyone in every replicate."""
+        infected = self.remaining != 0
+        self.immune |= infected & self.immunising[:, None, None]
+        self.remaining[:] = 0
+
+    def infected(self):
+        """Returns a boolean array of shape (replicates, n) which is True
+        where a person is infected with any virus.
+        """
+        return (self.remaining != 0).any(axis=0)
+
+    def count_infected(self):
+        """Returns an array of the number of infected people in each
+        replicate.
+        """
+        return self.infected().sum(axis=1)
+
+    def count_by_virus(self):
+        """Returns an array of shape (replicates, viruses) of the number of
+        people infected with each virus in each replicate.
+        """
+        return (self.remaining != 0).sum(axis=2).T
+
+    def run(self, hours):
+        """Simulates the given number of hours and returns an array of shape
+        (hours, replicates) of the number of infected people in each
+        replicate after each hour.
+        """
+        counts = np.zeros((hours, self.replicates), dtype=np.int64)
+        for hour in range(hours):
+            self.simulate()
+            counts[hour] = self.count_infected()
+        return counts
+
+    def run_until(self, hours):
+        """Simulates up to the given number of hours, stopping early once
+        every replicate is finished (see finished).
+
+        Returns:
+            tuple: array of shape (hours + 1, replicates) of the number of
+                infected people in each replicate at the start and after each
+                hour, with the hours after stopping filled in with the last
+                count, and an array of the hour each replicate finished at,
+                -1 for those which didn't
+        """
+        counts = np.zeros((hours + 1, self.replicates), dtype=np.int64)
+        stopped = np.full(self.replicates, -1, dtype=np.int64)
+
+        counts[0] = self.count_infected()
+        finished = self.finished()
+        stopped[finished] = self.hours
+        for hour in range(1, hours + 1):
+            if finished.all():
+                counts[hour:] = counts[hour - 1]
+                break
+
+            self.simulate()
+            counts[hour] = self.count_infected()
+            finished = self.finished()
+            stopped[finished & (stopped < 0)] = self.hours
+        return counts, stopped
+
+    def replicate(self, index):
+        """Returns a tuple of the given replicate's locations, destinations,
+        remaining virus durations and immunities as lists, in the same form
+        as TiledWorld.state.
+        """
+        locations = self.locations[index]
+        destinations = self.destinations[index]
+        return (locations[:, 0].tolist(), locations[:, 1].tolist(),
+                destinations[:, 0].tolist(), destinations[:, 1].tolist(),
+                self.remaining[:, index].tolist(),
+                self.immune[:, index].astype(int).tolist())
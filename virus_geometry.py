@@ -0,0 +1,122 @@
+"""
+Batched NumPy versions of the geometry in virus_sim.
+
+These mirror distance_squared_2d and within_2d for arrays of points, and
+everything compares squared distances so the only square roots taken are
+the ones needed to scale a step. Scalar code should use the functions in
+virus_sim, which work the same way.
+
+Requires NumPy.
+"""
+
+import numpy as np
+
+# Offsets of the cells that are checked against each cell in contact_pairs.
+# Only half of the neighbours are needed, as the other half check back.
+_HALF_NEIGHBOURS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def distances_squared(a, b):
+    """Returns the squared distances between two arrays of (x, y) points."""
+    delta = np.asarray(b) - np.asarray(a)
+    return np.einsum('...i,...i->...', delta, delta)
+
+
+def within(a, b, distance):
+    """Returns a boolean array which is True where the points in a and b are
+    no further than distance apart.
+    """
+    distance = np.asarray(distance)
+    return distances_squared(a, b) <= distance * distance
+
+
+def step_towards(locations, targets, distances):
+    """Returns the given locations moved up to the given distances towards
+    the given targets, without overshooting them.
+    """
+    delta = targets - locations
+    length_squared = np.einsum('...i,...i->...', delta, delta)
+    distances = np.asarray(distances, dtype=float)
+
+    # Only take square roots for the people who need their step shortened
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where(length_squared > distances * distances,
+                         distances / np.sqrt(length_squared), 1.0)
+    return locations + delta * scale[..., None]
+
+
+def contact_pairs(locations, radii, groups=None):
+    """Returns arrays of the first and second index of every pair of points,
+    first < second, whose circles with the given radii touch or overlap.
+
+    Points are hashed into a grid of cells as wide as the largest contact,
+    so each point only needs to be checked against points in the same or a
+    neighbouring cell. If an array of non-negative integer groups is given,
+    e.g. the replicate each point belongs to, only points in the same group
+    are paired.
+    """
+    locations = np.asarray(locations, dtype=float)
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), len(locations))
+    n = len(locations)
+    empty = np.zeros(0, dtype=np.int64)
+    if n < 2:
+        return empty, empty
+
+    cell_size = 2 * radii.max() or 1.0
+    cells = np.floor(locations / cell_size).astype(np.int64)
+    cells -= cells.min(axis=0) - 1  # Leave room for neighbours at -1
+    rows = cells[:, 1].max() + 2
+    keys = cells[:, 0] * rows + cells[:, 1]
+    if groups is not None:
+        # Each group gets its own grid, padded so neighbours never wrap
+        columns = cells[:, 0].max() + 2
+        keys += np.asarray(groups, dtype=np.int64) * (columns * rows)
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    # Look cells up in a table of where each starts in the sorted points if
+    # it's small enough, which is much faster than searching
+    size = keys.max() + rows + 2
+    if size <= 16 * n:
+        cell_counts = np.bincount(keys, minlength=size)
+        cell_starts = np.cumsum(cell_counts) - cell_counts
+
+    firsts, seconds = [], []
+    for dx, dy in _HALF_NEIGHBOURS:
+        neighbours = keys + dx * rows + dy
+        if size <= 16 * n:
+            start = cell_starts[neighbours]
+            counts = cell_counts[neighbours]
+        else:
+            start = np.searchsorted(sorted_keys, neighbours, side='left')
+            counts = np.searchsorted(sorted_keys, neighbours,
+                                     side='right') - start
+        total = counts.sum()
+        if not total:
+            continue
+
+        # Pair each point with every point in its neighbouring cell, only
+        # looking at points whose neighbouring cell isn't empty
+        found = np.flatnonzero(counts)
+        counts = counts[found]
+        first = np.repeat(found, counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts,
+                                               counts)
+        second = order[np.repeat(start[found], counts) + offsets]
+
+        if (dx, dy) == (0, 0):
+            keep = first < second
+            first, second = first[keep], second[keep]
+
+        reach = radii[first] + radii[second]
+        touching = distances_squared(locations[first],
+                                     locations[second]) <= reach * reach
+        first, second = first[touching], second[touching]
+        swap = first > second
+        firsts.append(np.where(swap, second, first))
+        seconds.append(np.where(swap, first, second))
+
+    if not firsts:
+        return empty, empty
+    return np.concatenate(firsts), np.concatenate(seconds)
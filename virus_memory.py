@@ -0,0 +1,157 @@
+"""
+Accounts for the memory used by a World, broken down by subsystem.
+
+memory_report(world) walks everything the world keeps and adds up the size
+of each object with sys.getsizeof, counting objects shared between people or
+subsystems once, in the first subsystem that reaches them:
+
+    people           the list of people, each Person and its attribute dict
+                     along with attributes like radius and speed
+    locations        location and destination tuples and the distance left
+                     over from moving
+    viruses          each person's list of viruses and the virus instances
+    collision table  the cells of the collision table and the lists in them
+    contacts         the pairs in contact cached for this hour
+    virus classes    class-level state such as ZombieVirus.infected and
+                     SnakeVirus.infected, which belongs to every world using
+                     the class
+    layout           walls, obstacles, regions and their grid index
+    engines          movement model, the population arrays it steps and
+                     transmission, including any arrays
+    update hooks     objects whose methods are called every hour, e.g. a
+                     ContactRecorder and its edge list
+
+Only what the world can reach is counted, so memory held by the interpreter
+itself, freed blocks and allocator overhead aren't included; compare against
+the process' resident set size (see benchmarks/bench_memory) for those.
+"""
+
+import sys
+from collections import OrderedDict
+
+# Containers which are walked into, anything else is counted on its own
+_CONTAINERS = (tuple, list, set, frozenset, dict, OrderedDict)
+
+# Attributes of each person counted under other subsystems
+_PERSON_EXCLUDED = {'location', 'destination', '_destination_distance',
+                    'viruses', 'layout'}
+
+
+def deep_size(obj, seen):
+    """Returns the size in bytes of the given object and every container,
+    number, string and array inside it, skipping objects whose ids are in
+    seen and adding the ids of everything counted to it.
+
+    Objects with attributes of their own, like people and viruses, are only
+    referred to by containers, so they aren't counted (see object_size).
+    """
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or hasattr(obj, '__dict__'):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, _CONTAINERS):
+            stack.extend(obj)
+    return size
+
+
+def object_size(obj, seen, exclude=()):
+    """Returns the size in bytes of the given object, its attribute dict and
+    the attributes in it other than the excluded ones, counted like
+    deep_size.
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    attributes = getattr(obj, '__dict__', None)
+    if attributes is not None and id(attributes) not in seen:
+        seen.add(id(attributes))
+        size += sys.getsizeof(attributes)
+        for name, value in attributes.items():
+            if name not in exclude:
+                size += deep_size(value, seen)
+    return size
+
+
+def memory_report(world):
+    """Returns a dict of the bytes used by each subsystem of the given world
+    (see the top of this module), in the order they're counted.
+    """
+    seen = {id(world)}
+    report = {}
+
+    size = deep_size(world.people, seen)
+    for person in world.people:
+        size += object_size(person, seen, _PERSON_EXCLUDED)
+    report['people'] = size
+
+    report['locations'] = sum(
+        deep_size(person.location, seen) +
+        deep_size(person.destination, seen) +
+        deep_size(person._destination_distance, seen)
+        for person in world.people)
+
+    size = 0
+    for person in world.people:
+        size += deep_size(person.viruses, seen)
+        for virus in person.viruses:
+            size += object_size(virus, seen)
+    report['viruses'] = size
+
+    table = world.collision_table
+    report['collision table'] = object_size(table, seen)
+    report['contacts'] = deep_size(world.contacts, seen)
+
+    # Only the state classes keep themselves, not their methods or constants
+    size = 0
+    for cls in world.viruses:
+        for name in ('infected', 'healthy'):
+            if name in vars(cls):
+                size += deep_size(vars(cls)[name], seen)
+    report['virus classes'] = size
+
+    size = 0
+    if world.layout is not None:
+        layout = world.layout
+        size += object_size(layout, seen)
+        for region in layout.regions:
+            size += object_size(region, seen)
+    report['layout'] = size
+
+    report['engines'] = sum(
+        object_size(engine, seen)
+        for engine in (world.movement, world.arrays, world.transmission)
+        if engine is not None)
+
+    # Bound methods of objects, rather than of virus classes
+    hooks = [getattr(method, '__self__', None)
+             for method in world.on_update_methods]
+    report['update hooks'] = sum(
+        object_size(hook, seen) for hook in hooks
+        if hook is not None and not isinstance(hook, type))
+    return report
+
+
+def format_report(report, n=None):
+    """Returns the given report as a table of bytes for each subsystem, and
+    bytes per person if the given number of people isn't None or 0.
+    """
+    total = sum(report.values())
+    lines = [f'{"subsystem":<16} {"bytes":>14} {"share":>6}' +
+             (f' {"per person":>11}' if n else '')]
+    for name, size in list(report.items()) + [('total', total)]:
+        share = size / total * 100 if total else 0
+        line = f'{name:<16} {size:>14,} {share:>5.1f}%'
+        if n:
+            line += f' {size / n:>11.1f}'
+        lines.append(line)
+    return '\n'.join(lines)
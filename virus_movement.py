@@ -0,0 +1,332 @@
+"""
+Movement models which move every person in a world at once using NumPy.
+
+A movement model is given to a World (World(..., movement=RandomWalk())) and
+replaces each person moving themselves. Every hour the model receives arrays
+of everyone's locations, destinations, radii and speeds and returns the new
+locations and destinations, so the cost of a model doesn't grow with the
+number of Python objects involved.
+
+A World using a movement model owns everyone's state as PopulationArrays,
+which are kept from hour to hour, so the model steps the arrays directly and
+only the people whose location or destination was changed by something
+else, e.g. a ZombieVirus picking them a target, are read back each hour.
+
+Models work on arrays with any number of leading dimensions, e.g. locations
+of shape (n, 2) for one world or (replicates, n, 2) for many worlds of the
+same size simulated together, where the matching radii have shape (n,) or
+(replicates, n).
+
+Requires NumPy.
+"""
+
+from itertools import compress, count
+from operator import attrgetter, is_not
+
+import numpy as np
+
+from virus_geometry import step_towards, within
+
+_location = attrgetter('location')
+_destination = attrgetter('destination')
+
+
+def random_locations(rng, radii, size):
+    """Returns an array of random (x, y) locations within a world of the
+    given size, one for each of the given radii, no closer than one radius to
+    the edge of the world.
+    """
+    low, high = bounds(radii, size)
+    return rng.uniform(low, high)
+
+
+def bounds(radii, size):
+    """Returns arrays of the lowest and highest (x, y) location someone with
+    each of the given radii can be at in a world of the given size.
+    """
+    width, height = size
+    radii = np.asarray(radii, dtype=float)[..., None]
+    low = np.array([-(width // 2), -(height // 2)], dtype=float) + radii
+    high = np.array([width - width // 2, height - height // 2]) - radii
+    return low, high
+
+
+class PopulationArrays:
+    """Everyone's locations, destinations, radii and speeds in a world as
+    arrays, along with the tuples last given to each person so that changes
+    made to people outside of a movement model can be picked up.
+
+    Radii and speeds are read when the arrays are made, as they don't change.
+    """
+
+    def __init__(self, people):
+        """Creates arrays of the current state of the given people."""
+        self.location_list = [person.location for person in people]
+        self.destination_list = [person.destination for person in people]
+        self.locations = np.array(self.location_list, dtype=float)
+        self.destinations = np.array(self.destination_list, dtype=float)
+        self.radii = np.array([person.radius for person in people],
+                              dtype=float)
+        self.speeds = np.array([person.speed for person in people],
+                               dtype=float)
+
+    def __len__(self):
+        return len(self.location_list)
+
+    def pull(self, people):
+        """Copies the location or destination of anyone given a new one
+        since the arrays were last pushed into the arrays.
+        """
+        moved = list(compress(count(), map(
+            is_not, map(_location, people), self.location_list)))
+        redirected = list(compress(count(), map(
+            is_not, map(_destination, people), self.destination_list)))
+        if moved:
+            self.locations[moved] = [people[i].location for i in moved]
+        if redirected:
+            self.destinations[redirected] = [
+                people[i].destination for i in redirected
+            ]
+
+    def push(self, people, locations, destinations, layout=None):
+        """Stores the given arrays of new locations and destinations and
+        gives everyone their new location, and a new destination only if it
+        changed, so most destination tuples are kept from hour to hour.
+
+        Anyone a wall or obstacle in the given layout is in the way of stays
+        where they are and heads somewhere else instead.
+        """
+        location_list = list(zip(*locations.T.tolist()))
+        destination_list = self.destination_list
+        if destinations is not self.destinations:
+            changed = np.flatnonzero(
+                (destinations != self.destinations).any(axis=-1)).tolist()
+            for i, destination in zip(changed,
+                                      destinations[changed].tolist()):
+                destination_list[i] = people[i].destination = \
+                    tuple(destination)
+
+        if layout is not None:
+            for i, person in enumerate(people):
+                if layout.blocks(person.location, location_list[i],
+                                 person.radius):
+                    location_list[i] = person.location
+                    destination_list[i] = person.destination = \
+                        layout.random_location(person.radius)
+                    locations[i] = location_list[i]
+                    destinations[i] = destination_list[i]
+
+        for person, location in zip(people, location_list):
+            person.location = location
+
+        self.locations = locations
+        self.destinations = destinations
+        self.location_list = location_list
+
+
+class MovementModel:
+    """Base class for all movement models."""
+
+    def __init__(self, seed=None):
+        """Creates a new model whose random numbers are drawn using the given
+        seed.
+        """
+        self.rng = np.random.default_rng(seed)
+
+    def move(self, world):
+        """Moves every person in the given world for one hour, stepping the
+        world's population arrays.
+        """
+        people = world.people
+        if not people:
+            return
+
+        arrays = world.arrays
+        if arrays is None or len(arrays) != len(people):
+            arrays = world.arrays = PopulationArrays(people)
+        else:
+            arrays.pull(people)
+
+        locations, destinations = self.step(arrays.locations,
+                                            arrays.destinations, arrays.radii,
+                                            world.size, world.hours,
+                                            arrays.speeds)
+        arrays.push(people, locations, destinations, world.layout)
+
+    def step(self, locations, destinations, radii, size, hour, speeds=None):
+        """Returns arrays of the new locations and destinations of people
+        with the given locations, destinations, radii and speeds (distance
+        moved per hour, half of each radius if this is None) after the given
+        hour in a world of the given size.
+        """
+        raise NotImplementedError
+
+
+class RandomWaypoint(MovementModel):
+    """Each person moves their speed towards a random destination each
+    hour, picking a new one once they're within one radius of it.
+
+    This is the same as people moving themselves with Person.update.
+    """
+
+    def step(self, locations, destinations, radii, size, hour, speeds=None):
+        speeds = radii / 2 if speeds is None else speeds
+        locations = step_towards(locations, destinations, speeds)
+        reached = within(locations, destinations, radii)
+        if reached.any():
+            destinations = destinations.copy()
+            destinations[reached] = random_locations(self.rng, radii[reached],
+                                                     size)
+        return locations, destinations
+
+
+class RandomWalk(MovementModel):
+    """Each person takes a normally distributed random step each hour,
+    bouncing off the edges of the world.
+    """
+
+    def __init__(self, step_size=None, seed=None):
+        """Creates a new random walk.
+
+        Args:
+            step_size (float): standard deviation of each step along each
+                axis in pixels, if this is None each person's speed is used
+            seed (int): seed for the random numbers used by this model
+        """
+        super().__init__(seed)
+        self.step_size = step_size
+
+    def step(self, locations, destinations, radii, size, hour, speeds=None):
+        scale = radii / 2 if speeds is None else speeds
+        scale = scale if self.step_size is None else self.step_size
+        scale = np.broadcast_to(scale, radii.shape)[..., None]
+        locations = locations + self.rng.normal(size=locations.shape) * scale
+
+        # Reflect anyone who stepped past an edge back inside the world
+        low, high = bounds(radii, size)
+        locations = np.where(locations < low, 2 * low - locations, locations)
+        locations = np.where(locations > high, 2 * high - locations,
+                             locations)
+        return np.clip(locations, low, high), destinations
+
+
+class HomeAndCommute(MovementModel):
+    """Each person has a home and a workplace and moves towards their
+    workplace during working hours and towards their home otherwise, milling
+    around whichever they're at.
+
+    Homes and workplaces are chosen at random the first time someone moves.
+    """
+
+    def __init__(self,
+                 day_length=24,
+                 work_hours=(9, 17),
+                 workplaces=None,
+                 wander=None,
+                 seed=None):
+        """Creates a new commuting model.
+
+        Args:
+            day_length (int): number of hours in a day
+            work_hours (tuple): hour of the day people go to work and hour of
+                the day they go home
+            workplaces (int): number of workplaces shared between everyone,
+                if this is None everyone has their own workplace
+            wander (float): how far in pixels people mill around their home or
+                workplace, if this is None it's twice their radius
+            seed (int): seed for the random numbers used by this model
+        """
+        super().__init__(seed)
+        self.day_length = day_length
+        self.work_hours = work_hours
+        self.workplaces = workplaces
+        self.wander = wander
+        self.homes = None
+        self.work = None
+
+    def __assign(self, radii, size):
+        """Chooses homes and workplaces for people with the given radii."""
+        self.homes = random_locations(self.rng, radii, size)
+        if self.workplaces is None:
+            self.work = random_locations(self.rng, radii, size)
+        else:
+            sites = random_locations(self.rng,
+                                     np.full(self.workplaces, radii.max()),
+                                     size)
+            chosen = self.rng.integers(self.workplaces, size=radii.shape)
+            self.work = sites[chosen]
+
+    def step(self, locations, destinations, radii, size, hour, speeds=None):
+        if self.homes is None or self.homes.shape != locations.shape:
+            self.__assign(radii, size)
+
+        start, end = self.work_hours
+        at_work = start <= hour % self.day_length < end
+        anchors = self.work if at_work else self.homes
+
+        # Mill around the anchor by aiming for a random point near it
+        wander = radii * 2 if self.wander is None else self.wander
+        wander = np.broadcast_to(wander, radii.shape)[..., None]
+        low, high = bounds(radii, size)
+        jitter = self.rng.uniform(-1, 1, size=locations.shape) * wander
+        destinations = np.clip(anchors + jitter, low, high)
+
+        speeds = radii / 2 if speeds is None else speeds
+        return step_towards(locations, destinations, speeds), destinations
+
+
+class Hotspots(MovementModel):
+    """People move between random destinations like RandomWaypoint, but
+    destinations are drawn towards a set of hotspots such as shops or
+    transport hubs.
+    """
+
+    def __init__(self, hotspots, weights=None, attraction=0.8, spread=20,
+                 seed=None):
+        """Creates a new hotspot model.
+
+        Args:
+            hotspots (list): (x, y) locations of each hotspot
+            weights (list): relative popularity of each hotspot, if this is
+                None every hotspot is equally popular
+            attraction (float): chance between 0 and 1 that someone's next
+                destination is near a hotspot rather than anywhere
+            spread (float): standard deviation in pixels of destinations
+                around a hotspot
+            seed (int): seed for the random numbers used by this model
+
+        Raises:
+            ValueError: there must be at least one hotspot
+        """
+        super().__init__(seed)
+        if not len(hotspots):
+            raise ValueError("there must be at least one hotspot")
+
+        self.hotspots = np.asarray(hotspots, dtype=float)
+        weights = np.ones(len(hotspots)) if weights is None else weights
+        self.weights = np.asarray(weights, dtype=float) / np.sum(weights)
+        self.attraction = attraction
+        self.spread = spread
+
+    def step(self, locations, destinations, radii, size, hour, speeds=None):
+        speeds = radii / 2 if speeds is None else speeds
+        locations = step_towards(locations, destinations, speeds)
+        reached = within(locations, destinations, radii)
+        if not reached.any():
+            return locations, destinations
+
+        reached_radii = radii[reached]
+        count = len(reached_radii)
+        new = random_locations(self.rng, reached_radii, size)
+
+        attracted = self.rng.random(count) < self.attraction
+        chosen = self.rng.choice(len(self.hotspots), attracted.sum(),
+                                 p=self.weights)
+        near = self.hotspots[chosen] + self.rng.normal(
+            scale=self.spread, size=(len(chosen), 2))
+        low, high = bounds(reached_radii[attracted], size)
+        new[attracted] = np.clip(near, low, high)
+
+        destinations = destinations.copy()
+        destinations[reached] = new
+        return locations, destinations
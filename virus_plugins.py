@@ -0,0 +1,109 @@
+"""
+Registry of virus classes, including viruses provided by other packages.
+
+Virus classes declare capabilities (see virus_sim) and parameters which
+describe how they behave. Engines that work on arrays instead of virus
+instances, like TiledWorld, use these to simulate every batchable virus in
+array form and to reject viruses that need per-instance Python calls, and
+World counts down batchable viruses directly while progressing the rest
+through their own methods.
+
+Other packages can provide viruses by declaring an entry point in the
+'virus_sim.viruses' group which refers to a Virus subclass, e.g. in their
+pyproject.toml:
+
+    [project.entry-points."virus_sim.viruses"]
+    measles = "measles_plugin:MeaslesVirus"
+
+and calling load_entry_points() registers them by name.
+"""
+
+from importlib import metadata
+
+from virus_sim import (CAPABILITIES, STATELESS_DURATION, Virus, RainbowVirus,
+                       ZebraVirus, ImmunisableVirus, ZombieVirus, SnakeVirus)
+
+ENTRY_POINT_GROUP = 'virus_sim.viruses'
+
+_registry = {}
+
+
+def register_virus(cls, name=None):
+    """Adds the given virus class to the registry under the given name
+    (defaulting to the class name) and returns it, so this can be used as a
+    class decorator.
+
+    Raises:
+        TypeError: viruses must be subclasses of Virus
+        ValueError: virus declares unknown capabilities
+        ValueError: stateless duration viruses must declare a duration
+        ValueError: a different virus is already registered with that name
+    """
+    if not (isinstance(cls, type) and issubclass(cls, Virus)):
+        raise TypeError("viruses must be subclasses of Virus")
+
+    unknown = set(cls.capabilities) - CAPABILITIES
+    if unknown:
+        raise ValueError(f"{cls.__name__} declares unknown capabilities: "
+                         f"{', '.join(sorted(unknown))}")
+
+    if STATELESS_DURATION in cls.capabilities:
+        duration = cls.parameters().get('duration')
+        if not isinstance(duration, int):
+            raise ValueError("stateless duration viruses must declare a "
+                             "duration")
+
+    name = cls.__name__ if name is None else name
+    if _registry.get(name, cls) is not cls:
+        raise ValueError(f"a different virus is already registered as "
+                         f"'{name}'")
+
+    _registry[name] = cls
+    return cls
+
+
+def get_virus(name):
+    """Returns the virus class registered with the given name.
+
+    Raises:
+        KeyError: no virus is registered with that name
+    """
+    return _registry[name]
+
+
+def registered_viruses():
+    """Returns a dict of every registered virus class keyed by name."""
+    return dict(_registry)
+
+
+def load_entry_points(group=ENTRY_POINT_GROUP):
+    """Registers every virus class provided through the given entry point
+    group and returns a list of their names.
+    """
+    names = []
+    for entry_point in metadata.entry_points(group=group):
+        register_virus(entry_point.load(), entry_point.name)
+        names.append(entry_point.name)
+    return names
+
+
+def batch_parameters(viruses):
+    """Returns a list of the parameters of each of the given virus classes
+    for engines that simulate viruses as arrays of remaining durations.
+
+    Raises:
+        ValueError: virus can't be simulated in array form
+    """
+    parameters = []
+    for cls in viruses:
+        if not cls.is_batchable():
+            raise ValueError(f"{cls.__name__} can't be simulated in array "
+                             f"form, only viruses with a stateless duration "
+                             f"that don't target or chain people can")
+        parameters.append(cls.parameters())
+    return parameters
+
+
+for _cls in (Virus, RainbowVirus, ZebraVirus, ImmunisableVirus, ZombieVirus,
+             SnakeVirus):
+    register_virus(_cls)
@@ -0,0 +1,378 @@
+"""
+Static walls, obstacles and named regions within a world.
+
+A Layout is given to a World (World(..., layout=Layout.load('office.txt')))
+and changes how people move and catch viruses:
+
+    walls       line segments people can't walk through
+    obstacles   rectangles people can't walk into, e.g. furniture or pillars
+    regions     named rectangles such as rooms, buildings or zones, each with
+                a multiplier for the chance of catching a virus inside them
+
+Multipliers are relative to each other: a chance of catching a virus can't
+go above 1, and people catch everything they're exposed to by default, so
+everyone's chance is scaled by the largest multiplier above 1 in the layout.
+With the regions below, someone is half as likely to catch a virus in the
+hall as outside of any layout, and 1.5 times as likely in the office as in
+the hall.
+
+People only ever stand in free space, and anyone whose next step would take
+them through a wall or into an obstacle stays where they are and picks a new
+destination instead.
+
+Layouts are loaded from a text file with one item per line, where
+coordinates are in pixels from the centre of the world and blank lines and
+lines starting with # are ignored:
+
+    size 700 500
+    wall -100 -250 -100 -20
+    wall -100 20 -100 250
+    obstacle 150 -40 190 40
+    region office -350 -250 -100 250 1.5
+    region hall -100 -250 350 250
+
+Everything is indexed in a grid of square cells when the layout is created,
+so finding the region a point is in, checking whether a step is blocked and
+picking a random location in free space only look at the items in one or a
+few cells however many items there are.
+"""
+
+import random
+from math import floor
+
+# Number of random locations to try before deciding there's no free space
+_ATTEMPTS = 10000
+
+
+class Region:
+    """A named rectangular area of a world."""
+
+    def __init__(self, name, xmin, ymin, xmax, ymax, multiplier=1.0):
+        """Creates a new region.
+
+        Args:
+            name (str): name of this region
+            xmin, ymin, xmax, ymax (float): corners of this region
+            multiplier (float): how many times more (or less) likely people
+                in this region are to catch a virus
+        """
+        self.name = name
+        self.bounds = (min(xmin, xmax), min(ymin, ymax), max(xmin, xmax),
+                       max(ymin, ymax))
+        self.multiplier = multiplier
+
+    def contains(self, point):
+        """Returns True if the given (x, y) point is inside this region,
+        otherwise returns False.
+        """
+        xmin, ymin, xmax, ymax = self.bounds
+        return xmin <= point[0] <= xmax and ymin <= point[1] <= ymax
+
+    def __repr__(self):
+        return f'Region({self.name!r}, {self.bounds}, {self.multiplier})'
+
+
+class Layout:
+    """The walls, obstacles and regions of a world, indexed in a grid for
+    fast queries.
+    """
+
+    def __init__(self,
+                 width,
+                 height,
+                 walls=(),
+                 obstacles=(),
+                 regions=(),
+                 cell_size=32):
+        """Creates a new layout for a world of the given size.
+
+        Args:
+            width (int): horizontal length of the world in pixels
+            height (int): vertical length of the world in pixels
+            walls (iterable): (x1, y1, x2, y2) line segments
+            obstacles (iterable): (xmin, ymin, xmax, ymax) rectangles
+            regions (iterable): Region instances, where later regions take
+                priority over earlier ones they overlap, e.g. rooms listed
+                after the building they're in
+            cell_size (float): side length of the cells of the grid index
+
+        Raises:
+            ValueError: cell size must be positive
+        """
+        if cell_size <= 0:
+            raise ValueError("cell size must be positive")
+
+        self.size = (width, height)
+        self.walls = [tuple(wall) for wall in walls]
+        self.obstacles = [(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+                          for x1, y1, x2, y2 in obstacles]
+        self.regions = list(regions)
+        self.cell_size = cell_size
+
+        # Multipliers are scaled by this so none of them is above 1
+        self.max_multiplier = max(
+            [1.0] + [region.multiplier for region in self.regions])
+
+        # Edges of the world
+        self.bounds = (-(width // 2), -(height // 2), width - width // 2,
+                       height - height // 2)
+
+        self.__index()
+
+    @classmethod
+    def parse(cls, text, cell_size=32):
+        """Returns a layout made from the given text in the layout file
+        format.
+
+        Raises:
+            ValueError: the text isn't a valid layout
+        """
+        size = None
+        walls, obstacles, regions = [], [], []
+        for number, line in enumerate(text.splitlines(), 1):
+            words = line.split()
+            if not words or words[0].startswith('#'):
+                continue
+
+            kind, values = words[0], words[1:]
+            try:
+                if kind == 'size' and len(values) == 2:
+                    size = tuple(int(value) for value in values)
+                elif kind == 'wall' and len(values) == 4:
+                    walls.append(tuple(float(value) for value in values))
+                elif kind == 'obstacle' and len(values) == 4:
+                    obstacles.append(tuple(float(value) for value in values))
+                elif kind == 'region' and len(values) in (5, 6):
+                    regions.append(
+                        Region(values[0], *(float(value)
+                                            for value in values[1:])))
+                else:
+                    raise ValueError
+            except ValueError:
+                raise ValueError(f"line {number} isn't a valid layout item: "
+                                 f"{line.strip()!r}") from None
+
+        if size is None:
+            raise ValueError("layout doesn't give the size of the world")
+
+        return cls(*size, walls, obstacles, regions, cell_size)
+
+    @classmethod
+    def load(cls, path, cell_size=32):
+        """Returns the layout in the given layout file.
+
+        Raises:
+            ValueError: the file isn't a valid layout
+        """
+        with open(path) as file:
+            return cls.parse(file.read(), cell_size)
+
+    def __cell(self, x, y):
+        """Returns the cell of the grid index containing the given point."""
+        return floor(x / self.cell_size), floor(y / self.cell_size)
+
+    def __cells(self, xmin, ymin, xmax, ymax):
+        """Returns every cell of the grid index overlapping the given box."""
+        cxmin, cymin = self.__cell(xmin, ymin)
+        cxmax, cymax = self.__cell(xmax, ymax)
+        return [(cx, cy) for cx in range(cxmin, cxmax + 1)
+                for cy in range(cymin, cymax + 1)]
+
+    def __index(self):
+        """Adds every wall, obstacle and region to the cells of the grid
+        index they overlap, and finds the cells with any free space.
+        """
+        self.wall_cells = {}
+        for i, (x1, y1, x2, y2) in enumerate(self.walls):
+            for cell in self.__cells(min(x1, x2), min(y1, y2), max(x1, x2),
+                                     max(y1, y2)):
+                self.wall_cells.setdefault(cell, []).append(i)
+
+        self.obstacle_cells = {}
+        covered = set()
+        size = self.cell_size
+        for i, (xmin, ymin, xmax, ymax) in enumerate(self.obstacles):
+            for cx, cy in self.__cells(xmin, ymin, xmax, ymax):
+                self.obstacle_cells.setdefault((cx, cy), []).append(i)
+                if (xmin <= cx * size and (cx + 1) * size <= xmax
+                        and ymin <= cy * size and (cy + 1) * size <= ymax):
+                    covered.add((cx, cy))
+
+        # Latest regions first, as they take priority
+        self.region_cells = {}
+        for region in reversed(self.regions):
+            for cell in self.__cells(*region.bounds):
+                self.region_cells.setdefault(cell, []).append(region)
+
+        # Random locations are picked from cells that aren't entirely inside
+        # an obstacle, all of which are the same size
+        self.free_cells = [
+            cell for cell in self.__cells(*self.bounds) if cell not in covered
+        ]
+
+    def region_at(self, point):
+        """Returns the region containing the given (x, y) point, or None if
+        it isn't in a region.
+        """
+        for region in self.region_cells.get(self.__cell(*point), ()):
+            if region.contains(point):
+                return region
+        return None
+
+    def multiplier_at(self, point):
+        """Returns the multiplier for the chance of catching a virus at the
+        given (x, y) point, which is 1 outside of any region.
+        """
+        region = self.region_at(point)
+        return 1.0 if region is None else region.multiplier
+
+    def relative_multiplier_at(self, point):
+        """Returns the multiplier at the given (x, y) point divided by the
+        largest multiplier in this layout if that's above 1, so it's never
+        more than 1 and regions with multipliers above 1 still raise the
+        chance of catching a virus compared to everywhere else.
+        """
+        return self.multiplier_at(point) / self.max_multiplier
+
+    def is_free(self, point, radius=0):
+        """Returns True if someone with the given radius can stand at the
+        given (x, y) point without overlapping a wall, an obstacle or the
+        edge of the world, otherwise returns False.
+        """
+        x, y = point
+        xmin, ymin, xmax, ymax = self.bounds
+        if not (xmin + radius <= x <= xmax - radius
+                and ymin + radius <= y <= ymax - radius):
+            return False
+
+        for cell in self.__cells(x - radius, y - radius, x + radius,
+                                 y + radius):
+            for i in self.obstacle_cells.get(cell, ()):
+                if _rect_distance_squared(point,
+                                          self.obstacles[i]) <= radius**2:
+                    return False
+            for i in self.wall_cells.get(cell, ()):
+                if _segment_distance_squared(point,
+                                             self.walls[i]) < radius**2:
+                    return False
+        return True
+
+    def blocks(self, start, end, radius=0):
+        """Returns True if someone with the given radius moving in a straight
+        line from start to end would go through a wall or end up overlapping
+        an obstacle, otherwise returns False.
+
+        Steps are expected to be short compared to the layout, as only the
+        cells around the step are checked.
+        """
+        (x1, y1), (x2, y2) = start, end
+        if not self.is_free(end, radius):
+            return True
+
+        for cell in self.__cells(min(x1, x2), min(y1, y2), max(x1, x2),
+                                 max(y1, y2)):
+            for i in self.wall_cells.get(cell, ()):
+                wall = self.walls[i]
+                if _segments_intersect(start, end, wall[:2], wall[2:]):
+                    return True
+        return False
+
+    def random_location(self, radius=0):
+        """Returns a random (x, y) location in free space where someone with
+        the given radius can stand, drawn using the random module.
+
+        Raises:
+            ValueError: there's no free space for someone with that radius
+        """
+        size = self.cell_size
+        for _ in range(_ATTEMPTS):
+            cx, cy = random.choice(self.free_cells)
+            point = (random.uniform(cx * size, (cx + 1) * size),
+                     random.uniform(cy * size, (cy + 1) * size))
+            if self.is_free(point, radius):
+                return point
+        raise ValueError(f"there's no free space for someone with a radius "
+                         f"of {radius}")
+
+    def draw(self, viewport=None):
+        """Draws the walls, obstacles and regions of this layout on the
+        default turtle screen, or the ones in view in the given viewport.
+        """
+        from virus_draw import draw_rect, draw_segment, draw_text
+
+        if viewport is None:
+            bounds, zoom = self.bounds, 1
+            to_screen = tuple
+        else:
+            bounds, zoom = viewport.bounds(), viewport.zoom
+            to_screen = viewport.to_screen
+
+        def in_view(xmin, ymin, xmax, ymax):
+            return (xmin <= bounds[2] and bounds[0] <= xmax
+                    and ymin <= bounds[3] and bounds[1] <= ymax)
+
+        for region in self.regions:
+            if in_view(*region.bounds):
+                xmin, ymin, xmax, ymax = region.bounds
+                x, y = to_screen((xmin, ymin))
+                draw_text(x + 2, y + 2, region.name, colour='grey')
+        for xmin, ymin, xmax, ymax in self.obstacles:
+            if in_view(xmin, ymin, xmax, ymax):
+                x, y = to_screen((xmin, ymax))
+                draw_rect(x, y, (xmax - xmin) * zoom, (ymax - ymin) * zoom)
+        for x1, y1, x2, y2 in self.walls:
+            if in_view(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)):
+                draw_segment(to_screen((x1, y1)), to_screen((x2, y2)))
+
+
+def _rect_distance_squared(point, rect):
+    """Returns the squared distance from the given point to the nearest point
+    in the given (xmin, ymin, xmax, ymax) rectangle, 0 if it's inside.
+    """
+    x, y = point
+    xmin, ymin, xmax, ymax = rect
+    dx = max(xmin - x, 0, x - xmax)
+    dy = max(ymin - y, 0, y - ymax)
+    return dx * dx + dy * dy
+
+
+def _segment_distance_squared(point, segment):
+    """Returns the squared distance from the given point to the nearest point
+    on the given (x1, y1, x2, y2) line segment.
+    """
+    x, y = point
+    x1, y1, x2, y2 = segment
+    dx, dy = x2 - x1, y2 - y1
+    length_squared = dx * dx + dy * dy
+    if length_squared:
+        t = ((x - x1) * dx + (y - y1) * dy) / length_squared
+        t = min(max(t, 0), 1)
+    else:
+        t = 0
+    nx, ny = x1 + dx * t - x, y1 + dy * t - y
+    return nx * nx + ny * ny
+
+
+def _segments_intersect(a, b, c, d):
+    """Returns True if line segment ab touches or crosses line segment cd,
+    otherwise returns False.
+    """
+
+    def orientation(p, q, r):
+        value = (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+        return (value > 0) - (value < 0)
+
+    def on_segment(p, q, r):
+        return (min(p[0], q[0]) <= r[0] <= max(p[0], q[0])
+                and min(p[1], q[1]) <= r[1] <= max(p[1], q[1]))
+
+    o1, o2 = orientation(a, b, c), orientation(a, b, d)
+    o3, o4 = orientation(c, d, a), orientation(c, d, b)
+    if o1 != o2 and o3 != o4:
+        return True
+
+    # Collinear segments only intersect if they overlap
+    return ((o1 == 0 and on_segment(a, b, c))
+            or (o2 == 0 and on_segment(a, b, d))
+            or (o3 == 0 and on_segment(c, d, a))
+            or (o4 == 0 and on_segment(c, d, b)))
@@ -0,0 +1,300 @@
+"""
+Headless runner for the virus simulation.
+
+Advances a World as an asyncio task so that long simulations can be run on
+machines without a display. The running simulation is steered over a local
+TCP socket using a line based protocol, where each command is a single line
+and each reply is a single line of JSON:
+
+    pause               stops advancing the simulation
+    resume              starts advancing the simulation again
+    infect [n]          infects n (default 1) random people
+    cure                cures all people
+    reset               replaces the world with a new one
+    speed <hours/sec>   limits how fast the simulation runs, 0 for no limit
+    status              replies with the metrics for the current hour
+    subscribe           streams the metrics of every hour until disconnected
+    quit                closes the connection
+
+Runs can be given stop conditions (see virus_stop), in which case the
+simulation pauses as soon as one is met and the metrics report the hour it
+stopped at and why.
+
+Usage:
+    python virus_server.py --port 8765 --people 1000
+"""
+
+import argparse
+import asyncio
+import json
+
+from virus_sim import World
+from virus_stop import check_conditions, default_conditions
+
+
+class SimulationRunner:
+    """Runs a world in an asyncio task and publishes metrics for each hour to
+    any subscribers.
+    """
+
+    def __init__(self, width=700, height=500, n=200, viruses=None, speed=0,
+                 queue_size=100, conditions=()):
+        """Creates a new runner for a world with the given attributes. The
+        world is paused until resume is called.
+
+        Args:
+            width (int): horizontal length of the world in pixels
+            height (int): vertical length of the world in pixels
+            n (int): number of people in the world
+            viruses (iterable): virus classes used in the world, if this is
+                None the world's default viruses are used
+            speed (float): maximum number of hours simulated per second, 0 for
+                no limit
+            queue_size (int): maximum number of unread metrics that are kept
+                for each subscriber, older metrics are dropped once exceeded
+            conditions (iterable): StopConditions which pause the simulation
+                once met
+        """
+        self.width = width
+        self.height = height
+        self.n = n
+        self.viruses = viruses
+        self.queue_size = queue_size
+        self.conditions = list(conditions)
+        self.stopped = None  # (hour, reason) the last stop condition was met
+        self.running = False
+        self.subscribers = set()
+        self.world = None
+        self.set_speed(speed)
+        self.reset()
+
+    def reset(self):
+        """Replaces the current world with a new one."""
+        if self.viruses is None:
+            self.world = World(self.width, self.height, self.n)
+        else:
+            self.world = World(self.width, self.height, self.n, self.viruses)
+        self.stopped = None
+        for condition in self.conditions:
+            condition.reset()
+
+    def pause(self):
+        """Stops advancing the simulation."""
+        self.running = False
+
+    def resume(self):
+        """Starts advancing the simulation."""
+        self.running = True
+        self.stopped = None
+        for condition in self.conditions:
+            condition.reset()
+
+    def infect(self, n=1):
+        """Infects n random people in the world."""
+        for _ in range(n):
+            self.world.infect_person()
+
+    def cure(self):
+        """Cures all people in the world."""
+        self.world.cure_all()
+
+    def set_speed(self, speed):
+        """Limits the simulation to the given number of hours per second.
+
+        Raises:
+            ValueError: speed must not be negative
+        """
+        if speed < 0:
+            raise ValueError("speed must not be negative")
+        self.speed = speed
+        self.delay = 1 / speed if speed else 0
+
+    def metrics(self):
+        """Returns a dict of metrics describing the current hour."""
+        counts = {cls.__name__: 0 for cls in self.world.viruses}
+        infected = 0
+        for person in self.world.people:
+            if person.is_infected():
+                infected += 1
+            for virus in person.viruses:
+                name = virus.__class__.__name__
+                counts[name] = counts.get(name, 0) + 1
+
+        return {
+            'hours': self.world.hours,
+            'people': len(self.world.people),
+            'infected': infected,
+            'viruses': counts,
+            'running': self.running,
+            'stopped': self.stopped and {'hours': self.stopped[0],
+                                         'reason': self.stopped[1]},
+        }
+
+    def subscribe(self):
+        """Returns a queue which will receive the metrics of every simulated
+        hour until it's unsubscribed.
+        """
+        queue = asyncio.Queue(self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        """Stops sending metrics to the given queue."""
+        self.subscribers.discard(queue)
+
+    def publish(self, metrics):
+        """Sends the given metrics to every subscriber without waiting.
+
+        Slow subscribers lose their oldest metrics rather than holding up the
+        simulation.
+        """
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(metrics)
+
+    async def run(self, hours=None):
+        """Advances the simulation while it's running, publishing metrics
+        after every hour.
+
+        Args:
+            hours (int): stop after this many hours have been simulated, if
+                this is None the simulation runs until cancelled
+        """
+        loop = asyncio.get_running_loop()
+        simulated = 0
+
+        while hours is None or simulated < hours:
+            if not self.running:
+                # Nothing to do, so check again shortly
+                await asyncio.sleep(0.05)
+                continue
+
+            start = loop.time()
+            self.world.simulate()
+            simulated += 1
+            if self.conditions:
+                met = check_conditions(self.world, self.world.count_infected(),
+                                       self.conditions)
+                if met is not None:
+                    self.stopped = (self.world.hours, met.reason)
+                    self.pause()
+            if self.subscribers:
+                self.publish(self.metrics())
+
+            # Always yield so that commands are handled between hours
+            await asyncio.sleep(max(0, self.delay - (loop.time() - start)))
+
+    def handle_command(self, line):
+        """Applies the given command and returns a dict to reply with.
+
+        Raises:
+            ValueError: unknown command or invalid arguments
+        """
+        command, *args = line.split()
+
+        if command == 'pause':
+            self.pause()
+        elif command == 'resume':
+            self.resume()
+        elif command == 'infect':
+            self.infect(int(args[0]) if args else 1)
+        elif command == 'cure':
+            self.cure()
+        elif command == 'reset':
+            self.reset()
+        elif command == 'speed':
+            if not args:
+                raise ValueError("speed requires a number of hours/sec")
+            self.set_speed(float(args[0]))
+        elif command != 'status':
+            raise ValueError(f"unknown command '{command}'")
+
+        return self.metrics()
+
+    async def stream_metrics(self, reader, send):
+        """Sends the metrics of every simulated hour using the given send
+        coroutine until the client disconnects.
+        """
+        queue = self.subscribe()
+        closed = asyncio.ensure_future(reader.read())
+        try:
+            while not closed.done():
+                metrics = asyncio.ensure_future(queue.get())
+                await asyncio.wait({metrics, closed},
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if metrics.done():
+                    await send(metrics.result())
+                else:
+                    metrics.cancel()
+        finally:
+            closed.cancel()
+            self.unsubscribe(queue)
+
+    async def handle_client(self, reader, writer):
+        """Reads commands from a connected client and replies to each one."""
+
+        async def send(message):
+            writer.write(json.dumps(message).encode() + b'\n')
+            await writer.drain()
+
+        try:
+            while True:
+                line = (await reader.readline()).decode().strip()
+                if not line or line == 'quit':
+                    break
+
+                if line == 'subscribe':
+                    await self.stream_metrics(reader, send)
+                    break
+
+                try:
+                    await send(self.handle_command(line))
+                except (ValueError, IndexError) as error:
+                    await send({'error': str(error)})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        """Runs the simulation while accepting commands on the given address
+        until cancelled.
+        """
+        server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.run())
+
+
+def main():
+    """Parses command line arguments and serves a new simulation."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--width', type=int, default=700)
+    parser.add_argument('--height', type=int, default=500)
+    parser.add_argument('--people', type=int, default=200)
+    parser.add_argument('--speed', type=float, default=0,
+                        help='hours per second, 0 for no limit')
+    parser.add_argument('--start', action='store_true',
+                        help='start simulating without waiting for resume')
+    parser.add_argument('--stop', action='store_true',
+                        help='pause once nobody is infected or everyone is '
+                        'infected for good')
+    args = parser.parse_args()
+
+    runner = SimulationRunner(args.width, args.height, args.people,
+                              speed=args.speed,
+                              conditions=default_conditions() if args.stop
+                              else ())
+    if args.start:
+        runner.resume()
+
+    try:
+        asyncio.run(runner.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+Mirrors a World's population into shared memory for other processes.
+
+Renderers, metrics collectors and sweep aggregators running in helper
+processes can attach to the block by name and read the current hour without
+anything being pickled or copied between processes.
+
+Layout of the block (native byte order, capacity is the maximum number of
+people the block can hold):
+
+    offset  type                   contents
+    0       uint64                 sequence, odd while an hour is being written
+    8       uint64                 capacity
+    16      uint64                 n, number of people in the current hour
+    24      uint64                 hours simulated in the world
+    32      uint64                 number of viruses
+    40      uint64                 length of the virus names in bytes
+    48      char[1024]             virus class names, separated by commas
+    1072    float64[capacity]      x location of each person
+    ...     float64[capacity]      y location of each person
+    ...     float32[capacity * 3]  red, green, blue colour of each person
+    ...     uint32[capacity]       virus mask of each person, bit i is set if
+                                   the person has the i-th virus in the names
+
+Readers get consistent snapshots using the sequence counter: it's made odd
+before the writer changes anything and even again afterwards, so a read that
+starts and ends on the same even sequence saw a single complete hour.
+"""
+
+import multiprocessing
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+HEADER = struct.Struct('6Q')
+NAMES_SIZE = 1024
+DATA_OFFSET = HEADER.size + NAMES_SIZE
+
+# Names of the blocks created by this process
+_created = set()
+
+
+def virus_mask(person, bits):
+    """Returns a bitmask of the viruses the given person has, where bits is a
+    dict mapping each virus class to its bit.
+    """
+    mask = 0
+    for virus in person.viruses:
+        mask |= bits.get(virus.__class__, 0)
+    return mask
+
+
+def virus_bits(viruses):
+    """Returns a dict mapping each of the given virus classes to a bit in the
+    order they're given.
+
+    Raises:
+        ValueError: can't store more than 32 viruses in a mask
+    """
+    if len(viruses) > 32:
+        raise ValueError("can't store more than 32 viruses in a mask")
+    return {cls: 1 << i for i, cls in enumerate(viruses)}
+
+
+def _views(buf, capacity, n):
+    """Returns a dict of memoryviews of the first n people of each array in
+    the given block.
+    """
+    views = {}
+    offset = DATA_OFFSET
+    for name, fmt, itemsize, width in (('x', 'd', 8, 1), ('y', 'd', 8, 1),
+                                        ('colour', 'f', 4, 3),
+                                        ('mask', 'I', 4, 1)):
+        end = offset + capacity * itemsize * width
+        views[name] = buf[offset:end].cast(fmt)[:n * width]
+        offset = end
+    return views
+
+
+def _attach(name):
+    """Returns the existing shared memory block with the given name without
+    letting this process destroy it on exit.
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+
+    shm = shared_memory.SharedMemory(name)
+
+    # A process which wasn't started by multiprocessing has its own resource
+    # tracker, which would otherwise unlink the block when this process exits
+    if multiprocessing.parent_process() is None and name not in _created:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+class SharedPopulation:
+    """Writes the locations, colours and viruses of a world's people to a
+    shared memory block after every hour.
+    """
+
+    def __init__(self, world, capacity=None, name=None):
+        """Creates a new shared memory block for the given world and writes
+        the world's current state to it.
+
+        Args:
+            world (World): world whose people will be shared
+            capacity (int): maximum number of people the block can hold,
+                defaults to the number of people in the world
+            name (str): name of the block, a unique name is chosen if this is
+                None
+
+        Raises:
+            ValueError: can't store more than 32 viruses in a mask
+            ValueError: virus names don't fit in the header
+        """
+        self.world = world
+        self.capacity = len(world.people) if capacity is None else capacity
+        self.bits = virus_bits(world.viruses)
+
+        names = ','.join(cls.__name__ for cls in world.viruses).encode()
+        if len(names) > NAMES_SIZE:
+            raise ValueError("virus names don't fit in the header")
+
+        size = DATA_OFFSET + self.capacity * (8 + 8 + 4 * 3 + 4)
+        self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self.name = self.shm.name
+        self.sequence = 0
+        _created.add(self.name)
+
+        self.shm.buf[HEADER.size:HEADER.size + len(names)] = names
+        self.__write_header(len(world.people), len(names))
+        self.views = _views(self.shm.buf, self.capacity, self.capacity)
+        self.publish(world)
+
+    def attach(self):
+        """Publishes the world's state at the end of every hour from now on,
+        using the world's virus update methods.
+        """
+        self.world.on_update_methods.append(self.publish)
+
+    def detach(self):
+        """Stops publishing the world's state every hour."""
+        if self.publish in self.world.on_update_methods:
+            self.world.on_update_methods.remove(self.publish)
+
+    def publish(self, world):
+        """Writes the current state of the given world to the block.
+
+        Raises:
+            ValueError: world has more people than the block can hold
+        """
+        people = world.people
+        if len(people) > self.capacity:
+            raise ValueError("world has more people than the block can hold")
+
+        self.sequence += 1  # Odd while writing
+        struct.pack_into('Q', self.shm.buf, 0, self.sequence)
+
+        x, y = self.views['x'], self.views['y']
+        colour, mask = self.views['colour'], self.views['mask']
+        for i, person in enumerate(people):
+            x[i], y[i] = person.location
+            colour[i * 3], colour[i * 3 + 1], colour[i * 3 + 2] = \
+                person.get_colour()
+            mask[i] = virus_mask(person, self.bits)
+
+        self.sequence += 1
+        self.__write_header(len(people))
+
+    def __write_header(self, n, names_length=None):
+        """Writes the header using the current sequence."""
+        if names_length is None:
+            names_length = HEADER.unpack_from(self.shm.buf)[5]
+        HEADER.pack_into(self.shm.buf, 0, self.sequence, self.capacity, n,
+                         self.world.hours, len(self.bits), names_length)
+
+    def close(self):
+        """Stops publishing and destroys the shared memory block."""
+        self.detach()
+        for view in self.views.values():
+            view.release()
+        self.shm.close()
+        self.shm.unlink()
+        _created.discard(self.name)
+
+
+class SharedPopulationReader:
+    """Reads the people published by a SharedPopulation in another
+    process.
+    """
+
+    def __init__(self, name):
+        """Attaches to the shared memory block with the given name."""
+        self.shm = _attach(name)
+        header = HEADER.unpack_from(self.shm.buf)
+        self.capacity = header[1]
+        names = bytes(self.shm.buf[HEADER.size:HEADER.size + header[5]])
+        self.virus_names = names.decode().split(',') if names else []
+
+    def header(self):
+        """Returns a tuple of the sequence, number of people and hours
+        currently in the block.
+        """
+        sequence, _, n, hours, _, _ = HEADER.unpack_from(self.shm.buf)
+        return sequence, n, hours
+
+    def views(self):
+        """Returns a dict of zero-copy memoryviews of the 'x', 'y', 'colour'
+        and 'mask' arrays for the people currently in the block.
+
+        Views can be wrapped with numpy.frombuffer without copying. They're
+        only consistent if checked with read or the sequence.
+        """
+        _, n, _ = self.header()
+        return _views(self.shm.buf, self.capacity, n)
+
+    def read(self, function, retries=1000):
+        """Calls function with the current views and returns a tuple of the
+        hours and the function's result, retrying until the function sees a
+        single complete hour.
+
+        The function shouldn't keep references to the views, they're released
+        once it returns.
+
+        Raises:
+            RuntimeError: couldn't get a consistent read within retries
+        """
+        for _ in range(retries):
+            sequence, n, hours = self.header()
+            if sequence % 2:
+                continue  # An hour is being written
+
+            views = _views(self.shm.buf, self.capacity, n)
+            try:
+                result = function(views)
+            finally:
+                for view in views.values():
+                    view.release()
+
+            if self.header()[0] == sequence:
+                return hours, result
+
+        raise RuntimeError("couldn't get a consistent read within retries")
+
+    def snapshot(self):
+        """Returns a dict containing a copy of the current hour's 'hours',
+        'x', 'y', 'colour' and 'mask' lists.
+        """
+        hours, snapshot = self.read(
+            lambda views: {name: view.tolist()
+                           for name, view in views.items()})
+        snapshot['hours'] = hours
+        return snapshot
+
+    def close(self):
+        """Detaches from the shared memory block."""
+        self.shm.close()
@@ -0,0 +1,1715 @@
+"""
+Simulation core for the virus simulator.
+
+Contains everything needed to simulate a world without a display. Importing
+this module doesn't import turtle, which is only loaded when something is
+drawn, so batch workers and tests can import it cheaply on machines without
+a display.
+"""
+
+import random
+from math import ceil
+from collections import OrderedDict
+
+# Capabilities a virus class can declare to describe how it behaves, which
+# lets engines decide whether they can simulate it without instances:
+# - STATELESS_DURATION: an infection is fully described by its remaining
+#   duration, and the class' parameters() says what that duration starts at
+#   (only batchable if the class also keeps Virus.progress and is_cured)
+# - SYNCHRONISED_COLOUR: every instance's colour is driven by class state that
+#   changes in on_world_update, and doesn't affect the simulation
+# - TARGETING: people infected by this virus are given destinations that
+#   depend on the rest of the world in on_world_update
+# - CHAINING: people infected by this virus follow each other in the order
+#   they were infected
+STATELESS_DURATION = 'stateless-duration'
+SYNCHRONISED_COLOUR = 'synchronised-colour'
+TARGETING = 'targeting'
+CHAINING = 'chaining'
+CAPABILITIES = frozenset(
+    (STATELESS_DURATION, SYNCHRONISED_COLOUR, TARGETING, CHAINING))
+
+
+class EfficientCollision:
+    """Implements a spatial hash table to perform collision detection."""
+
+    def __init__(self, cell_size):
+        """Initializes an empty spatial hash table with square cells using
+        cell_size as their side length.
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def hash(self, location):
+        """Returns the cell location of each coordinate in the given location.
+
+        Args:
+            location (list/tuple): coordinates along each dimensions
+        """
+        return [int(coord / self.cell_size) for coord in location]
+
+    def get_bounding_box(self, person):
+        """Returns the axis-aligned bounding box for the given person
+        represented by the min and max coordinates along the x and y axes.
+        """
+        x, y = person.location
+        radius = person.radius
+
+        xmin, xmax = int(x - radius), int(ceil(x + radius))
+        ymin, ymax = int(y - radius), int(ceil(y + radius))
+
+        return xmin, ymin, xmax, ymax
+
+    def add(self, person):
+        """Adds the given person to all cells within their axis-aligned bounding box.
+        """
+        xmin, ymin, xmax, ymax = self.hash(self.get_bounding_box(person))
+
+        for x in range(xmin, xmax + 1):
+            for y in range(ymin, ymax + 1):
+                if (x, y) in self.cells:
+                    self.cells[(x, y)].append(person)
+                else:
+                    self.cells[(x, y)] = [person]
+
+    def update(self, people):
+        """Clears the hash table and then adds the given people to it."""
+        self.cells.clear()
+        for person in people:
+            self.add(person)
+
+    def nearby(self, person):
+        """Returns a list of the people in the hash table's cell containing
+        the given person's location.
+        """
+        return self.cells[tuple(self.hash(person.location))]
+
+    def within(self, xmin, ymin, xmax, ymax):
+        """Returns a list of the people in the hash table whose bounding box
+        shares a cell with the given box.
+        """
+        cxmin, cymin = self.hash((xmin, ymin))
+        cxmax, cymax = self.hash((xmax, ymax))
+
+        # Go through whichever is smaller, the cells in the box or the cells
+        # in the table
+        if (cxmax - cxmin + 1) * (cymax - cymin + 1) > len(self.cells):
+            cells = [
+                people for (x, y), people in self.cells.items()
+                if cxmin <= x <= cxmax and cymin <= y <= cymax
+            ]
+        else:
+            cells = [
+                self.cells[(x, y)] for x in range(cxmin, cxmax + 1)
+                for y in range(cymin, cymax + 1) if (x, y) in self.cells
+            ]
+
+        # People are in every cell their bounding box overlaps
+        found = {}
+        for people in cells:
+            for person in people:
+                found[id(person)] = person
+        return list(found.values())
+
+    def contact_pairs(self, people):
+        """Returns a set of (i, j) pairs, where i < j, of the indices of the
+        given people who are in contact with each other.
+
+        When nobody's radius is more than half a cell, people in contact are
+        in the same or neighbouring cells, so each person is put in the one
+        cell containing their location and checked against their own cell
+        and half of its neighbours (the other half check back). Otherwise
+        people are put in every cell their bounding box overlaps. This
+        doesn't change the hash table.
+        """
+        if not people:
+            return set()
+
+        radii = [person.radius for person in people]
+        if 2 * max(radii) > self.cell_size:
+            return self.__box_contact_pairs(people)
+
+        # Cells are keyed by a single int, column * 2**32 + row, which is
+        # quicker to make and look up than a tuple, and whose neighbours are
+        # found by adding the offsets below
+        size = self.cell_size
+        xs, ys = [], []
+        cells = {}
+        for i, (x, y) in enumerate(person.location for person in people):
+            xs.append(x)
+            ys.append(y)
+            cell = (int(x // size) << 32) + int(y // size)
+            if cell in cells:
+                cells[cell].append(i)
+            else:
+                cells[cell] = [i]
+
+        offsets = [(dx << 32) + dy
+                   for dx, dy in MultiLevelGrid.HALF_NEIGHBOURS]
+        pairs = set()
+        for cell, indices in cells.items():
+            others = indices[1:]
+            for offset in offsets:
+                neighbours = cells.get(cell + offset)
+                if neighbours:
+                    others += neighbours
+
+            # Indices were added in order, so i < j within each cell, while
+            # neighbours can be either way round
+            for k, i in enumerate(indices):
+                x, y, radius = xs[i], ys[i], radii[i]
+                for j in others[k:]:
+                    reach = radius + radii[j]
+                    dx = xs[j] - x
+                    dy = ys[j] - y
+                    if dx * dx + dy * dy <= reach * reach:
+                        pairs.add((i, j) if i < j else (j, i))
+
+        return pairs
+
+    def __box_contact_pairs(self, people):
+        """Returns the same as contact_pairs by putting people in every cell
+        their bounding box overlaps, as people in contact have overlapping
+        bounding boxes, so they always share at least one cell.
+        """
+        cells = {}
+        for i, person in enumerate(people):
+            xmin, ymin, xmax, ymax = self.hash(self.get_bounding_box(person))
+            for x in range(xmin, xmax + 1):
+                for y in range(ymin, ymax + 1):
+                    if (x, y) in cells:
+                        cells[(x, y)].append(i)
+                    else:
+                        cells[(x, y)] = [i]
+
+        # Indices were added in order, so i < j within each cell
+        pairs = set()
+        for indices in cells.values():
+            for k, i in enumerate(indices):
+                person = people[i]
+                for j in indices[k + 1:]:
+                    if (i, j) not in pairs and person.collides(people[j]):
+                        pairs.add((i, j))
+
+        return pairs
+
+
+class MultiLevelGrid:
+    """Implements a hierarchy of spatial hash tables to perform collision
+    detection between people of different sizes.
+
+    Each level has cells twice as wide as the level below it, and each person
+    is added to the one cell containing their location on the lowest level
+    whose cells are at least as wide as they are. Big people don't fill lots
+    of small cells and small people don't share big cells with lots of
+    others, so this stays efficient however much people's sizes vary.
+    """
+
+    # Cells checked against each cell on the same level. Only half of the
+    # neighbours are needed, as the other half check back
+    HALF_NEIGHBOURS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+    def __init__(self, cell_size):
+        """Initializes an empty table whose lowest level has square cells
+        using cell_size as their side length. Everyone no wider than this
+        shares the lowest level.
+        """
+        self.cell_size = cell_size
+        self.levels = []
+
+    def level(self, radius):
+        """Returns the lowest level whose cells are at least as wide as a
+        person with the given radius.
+        """
+        level, size = 0, self.cell_size
+        while size < radius * 2:
+            level, size = level + 1, size * 2
+        return level
+
+    def hash(self, location, level):
+        """Returns the cell on the given level containing the given (x, y)
+        location.
+        """
+        size = self.cell_size * 2**level
+        return int(location[0] // size), int(location[1] // size)
+
+    def add(self, person):
+        """Adds the given person to the cell containing their location on
+        their level.
+        """
+        level = self.level(person.radius)
+        while len(self.levels) <= level:
+            self.levels.append({})
+
+        cell = self.hash(person.location, level)
+        cells = self.levels[level]
+        if cell in cells:
+            cells[cell].append(person)
+        else:
+            cells[cell] = [person]
+
+    def update(self, people):
+        """Clears the table and then adds the given people to it."""
+        self.levels = []
+        for person in people:
+            self.add(person)
+
+    def __cells_within(self, location, reach, level):
+        """Returns the cells on the given level within reach of the given
+        location.
+        """
+        x, y = location
+        xmin, ymin = self.hash((x - reach, y - reach), level)
+        xmax, ymax = self.hash((x + reach, y + reach), level)
+        return [(cx, cy) for cx in range(xmin, xmax + 1)
+                for cy in range(ymin, ymax + 1)]
+
+    def nearby(self, person):
+        """Returns a list of the people in the table who could be in contact
+        with the given person.
+        """
+        people = []
+        for level, cells in enumerate(self.levels):
+            # Nobody on this level is wider than its cells
+            reach = person.radius + self.cell_size * 2**level / 2
+            for cell in self.__cells_within(person.location, reach, level):
+                people += cells.get(cell, ())
+        return people
+
+    def within(self, xmin, ymin, xmax, ymax):
+        """Returns a list of the people in the table who could overlap the
+        given box.
+        """
+        people = []
+        for level, cells in enumerate(self.levels):
+            # Nobody on this level sticks out more than half a cell
+            margin = self.cell_size * 2**level / 2
+            cxmin, cymin = self.hash((xmin - margin, ymin - margin), level)
+            cxmax, cymax = self.hash((xmax + margin, ymax + margin), level)
+            if (cxmax - cxmin + 1) * (cymax - cymin + 1) > len(cells):
+                for (x, y), found in cells.items():
+                    if cxmin <= x <= cxmax and cymin <= y <= cymax:
+                        people += found
+            else:
+                for x in range(cxmin, cxmax + 1):
+                    for y in range(cymin, cymax + 1):
+                        people += cells.get((x, y), ())
+        return people
+
+    def contact_pairs(self, people):
+        """Returns a set of (i, j) pairs, where i < j, of the indices of the
+        given people who are in contact with each other.
+
+        People on the same level are checked against their own and
+        neighbouring cells, and against the cells within reach of their cell
+        on every other level. This doesn't change the table.
+        """
+        levels = {}
+        widest = {}
+        for i, person in enumerate(people):
+            level = self.level(person.radius)
+            cells = levels.setdefault(level, {})
+            widest[level] = max(widest.get(level, 0), person.radius)
+            cell = self.hash(person.location, level)
+            if cell in cells:
+                cells[cell].append(i)
+            else:
+                cells[cell] = [i]
+
+        xs = [person.location[0] for person in people]
+        ys = [person.location[1] for person in people]
+        radii = [person.radius for person in people]
+        pairs = set()
+
+        def check(indices, others):
+            """Adds every pair of one of indices and one of others which are
+            in contact.
+            """
+            for i in indices:
+                x, y, radius = xs[i], ys[i], radii[i]
+                for j in others:
+                    reach = radius + radii[j]
+                    dx = xs[j] - x
+                    dy = ys[j] - y
+                    if dx * dx + dy * dy <= reach * reach:
+                        pairs.add((i, j) if i < j else (j, i))
+
+        def check_across(level, other_level):
+            """Checks everyone on one level against everyone on the other
+            level within reach, going through the cells of the first.
+            """
+            size = self.cell_size * 2**level
+            reach = widest[level] + widest[other_level]
+            other_cells = levels[other_level]
+            for (cx, cy), indices in levels[level].items():
+                xmin, ymin = self.hash(
+                    (cx * size - reach, cy * size - reach), other_level)
+                xmax, ymax = self.hash(
+                    ((cx + 1) * size + reach, (cy + 1) * size + reach),
+                    other_level)
+                others = []
+                for x in range(xmin, xmax + 1):
+                    for y in range(ymin, ymax + 1):
+                        others += other_cells.get((x, y), ())
+                if others:
+                    check(indices, others)
+
+        def lookups(level, other_level):
+            """Returns roughly how many cells check_across looks up."""
+            reach = widest[level] + widest[other_level]
+            width = (self.cell_size * 2**level + 2 * reach) / \
+                (self.cell_size * 2**other_level) + 1
+            return len(levels[level]) * width * width
+
+        order = sorted(levels)
+        for n, level in enumerate(order):
+            cells = levels[level]
+            for (cx, cy), indices in cells.items():
+                for k, i in enumerate(indices):
+                    check((i,), indices[k + 1:])
+
+                for dx, dy in self.HALF_NEIGHBOURS:
+                    others = cells.get((cx + dx, cy + dy))
+                    if others:
+                        check(indices, others)
+
+            # Each pair of levels is checked once, going through whichever
+            # level needs fewer cells looked up
+            for higher in order[n + 1:]:
+                if lookups(level, higher) <= lookups(higher, level):
+                    check_across(level, higher)
+                else:
+                    check_across(higher, level)
+
+        return pairs
+
+
+class Distribution:
+    """Contains functions which return distributions of people's attributes
+    to be used by World.
+
+    Each distribution is a function which returns a new value each time it's
+    called, drawn using the random module so that random.seed makes worlds
+    repeatable.
+    """
+
+    @staticmethod
+    def uniform(low, high):
+        """Returns a uniform distribution between low and high."""
+        return lambda: random.uniform(low, high)
+
+    @staticmethod
+    def normal(mean, deviation, low=None, high=None):
+        """Returns a normal distribution with the given mean and standard
+        deviation, clamped between low and high if given.
+        """
+
+        def sample():
+            value = random.gauss(mean, deviation)
+            if low is not None:
+                value = max(value, low)
+            if high is not None:
+                value = min(value, high)
+            return value
+
+        return sample
+
+    @staticmethod
+    def lognormal(mean, deviation):
+        """Returns a log-normal distribution whose logarithm has the given
+        mean and standard deviation, for long tailed attributes.
+        """
+        return lambda: random.lognormvariate(mean, deviation)
+
+    @staticmethod
+    def choice(values, weights=None):
+        """Returns a distribution which picks one of the given values, with
+        the given relative weights if given.
+        """
+        return lambda: random.choices(values, weights)[0]
+
+
+class ColourGradient:
+    """Contains functions related to generating a gradient between two
+    or more colours.
+    """
+
+    @staticmethod
+    def linear_sequence(colours, n):
+        """Returns a list representing a linear colour gradient with n
+        interpolated colours in between each colour in the given ordered
+        list of colours.
+
+        Each colour in colours should be a list or tuple of colour channel
+        values weighted in the same way. e.g. (1.0, 0.0, 0.0) for red
+
+        Raises:
+            ValueError: cannot create a gradient with < 2 colours."
+        """
+        if len(colours) < 2:
+            raise ValueError("cannot create a gradient with < 2 colours.")
+
+        gradient = [colours[0]]
+        for colour in colours[1:]:
+            gradient += ColourGradient.linear(gradient[-1], colour, n)
+
+        return gradient
+
+    @staticmethod
+    def linear(start, end, n):
+        """Returns a list representing a linear colour gradient with n
+        interpolated colours in between the given start to end colours.
+
+        The start and end colours should be a list or tuple of colour channel
+        values weighted in the same way. e.g. (1.0, 0.0, 0.0) for red
+
+        """
+        gradient = [start]
+
+        # 1. Get the change between each colour channel from end to start
+        # 2. Divide each change by n + 1 so that we can add it to each
+        #    subsequent interpolated colour until we fall one addition short
+        #    of the end colour (which we already have)
+        step = [(e - s) / (n + 1) for s, e in zip(start, end)]
+
+        # 3. Repeatedly add our step to the start colour to get each subsequent
+        #    interpolated colour
+        interpolated = start[:]
+        for _ in range(n):
+            interpolated = [i + s for i, s in zip(interpolated, step)]
+            gradient.append(interpolated)
+
+        return gradient + [end]
+
+
+class Virus:
+    """Base class for all viruses used to infect people.
+
+    Public attributes:
+        capabilities (frozenset): capabilities declared by this class (see
+            the top of this module), subclasses should declare their own
+    """
+
+    capabilities = frozenset((STATELESS_DURATION,))
+
+    def __init__(self, colour=(1, 0, 0), duration=7):
+        """Creates a virus with the given colour and duration.
+
+        Args:
+            colour (tuple): RGB colour with each colour channel expressed in
+                the range 0.0 and 1.0 (1.0 for most intense)
+            duration (int): how long this virus will last in hours
+        """
+        self.colour = colour
+        self.duration = duration
+        self.remaining_duration = duration
+
+    # @classmethod
+    # def on_world_update(cls, world):
+    #     """If defined, this classmethod will automatically be called at the
+    #     end of every world update/simulation (i.e. every hour) and is passed
+    #     the current world state.
+    #     """
+    #     pass
+
+    @classmethod
+    def reset_class(cls):
+        """This method is called when a virus is added to a world and is used
+        to ensure it is correctly reset to it's initial state.
+        """
+        pass
+
+    @classmethod
+    def parameters(cls):
+        """Returns a dict of the parameters an engine needs to simulate this
+        virus without instances:
+            duration (int): how long an infection lasts in hours, -1 if it
+                never ends
+            immunising (bool): whether people cured of this virus can't catch
+                it again
+        """
+        return {'duration': cls().duration, 'immunising': False}
+
+    @classmethod
+    def is_batchable(cls):
+        """Returns True if this virus can be simulated as an array of
+        remaining durations, otherwise returns False.
+
+        Subclasses inherit their parents' capabilities, so a class which
+        overrides progress or is_cured isn't batchable, as counting its
+        remaining duration down by 1 would skip its own methods.
+        """
+        return (STATELESS_DURATION in cls.capabilities
+                and not cls.capabilities & {TARGETING, CHAINING}
+                and cls.progress is Virus.progress
+                and cls.is_cured is Virus.is_cured)
+
+    def __repr__(self):
+        """Returns a string of this virus' name, id and remaining duration.
+
+        Primarily for debugging.
+        """
+        return (f'<{self.__class__.__name__} '
+                f'@ {id(self)} dur: '
+                f'{self.remaining_duration}/{self.duration}>')
+
+    def progress(self):
+        """Reduces the remaining duration of this virus by 1."""
+        self.remaining_duration -= 1
+
+    def infect(self, person):
+        """Infects the given person with a new instance of this virus."""
+        person.infect(self.__class__())
+
+    def reset_duration(self):
+        """Sets the remaining duration of this virus to it's initial value."""
+        self.remaining_duration = self.duration
+
+    def is_cured(self):
+        """Returns True if this virus has run out, otherwise returns False."""
+        return self.remaining_duration == 0
+
+    def cure(self, person):
+        """Removes this virus from the given person."""
+        person.remove_virus(self)
+
+
+class RainbowVirus(Virus):
+    """This virus infects people with a synchronised animation through the
+    colours of a rainbow.
+
+    Private attributes:
+        rainbow (tuple): RGB colour values for red, orange, yellow, green,
+            blue, indigo and violet
+        colours (list): rainbow interpolated n times (see interpolations)
+            between each colour, followed by the same colours in reverse.
+            This is None until the first time a colour is needed
+        interpolations (int): number of interpolated colours inserted in
+            between each colour in colours
+        colour_count (int): length of colours (including interpolated colours)
+        colour_index (int): current colour in colours that is being displayed
+    """
+
+    __rainbow = ((1, 0, 0), (1, 127 / 255, 0), (1, 1, 0), (0, 1, 0), (0, 0, 1),
+                 (75 / 255, 0, 130 / 255), (148 / 255, 0, 211 / 255))
+
+    # Smooth the transition between colours
+    __interpolations = 20
+    __colours = None
+
+    # ColourGradient.linear_sequence adds the start colour, the interpolated
+    # colours and the end colour for each pair of colours, then the reverse
+    # adds everything but the first and last colour again
+    __colour_count = (len(__rainbow) - 1) * (__interpolations + 2) + 1
+    __colour_count = __colour_count * 2 - 2
+    __colour_index = 0
+
+    capabilities = frozenset((STATELESS_DURATION, SYNCHRONISED_COLOUR))
+
+    def __init__(self, duration=14):
+        """Creates a new RainbowVirus with the given duration."""
+        self.duration = duration
+        self.remaining_duration = duration
+
+    @classmethod
+    def on_world_update(cls, world):
+        """Moves onto the next colour in the rainbow, starting again from the
+        beginning once all the colours have been cycled through.
+        """
+        cls.__colour_index = (cls.__colour_index + 1) % cls.__colour_count
+
+    @property
+    def colour(self):
+        """Returns the current colour of the rainbow!
+
+        This attribute is decorated so that it can be accessed in the same way
+        as all other viruses.
+        """
+        if RainbowVirus.__colours is None:
+            colours = ColourGradient.linear_sequence(
+                RainbowVirus.__rainbow, RainbowVirus.__interpolations)
+            RainbowVirus.__colours = colours + colours[1:-1][::-1]
+
+        return RainbowVirus.__colours[RainbowVirus.__colour_index]
+
+    @colour.setter
+    def colour(self, value):
+        """Raises an AttributeError as instances of this virus cannot have
+        their colour changed.
+        """
+        raise AttributeError("can't set the colour of RainbowVirus instances")
+
+
+class ZebraVirus(Virus):
+    """People infected with this virus individually alternate between black
+    and white.
+
+    Private attributes:
+        colours (tuple): RGB colour values for black and white
+        colour_index (int): current colour in colours that is being displayed
+    """
+
+    __colours = [(0, 0, 0), (1, 1, 1)]
+    __colour_index = 0
+
+    capabilities = frozenset((STATELESS_DURATION, SYNCHRONISED_COLOUR))
+
+    def __init__(self, duration=21):
+        """Creates a new ZebraVirus with the given duration."""
+        self.duration = duration
+        self.remaining_duration = duration
+        self.__colour_index = ZebraVirus.__colour_index
+
+    @classmethod
+    def on_world_update(cls, world):
+        """Moves onto the next colour, starting again from the beginning once
+        all the colours have been cycled through.
+        """
+        cls.__colour_index = not cls.__colour_index
+
+    @property
+    def colour(self):
+        """Returns the current colour.
+
+        This attribute is decorated so that it can be accessed in the same way
+        as all other viruses.
+        """
+        return ZebraVirus.__colours[self.__colour_index ==
+                                    ZebraVirus.__colour_index]
+
+    @colour.setter
+    def colour(self, value):
+        """Raises an AttributeError as instances of this virus cannot have
+        their colour changed.
+        """
+        raise AttributeError("can't set the colour of ZebraVirus instances")
+
+
+class ImmunisableVirus(Virus):
+    """People who are cured of this virus cannot be infected by it again.
+
+    Public attributes:
+        immune (set): people in this set cannot be infected by this virus
+    """
+
+    immune = set()
+
+    capabilities = frozenset((STATELESS_DURATION,))
+
+    def __init__(self,
+                 immune_colour=(0, 1, 0),
+                 infected_colour=(1, 0, 0),
+                 duration=28):
+        """Creates a new ImmunisableVirus with the given attributes.
+
+        Args:
+            immune_colour (tuple): RGB colour to set people cured of this virus
+                to where each channel is expressed in the range 0.0 to 1.0
+            infected_colour (tuple): same as immune_colour, but used for people
+                infected by this virus
+            duration (int): how long this virus lasts in hours
+        """
+        super().__init__(infected_colour, duration)
+        self.immune_colour = immune_colour
+
+    @classmethod
+    def reset_class(cls):
+        """Clear's this classes set of immune people."""
+        cls.immune.clear()
+
+    @classmethod
+    def parameters(cls):
+        """Returns this virus' duration and that it's immunising."""
+        return {'duration': cls().duration, 'immunising': True}
+
+    def infect(self, person):
+        """Infects the given person with a new instance of this virus."""
+        if person not in ImmunisableVirus.immune:
+            person.infect(ImmunisableVirus())
+
+    def cure(self, person):
+        """Removes this virus from the given person, makes them immune to this
+        virus and changes their colour to indicate.
+        """
+        person.remove_virus(self)
+        person.colour = self.immune_colour
+        ImmunisableVirus.immune.add(person)
+
+
+class ZombieVirus(Virus):
+    """People infected by this virus will chase after people who aren't
+    infected by any virus.
+
+    Public attributes:
+        idle_colour (tuple): RGB colour of people infected by this virus who
+            aren't chasing anyone
+        chase_colour (tuple): same as idle_colour, but for people who are
+            chasing someone
+        infected (dict): stores (person, virus) pairs, where person is a Person
+            instance and the key to the corresponding ZombieVirus instance they
+            are infected by
+        healthy (list): stores Person instances who aren't infected by anything
+
+    Private attributes:
+        is_running (bool): determines whether people infected by this virus
+            will be assigned new targets to chase. True if there are people in
+            healthy, False otherwise. Read using is_running()
+    """
+
+    idle_colour = (0.5, 0, 0)
+    chase_colour = (1, 0, 0)
+    infected = {}
+    healthy = []
+    __is_running = True
+
+    capabilities = frozenset((TARGETING,))
+
+    def __init__(self, duration=-1):
+        """Creates a new ZombieVirus with the given attributes."""
+        self.duration = duration
+        self.remaining_duration = duration
+        self.target = None
+
+    @classmethod
+    def on_world_update(cls, world):
+        """Updates the list of healthy people for this class used to help
+        locate targets for people infected by this virus, and assigns targets
+        for people infected by this virus.
+        """
+        cls.healthy = [p for p in world.people if not p.is_infected()]
+
+        # If everyone is infected then there's nothing left to target, so we:
+        # - Clear all targets
+        # - Give out new (random) destinations to prevent everyone from
+        #   converging on the position of the last healthy person
+        # - Prevent the rest of this method from executing until there
+        #   are healthy people to target
+        if not cls.healthy and cls.__is_running:
+            for person, virus in cls.infected.items():
+                person.destination = person._get_random_location()
+                virus.target = None
+            cls.__is_running = False
+            return
+
+        # If healthy people appear while this virus has stopped then this
+        # virus can start up again and try to infect them
+        elif cls.healthy and not cls.__is_running:
+            cls.__is_running = True
+
+        # There's nothing left to infect
+        elif not cls.__is_running:
+            return
+
+        # Assign targets and destinations to each infected person
+        for person, virus in cls.infected.items():
+            if virus.target is None or virus.target.is_infected():
+                virus.target = random.choice(cls.healthy)
+            person.destination = virus.target.location
+
+    @classmethod
+    def is_running(cls):
+        """Returns True if people infected by this virus are chasing healthy
+        people, otherwise returns False, which means everyone in the world
+        was infected when it was last updated.
+        """
+        return cls.__is_running
+
+    @classmethod
+    def reset_class(cls):
+        """Clears this class' dict of infected people and list of healthy
+        people and set's it's running state to True.
+        """
+        cls.infected.clear()
+        cls.healthy.clear()
+        cls.__is_running = True
+
+    @property
+    def colour(self):
+        """Returns idle_colour if this virus isn't chasing anyone, otherwise
+        returns chase_colour.
+        """
+        if self.target is None:
+            return ZombieVirus.idle_colour
+        return ZombieVirus.chase_colour
+
+    @colour.setter
+    def colour(self, value):
+        """Raises an AttributeError as instances of this virus cannot have
+        their colour changed.
+        """
+        raise AttributeError("can't set the colour of ZombieVirus instances")
+
+    def infect(self, person):
+        """Infects the given person with a new instance of this virus and adds
+        them to ZombieVirus' list of infected people if they don't already have
+        this virus.
+        """
+        if not person.has_virus(self):
+            instance = self.__class__()
+            person.infect(instance)
+            ZombieVirus.infected[person] = instance
+
+    def cure(self, person):
+        """Removes this virus from the given person and removes them from
+        ZombieVirus' list of infected people.
+        """
+        person.remove_virus(self)
+        del ZombieVirus.infected[person]
+
+
+class SnakeVirus(Virus):
+    """This virus forms a snake with those infected by it that chases after
+    people who aren't infected by any virus.
+
+    In addition, the snake's head only moves along one axis at a time.
+
+    Public attributes:
+        head_colour (tuple): RGB colour of the person at the head of the snake
+            formed by this virus
+        body_colour (tuple): same as head_colour, but for everyone that isn't
+            at the head of the snake formed by this virus
+        infected (odict): stores (person, virus) pairs, where person is a
+            Person instance and the key to the corresponding SnakeVirus
+            instance they are infected by
+        target (Person): Person instance which will be chased after by the head
+            of the snake formed by this virus until that person is infected.
+            If this is None, the snake will find another random target if
+            possible, otherwise it will roam around randomly
+    """
+
+    head_colour = (1, 0, 0)
+    body_colour = (0, 0, 1)
+    infected = OrderedDict()
+    target = None
+
+    capabilities = frozenset((TARGETING, CHAINING))
+
+    def __init__(self):
+        """Creates a new SnakeVirus."""
+        self.duration = -1
+        self.remaining_duration = -1
+
+    @classmethod
+    def on_world_update(cls, world):
+        """Updates the list of infected people used by this class to
+        tell it's people where to go and issues orders to everyone
+        infected by this virus.
+        """
+        cls.healthy = [p for p in world.people if not p.is_infected()]
+
+        people = list(cls.infected.keys())
+        for i, person in enumerate(people):
+
+            if i != 0:
+                # Follow the person before them
+                person.destination = people[i - 1].location
+                continue
+
+            # Assign a new target if needed, otherwise, if there are no more
+            # healthy people to target, just wander around randomly
+            if cls.healthy:
+                if (cls.target is None or cls.target.is_infected()):
+                    cls.target = random.choice(cls.healthy)
+                vector = cls.get_destination_vector(person.location,
+                                                    cls.target.location)
+            else:
+                vector = cls.get_destination_vector(person.location,
+                                                    person.destination)
+
+            vector = list(vector)
+
+            # Keep only the component which has the greatest magnitude
+            if abs(vector[0]) > abs(vector[1]):
+                vector[1] = 0
+            else:
+                vector[0] = 0
+
+            # Construct the vector for the next snake head destination
+            destination = []
+            for pos, component in zip(person.location, vector):
+                destination.append(pos + component)
+
+            person.destination = tuple(destination)
+
+    @classmethod
+    def reset_class(cls):
+        """Clears this class' target and list of infected people."""
+        cls.infected.clear()
+        cls.target = None
+
+    @staticmethod
+    def get_destination_vector(origin, destination):
+        """Returns a tuple representing a vector from the given origin to the
+        given destination.
+        """
+        vector = []
+
+        for v1, v2 in zip(origin, destination):
+            if (v1 * v2) > 0:  # If v1 and v2 have the same sign
+                new_val = abs(abs(v1) - abs(v2))
+            else:
+                new_val = abs(v1) + abs(v2)
+            if v1 > v2:
+                new_val *= -1
+            vector.append(new_val)
+
+        return tuple(vector)
+
+    @property
+    def colour(self):
+        """Returns head_colour if this virus is at the 'head' of the snake,
+        otherwise returns body_colour.
+        """
+
+        # Get the first virus in SnakeVirus.infected
+        for first in SnakeVirus.infected.values():
+            if self is first:
+                return self.head_colour
+            return self.body_colour
+
+    @colour.setter
+    def colour(self, value):
+        """Raises an AttributeError as instances of this virus cannot have
+        their colour changed.
+        """
+        raise AttributeError("can't set the colour of SnakeVirus instances")
+
+    def infect(self, person):
+        """Infects the given person with a new instance of this virus and adds
+        them to SnakeVirus' list of infected people if they don't already have
+        this virus.
+        """
+        if not person.has_virus(self):
+            instance = self.__class__()
+            person.infect(instance)
+            SnakeVirus.infected[person] = instance
+
+    def cure(self, person):
+        """Removes this virus from the given person and removes them from
+        SnakeVirus' list of infected people.
+        """
+        person.remove_virus(self)
+        del SnakeVirus.infected[person]
+
+
+class Person:
+    """This class represents a person which randomly roams around and can be
+    infected by viruses.
+
+    A person can be infected by multiple viruses at once, but they cannot be
+    infected by more than one instance of the same type of virus at the same
+    time.
+    """
+
+    def __init__(self,
+                 world_size,
+                 radius=7,
+                 colour=(0, 0, 0),
+                 speed=None,
+                 susceptibility=1.0,
+                 layout=None):
+        """Creates a new person at a random location who will randomly roam
+        within the given world size.
+
+        Args:
+            world_size (tuple): width and height of the world which this person
+                can roam around centered at (0, 0) on the default turtlescreen
+            radius (int): radius of this person in pixels
+            colour (tuple): an RGB colour where each channel is a float
+                between 0 and 1.0
+            speed (float): distance this person moves each hour in pixels,
+                if this is None it's half of their radius
+            susceptibility (float): chance between 0 and 1 that this person
+                catches the viruses of the people they're in contact with
+                each hour
+            layout (Layout): walls and obstacles this person can't walk
+                through (see virus_regions), if this is None they can roam
+                anywhere in the world
+
+        Raises:
+            ValueError: world size is smaller than this person
+        """
+
+        if any(dim < (radius * 2) for dim in world_size):
+            raise ValueError("world size is smaller than this person")
+
+        self.world_size = world_size
+        self.radius = radius
+        self.speed = radius / 2 if speed is None else speed
+        self.susceptibility = susceptibility
+        self.layout = layout
+        self.location = self._get_random_location()
+        self.destination = self._get_random_location()
+        self.viruses = list()
+        self.colour = colour
+
+        # (location, destination, squared distance between them) from the
+        # last move, see reached_destination
+        self._destination_distance = None
+
+    def _get_random_location(self):
+        """Returns a random (x, y) position within this person's world size.
+
+        The returned position will be no closer than 1 radius to the edge of
+        this person's world, or to any walls or obstacles in their layout.
+        """
+        if self.layout is not None:
+            return self.layout.random_location(self.radius)
+
+        width, height = self.world_size
+
+        # # Generate a random (x, y) coordinate within the world's borders
+        x = random.uniform(self.radius, width - self.radius)
+        y = random.uniform(self.radius, height - self.radius)
+
+        x -= width // 2
+        y -= height // 2
+
+        return x, y
+
+    def get_colour(self):
+        """Returns the average of this person's viruses colours if they are
+        infected, otherwise returns their default colour.
+        """
+        colour = self.colour
+
+        # Calculate the average colour of this person's virus(es)
+        if self.is_infected():
+            n = len(self.viruses)
+            colours = [virus.colour for virus in self.viruses]
+            colour = [sum(channel) / n for channel in zip(*colours)]
+
+        return tuple(colour)
+
+    def draw(self, viewport=None):
+        """Draws this person as a coloured dot at their current location, or
+        where it appears in the given viewport.
+
+        The colour will be the colour from this colour attribute if they aren't
+        infected, otherwise it will be average colour of the virus(es) they are
+        infected by.
+        """
+        from virus_draw import draw_dot  # Only load turtle when drawing
+
+        if viewport is None:
+            draw_dot(self.location, self.radius * 2, self.get_colour())
+        else:
+            draw_dot(viewport.to_screen(self.location),
+                     self.radius * 2 * viewport.zoom, self.get_colour())
+
+    def collides(self, other):
+        """Returns true if the distance between this person and the other
+        person is less than this + the other person's radius, otherwise returns
+        False.
+        """
+        if other is self:
+            return False
+
+        reach = self.radius + other.radius
+        return distance_squared_2d(self.location, other.location) <= \
+            reach * reach
+
+    def collision_list(self, people):
+        """Returns a list of people from the given list who are in contact
+        with this person.
+        """
+        return [person for person in people if self.collides(person)]
+
+    def infect(self, virus):
+        """Infects this person with the given virus if they aren't already
+        infected by it, otherwise refreshes the virus' duration on this person.
+        """
+
+        try:
+            self.get_virus(virus).reset_duration()
+        except:
+            self.viruses.append(virus)
+
+    def reached_destination(self):
+        """Returns True if this person's location is within 1 radius of
+        destination, otherwise returns False.
+        """
+        # Reuse the distance left over from moving if nothing has changed
+        # since, which saves working it out again
+        moved = self._destination_distance
+        if (moved is not None and moved[0] is self.location
+                and moved[1] is self.destination):
+            return moved[2] <= self.radius * self.radius
+
+        return within_2d(self.location, self.destination, self.radius)
+
+    def resists_infection(self, multiplier=1.0):
+        """Returns True if this person doesn't catch anything from the people
+        they're in contact with this hour, which depends on their
+        susceptibility times the given multiplier for where they are,
+        otherwise returns False.
+        """
+        chance = self.susceptibility * multiplier
+        return chance < 1 and random.random() >= chance
+
+    def progress_illness(self):
+        """Progress this person's viruses, curing them if it's run out."""
+        for virus in self.viruses.copy():
+            virus.progress()
+            if virus.is_cured():
+                self.cure(virus)
+
+    def update(self):
+        """Updates this person each hour.
+
+        - Moves this person towards their destination
+        - If the destination is reached then a new destination is set
+        - Progresses any illness
+        """
+        self.move()
+        if self.reached_destination():
+            self.destination = self._get_random_location()
+        self.progress_illness()
+
+    def move(self):
+        """Moves this person their speed (by default radius / 2) towards their
+        destination. If their destination is closer than that, they will move
+        directly to their destination instead.
+
+        If a wall or obstacle in their layout is in the way, they stay where
+        they are and pick a new destination.
+        """
+        x, y = self.location
+        dest_x, dest_y = self.destination
+        dx, dy = dest_x - x, dest_y - y
+        distance_squared = dx * dx + dy * dy
+
+        # Clamp distance below speed (inclusive), only taking the square root
+        # when it's needed to shorten the step
+        speed = self.speed
+        if distance_squared > speed * speed:
+            step = speed / distance_squared**0.5
+        else:
+            step = 1
+
+        # Move the person towards their destination. This is done without
+        # the turtle so that worlds can be simulated without a display
+        if distance_squared:
+            location = (x + dx * step, y + dy * step)
+            if self.layout is not None and self.layout.blocks(
+                    self.location, location, self.radius):
+                self.destination = self._get_random_location()
+                self._destination_distance = None
+                return
+            self.location = location
+
+        # What's left of the way is the same vector scaled by 1 - step
+        remaining = 1 - step
+        self._destination_distance = (self.location, self.destination,
+                                      distance_squared * remaining * remaining)
+
+    def cure(self, virus=None):
+        """Cures the instance of the given virus' class on this person,
+        otherwise, if a virus isn't given, removes all viruses on this person.
+        """
+        if virus is None:
+            for v in self.viruses.copy():
+                v.cure(self)
+        else:
+            virus.cure(self)
+
+    def remove_virus(self, virus):
+        """Removes the given virus from this person.
+
+        Raises:
+            ValueError: Person.remove_virus(x): x not in Person.viruses
+        """
+        try:
+            self.viruses.remove(virus)
+        except:
+            raise ValueError('Person.remove_virus(x): x not in Person.viruses')
+
+    def is_infected(self):
+        """Returns True if this person is infected, else False."""
+        return bool(len(self.viruses))
+
+    def get_virus(self, virus):
+        """Returns the instance of the given virus' class on this person (if
+        any), otherwise returns None.
+        """
+        for v in self.viruses:
+            if isinstance(v, virus.__class__):
+                return v
+        return None  # For clarity
+
+    def has_virus(self, virus):
+        """Returns True if this person has the given virus, else False."""
+        return bool(self.get_virus(virus))
+
+
+class World:
+    """This class represents a simulated world containing people who can be
+    infected by viruses.
+    """
+
+    def __init__(self,
+                 width,
+                 height,
+                 n,
+                 viruses=[
+                     RainbowVirus, ZebraVirus, ImmunisableVirus, ZombieVirus,
+                     SnakeVirus
+                 ],
+                 movement=None,
+                 transmission=None,
+                 attributes=None,
+                 layout=None):
+        """Creates a new world centered on (0, 0) containing n people which
+        simulates the spread of the given virus(es) through this world.
+
+        Args:
+            width (int): horizontal length of the world in pixels
+            height (int): vertical length of the world in pixels
+            n (int): number of people to add to this world
+            viruses (iterable): virus classes that will be used to infect
+                people in this world
+            movement (MovementModel): moves everyone in this world at once
+                each hour (see virus_movement), if this is None each person
+                moves themselves towards a random destination
+            transmission (Transmission): decides who catches what from the
+                people they're in contact with each hour (see
+                virus_transmission), if this is None everyone in contact with
+                an infected person catches all of their viruses
+            attributes (dict): the radius, speed and/or susceptibility of each
+                person (see Person), each either a fixed value or a
+                distribution to draw everyone's own value from (see
+                Distribution)
+            layout (Layout): walls, obstacles and regions of this world (see
+                virus_regions), where the chance of catching a virus in a
+                region is multiplied by the region's multiplier relative to
+                the layout's largest
+
+        Raises:
+            ValueError: width and height must be even
+            ValueError: unknown person attributes
+            ValueError: layout is for a different sized world
+        """
+
+        if width % 2 != 0 or height % 2 != 0:
+            raise ValueError("width and height must be even")
+
+        attributes = {} if attributes is None else attributes
+        unknown = set(attributes) - {'radius', 'speed', 'susceptibility'}
+        if unknown:
+            raise ValueError(f"unknown person attributes: "
+                             f"{', '.join(sorted(unknown))}")
+
+        if layout is not None and tuple(layout.size) != (width, height):
+            raise ValueError("layout is for a different sized world")
+
+        self.size = (width, height)
+        self.hours = 0
+        self.people = []
+        self.viruses = viruses
+        self.movement = movement
+        self.arrays = None  # PopulationArrays owned for the movement model
+        self.transmission = transmission
+        self.attributes = attributes
+        self.layout = layout
+        for _ in range(n):
+            self.add_person()
+        self.collision_table = self.make_collision_table()
+        self.collision_hour = None  # Hour the table was last updated
+        self.contacts = (None, set())  # (hour, pairs) from contact_pairs
+
+        # Viruses whose infections are fully described by their remaining
+        # duration (see Virus.is_batchable) are counted down together in
+        # progress_illnesses, rather than through each instance's methods
+        self.batched = frozenset(cls for cls in viruses if cls.is_batchable())
+
+        # Reset each virus and add the on_world_update method for each virus if
+        # they have one
+        self.on_update_methods = []
+        for cls in self.viruses:
+            cls.reset_class()
+            if hasattr(cls, "on_world_update"):
+                self.on_update_methods.append(cls.on_world_update)
+
+    def add_person(self):
+        """Adds a new person to this world with attributes drawn from this
+        world's distributions.
+        """
+        attributes = {
+            name: value() if callable(value) else value
+            for name, value in self.attributes.items()
+        }
+        self.people.append(Person(self.size, layout=self.layout, **attributes))
+
+    def make_collision_table(self):
+        """Returns a collision table suited to the sizes of the people in
+        this world.
+
+        A spatial hash table with cells 4 median radii wide is used when
+        nobody is more than twice the median size, so nobody is wider than a
+        cell, otherwise a MultiLevelGrid is used as it stays efficient
+        however much people's sizes vary.
+        """
+        radii = sorted(person.radius for person in self.people)
+        median = radii[len(radii) // 2] if radii else 7
+        if radii and radii[-1] > 2 * median:
+            # Smaller people share the lowest level, so that it isn't made of
+            # lots of tiny cells holding one person each
+            return MultiLevelGrid(4 * median)
+        return EfficientCollision(4 * median)
+
+    def infect_person(self):
+        """Infects a random person in this world with a random virus.
+
+        It is possible for the chosen person to already be infected
+        with a virus.
+        """
+
+        # If this world has no viruses there's nothing to infect people with
+        if not len(self.viruses):
+            return
+
+        rand_person = random.choice(self.people)
+        rand_virus = random.choice(self.viruses)()
+        rand_virus.infect(rand_person)
+
+    def cure_all(self):
+        """Cures all people in this world."""
+        for person in self.people:
+            person.cure()
+
+    def contact_pairs(self):
+        """Returns a set of (i, j) pairs, where i < j, of the indices of the
+        people in contact with each other this hour.
+
+        Contacts are only found once per hour, and are shared by everything
+        that asks for them during the hour.
+        """
+        hour, pairs = self.contacts
+        if hour != self.hours:
+            pairs = self.collision_table.contact_pairs(self.people)
+            self.contacts = (self.hours, pairs)
+        return pairs
+
+    def infection_multiplier(self, person):
+        """Returns the multiplier for the chance of the given person catching
+        a virus where they are, which is 1 without a layout and otherwise
+        their region's multiplier relative to the layout's largest (see
+        Layout.relative_multiplier_at).
+        """
+        if self.layout is None:
+            return 1.0
+        return self.layout.relative_multiplier_at(person.location)
+
+    def update_infections_slow(self):
+        """Infect anyone in contact with an infected person."""
+
+        # Stores (key, value) pairs of the form (person, viruses), where:
+        # person = a person object who has collided with an infected person
+        # viruses = a set of the virus(es) to infect this person with
+        to_infect = {}
+
+        # Loop through each infected person
+        for infected in (p for p in self.people if p.is_infected()):
+            viruses = [v.__class__ for v in infected.viruses]
+
+            # Add anyone who collided with this infected person to our dict of
+            # people to infect along with the viruses to infect them with
+            for person in infected.collision_list(self.people):
+                if person in to_infect:
+                    to_infect[person].update(viruses)
+                else:
+                    to_infect[person] = set(viruses)
+
+        # Infect anyone who collided with an infected person with the virus(es)
+        # of the people they collided with
+        for person, viruses in to_infect.items():
+            if person.resists_infection(self.infection_multiplier(person)):
+                continue
+            for virus in viruses:
+                virus().infect(person)
+
+    def update_infections_fast(self):
+        """Infect anyone in contact with an infected person. Uses this hour's
+        contact pairs, which are found with the collision table and shared
+        with anything else that needs them.
+        """
+        people = self.people
+
+        # Either person in a pair can pass their viruses to the other. These
+        # are gone through in order of who's passing them on and then who to,
+        # so people are infected in the same order as update_infections_slow
+        transmissions = []
+        for i, j in self.contact_pairs():
+            if people[i].viruses:
+                transmissions.append((i, j))
+            if people[j].viruses:
+                transmissions.append((j, i))
+        transmissions.sort()
+
+        # Stores (key, value) pairs of the form (person, viruses), where:
+        # person = a person object who has collided with an infected person
+        # viruses = a set of the virus(es) to infect this person with
+        to_infect = {}
+        for i, j in transmissions:
+            viruses = [v.__class__ for v in people[i].viruses]
+            person = people[j]
+            if person in to_infect:
+                to_infect[person].update(viruses)
+            else:
+                to_infect[person] = set(viruses)
+
+        # Infect anyone who collided with an infected person with the virus(es)
+        # of the people they collided with
+        for person, viruses in to_infect.items():
+            if person.resists_infection(self.infection_multiplier(person)):
+                continue
+            for virus in viruses:
+                virus().infect(person)
+
+    def simulate(self):
+        """Simulates one hour in this world.
+        - Updates all people
+        - Updates all infection transmissions
+        - Calls any update method(s) from this world's virus(es)
+        """
+        self.hours += 1
+        # Everyone moves before anyone's viruses progress, which makes the
+        # same random draws as each person updating in turn
+        if self.movement is None:
+            for person in self.people:
+                person.move()
+                if person.reached_destination():
+                    person.destination = person._get_random_location()
+        else:
+            self.movement.move(self)
+        self.progress_illnesses()
+        if self.transmission is None:
+            self.update_infections_fast()
+        else:
+            self.transmission.update_infections(self)
+        for method in self.on_update_methods:
+            method(self)
+
+    def progress_illnesses(self):
+        """Progresses everyone's viruses, curing any that have run out, in
+        the same order as Person.progress_illness.
+
+        Viruses of batchable classes only need their remaining duration
+        counting down, which is done directly; any other virus is progressed
+        and checked through its own methods.
+        """
+        batched = self.batched
+        for person in self.people:
+            if not person.viruses:
+                continue
+            for virus in person.viruses.copy():
+                if virus.__class__ in batched:
+                    virus.remaining_duration -= 1
+                    cured = virus.remaining_duration == 0
+                else:
+                    virus.progress()
+                    cured = virus.is_cured()
+                if cured:
+                    person.cure(virus)
+
+    def visible_people(self, viewport):
+        """Returns a list of the people who could be seen in the given
+        viewport, found using the collision table so that people off screen
+        aren't looked at.
+        """
+        # The table is only filled when needed, once per hour at most
+        if self.collision_hour != self.hours:
+            self.collision_table.update(self.people)
+            self.collision_hour = self.hours
+        return self.collision_table.within(*viewport.bounds())
+
+    def draw(self, viewport=None):
+        """Draws this world on the default turtle screen.
+
+        - Clears the current screen
+        - Draws all the people in this world
+        - Draws the box that frames this world
+        - Writes the number of hours and number of people infected at the top
+          of the frame
+
+        If a viewport is given, only the part of this world it shows is drawn
+        (see draw_viewport).
+        """
+        if viewport is not None:
+            self.draw_viewport(viewport)
+            return
+
+        import turtle  # Only load turtle when drawing
+        from virus_draw import draw_rect, draw_text
+
+        # Top-left corner of the world
+        width, height = self.size
+        x = 0 - width // 2
+        y = height // 2
+
+        turtle.clear()
+        if self.layout is not None:
+            self.layout.draw()
+        for person in self.people:
+            person.draw()
+        draw_rect(x, y, width, height)
+        draw_text(x, y, f'Hours: {self.hours}')
+        draw_text(0, y, f'Infected: {self.count_infected()}', align='center')
+
+    def draw_viewport(self, viewport):
+        """Draws the part of this world shown in the given viewport on the
+        default turtle screen.
+
+        Only people in view are drawn. If the viewport is zoomed out too far
+        to make people out, squares of the average colour of the people in
+        them are drawn instead, so the cost of drawing depends on what's on
+        screen rather than how many people there are.
+        """
+        import turtle  # Only load turtle when drawing
+        from virus_draw import draw_dot, draw_rect, draw_text
+
+        turtle.clear()
+        if self.layout is not None:
+            self.layout.draw(viewport)
+
+        people = self.visible_people(viewport)
+        if viewport.is_detailed():
+            for person in people:
+                person.draw(viewport)
+        else:
+            size = viewport.block_size
+            blocks = {}
+            for person in people:
+                x, y = viewport.to_screen(person.location)
+                block = (x // size, y // size)
+                if block in blocks:
+                    blocks[block].append(person.get_colour())
+                else:
+                    blocks[block] = [person.get_colour()]
+
+            for (x, y), colours in blocks.items():
+                colour = tuple(sum(c) / len(colours) for c in zip(*colours))
+                draw_dot(((x + 0.5) * size, (y + 0.5) * size), size * 1.5,
+                         colour)
+
+        # Frame around the world and text at the top of the viewport
+        width, height = self.size
+        x, y = viewport.to_screen((0 - width // 2, height // 2))
+        draw_rect(x, y, width * viewport.zoom, height * viewport.zoom)
+        left, top = -viewport.width / 2, viewport.height / 2
+        draw_text(left, top, f'Hours: {self.hours}')
+        draw_text(0, top, f'Infected: {self.count_infected()}',
+                  align='center')
+
+    def count_infected(self):
+        """Returns the number of infected people in this world."""
+        return sum(True for person in self.people if person.is_infected())
+
+    def memory_report(self):
+        """Returns a dict of the bytes used by each subsystem of this world
+        (see virus_memory).
+        """
+        from virus_memory import memory_report  # Only load when reporting
+        return memory_report(self)
+
+
+class Viewport:
+    """The part of a world shown on screen, which can be panned and zoomed.
+    """
+
+    def __init__(self,
+                 width,
+                 height,
+                 centre=(0, 0),
+                 zoom=1.0,
+                 detail_zoom=0.25,
+                 block_size=8):
+        """Creates a new viewport.
+
+        Args:
+            width (int): horizontal length of the viewport on screen in pixels
+            height (int): vertical length of the viewport on screen in pixels
+            centre (tuple): (x, y) location in the world shown in the middle
+                of the viewport
+            zoom (float): screen pixels per world pixel
+            detail_zoom (float): lowest zoom at which people are drawn
+                individually, below this they're drawn as blocks
+            block_size (int): side length in screen pixels of the blocks
+                people are drawn as when zoomed out
+
+        Raises:
+            ValueError: zoom must be positive
+        """
+        if zoom <= 0:
+            raise ValueError("zoom must be positive")
+
+        self.width = width
+        self.height = height
+        self.centre = tuple(centre)
+        self.zoom = zoom
+        self.detail_zoom = detail_zoom
+        self.block_size = block_size
+
+    @classmethod
+    def fit(cls, world_size, width, height, **kwargs):
+        """Returns a viewport of the given size showing the whole of a world
+        of the given size, never zoomed in.
+        """
+        world_width, world_height = world_size
+        zoom = min(width / world_width, height / world_height, 1.0)
+        return cls(width, height, zoom=zoom, **kwargs)
+
+    def bounds(self):
+        """Returns the (xmin, ymin, xmax, ymax) area of the world in view."""
+        x, y = self.centre
+        half_width = self.width / 2 / self.zoom
+        half_height = self.height / 2 / self.zoom
+        return x - half_width, y - half_height, x + half_width, y + half_height
+
+    def to_screen(self, location):
+        """Returns where the given (x, y) location in the world appears on
+        screen.
+        """
+        return ((location[0] - self.centre[0]) * self.zoom,
+                (location[1] - self.centre[1]) * self.zoom)
+
+    def pan(self, dx, dy):
+        """Moves the viewport by the given distances in screen pixels."""
+        x, y = self.centre
+        self.centre = (x + dx / self.zoom, y + dy / self.zoom)
+
+    def zoom_by(self, factor, lowest=0.01, highest=20.0):
+        """Zooms in (factor > 1) or out (factor < 1) around the centre of the
+        viewport, keeping the zoom between lowest and highest.
+        """
+        self.zoom = min(max(self.zoom * factor, lowest), highest)
+
+    def is_detailed(self):
+        """Returns True if people are zoomed in enough to be drawn
+        individually, otherwise returns False.
+        """
+        return self.zoom >= self.detail_zoom
+
+
+def distance_2d(a, b):
+    """Returns the distance between two 2D points of the form (x, y)."""
+    # Standard distance formula for two points in the form (x, y)
+    return ((b[0] - a[0])**2 + (b[1] - a[1])**2)**0.5
+
+
+def distance_squared_2d(a, b):
+    """Returns the squared distance between two 2D points of the form (x, y).
+
+    Comparing squared distances gives the same answer as comparing distances
+    without taking a square root.
+    """
+    dx = b[0] - a[0]
+    dy = b[1] - a[1]
+    return dx * dx + dy * dy
+
+
+def within_2d(a, b, distance):
+    """Returns True if two 2D points of the form (x, y) are no further than
+    distance apart, otherwise returns False.
+    """
+    return distance_squared_2d(a, b) <= distance * distance
@@ -0,0 +1,201 @@
+"""
+Stops headless runs once their outcome is decided.
+
+Many runs end up somewhere nothing more can happen: nobody is infected any
+more, or everyone is infected with viruses that never end (ZombieVirus,
+SnakeVirus). Simulating further hours only repeats the same infection count,
+so run_until simulates a world until one of its stop conditions is met and
+reports the hour it stopped at:
+
+    outcome = run_until(world, [Extinct(), Saturated(), Steady(200)],
+                        hours=10000)
+    print(outcome.hours, outcome.reason)
+    counts = outcome.curve(10000)
+
+Each condition is checked after every hour against the world and the number
+of people infected, which is only counted once per hour for all of them.
+Conditions marked as final (Extinct and Saturated) mean the infection count
+can't change again unless someone is infected or cured from outside the
+simulation, so the rest of the curve is filled in without simulating it.
+"""
+
+from collections import deque
+
+from virus_sim import ZombieVirus
+
+
+class StopCondition:
+    """Base class for all stop conditions.
+
+    Public attributes:
+        reason (str): reported as the reason a run stopped
+        final (bool): whether the infection count can't change once this
+            condition is met
+    """
+
+    reason = 'stopped'
+    final = False
+
+    def reset(self):
+        """Forgets anything seen in previous runs, called at the start of each
+        run.
+        """
+        pass
+
+    def check(self, world, infected):
+        """Returns True if the given world, where the given number of people
+        are infected, should stop, otherwise returns False.
+        """
+        raise NotImplementedError
+
+
+class Extinct(StopCondition):
+    """Stops once nobody is infected."""
+
+    reason = 'extinct'
+    final = True
+
+    def check(self, world, infected):
+        return infected == 0
+
+
+class Saturated(StopCondition):
+    """Stops once everyone is infected with a virus that never ends."""
+
+    reason = 'saturated'
+    final = True
+
+    def check(self, world, infected):
+        if infected < len(world.people):
+            return False
+
+        # ZombieVirus keeps running while it has healthy people to chase
+        if ZombieVirus in world.viruses and ZombieVirus.is_running():
+            return False
+
+        return all(
+            any(virus.duration < 0 for virus in person.viruses)
+            for person in world.people)
+
+
+class Steady(StopCondition):
+    """Stops once the number of people infected has stayed within a
+    tolerance for a number of hours.
+    """
+
+    reason = 'steady'
+
+    def __init__(self, window=100, tolerance=0):
+        """Creates a new condition.
+
+        Args:
+            window (int): number of hours the count has to stay steady for
+            tolerance (int): largest difference between the highest and
+                lowest count in the window that's still steady
+
+        Raises:
+            ValueError: window must be positive
+        """
+        if window <= 0:
+            raise ValueError("window must be positive")
+
+        self.window = window
+        self.tolerance = tolerance
+        self.counts = deque(maxlen=window + 1)
+
+    def reset(self):
+        self.counts.clear()
+
+    def check(self, world, infected):
+        self.counts.append(infected)
+        return (len(self.counts) > self.window
+                and max(self.counts) - min(self.counts) <= self.tolerance)
+
+
+class Outcome:
+    """The result of a run.
+
+    Public attributes:
+        start (int): world's hour when the run started
+        hours (int): world's hour when the run stopped
+        reason (str): reason of the condition that stopped the run, None if
+            it ran out of hours
+        final (bool): whether the infection count can't change again
+        counts (list): number of people infected at the start and after each
+            hour simulated
+    """
+
+    def __init__(self, start, hours, reason, final, counts):
+        self.start = start
+        self.hours = hours
+        self.reason = reason
+        self.final = final
+        self.counts = counts
+
+    def __repr__(self):
+        return (f'<Outcome hours: {self.start}-{self.hours} '
+                f'reason: {self.reason}>')
+
+    def curve(self, hours):
+        """Returns a list of the number of people infected at the start and
+        after each of the given number of hours, filling in the hours after
+        the run stopped with the last count if the outcome is final.
+
+        Raises:
+            ValueError: hours weren't simulated and the outcome isn't final
+        """
+        if hours < len(self.counts):
+            return self.counts[:hours + 1]
+        if not self.final:
+            raise ValueError("hours weren't simulated and the outcome isn't "
+                             "final")
+        return self.counts + [self.counts[-1]] * (hours + 1 - len(self.counts))
+
+
+def default_conditions():
+    """Returns a list of the conditions which stop a run once its outcome
+    can't change.
+    """
+    return [Extinct(), Saturated()]
+
+
+def check_conditions(world, infected, conditions):
+    """Returns the first of the given conditions met by the given world,
+    where the given number of people are infected, or None if none are.
+    """
+    for condition in conditions:
+        if condition.check(world, infected):
+            return condition
+    return None
+
+
+def run_until(world, conditions=None, hours=None):
+    """Simulates the given world until one of the given conditions is met.
+
+    Args:
+        world (World): world to simulate
+        conditions (list): StopConditions checked at the start and after each
+            hour, defaulting to Extinct and Saturated
+        hours (int): most hours to simulate, if this is None the world is
+            simulated until a condition is met
+
+    Returns:
+        Outcome: hour the run stopped at, why, and the infection counts
+    """
+    if conditions is None:
+        conditions = default_conditions()
+    for condition in conditions:
+        condition.reset()
+
+    start = world.hours
+    counts = [world.count_infected()]
+    met = check_conditions(world, counts[-1], conditions)
+
+    while met is None and (hours is None or world.hours - start < hours):
+        world.simulate()
+        counts.append(world.count_infected())
+        met = check_conditions(world, counts[-1], conditions)
+
+    if met is None:
+        return Outcome(start, world.hours, None, False, counts)
+    return Outcome(start, world.hours, met.reason, met.final, counts)
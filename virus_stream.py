@@ -0,0 +1,377 @@
+"""
+Streams per-hour observations from a World to pluggable sinks.
+
+observe() advances a world one hour at a time and yields an observation
+describing that hour. Observations are only produced as they're consumed, so
+a slow sink holds up the simulation instead of observations piling up in
+memory, and runs of any length can be written out hour by hour:
+
+    with CSVSink('run.csv') as csv, JSONLinesSink('run.jsonl') as jsonl:
+        pump(observe(world, hours=1000000), csv, jsonl)
+
+Wrapping a sink in a ThreadedSink moves its writes onto a background thread
+so that the simulation and the writes overlap, while its bounded queue still
+applies backpressure once the sink falls behind.
+"""
+
+import csv
+import json
+import os
+import queue
+import random
+import threading
+from array import array
+
+from virus_sim import ImmunisableVirus
+
+
+def observe(world, hours=None, sample=0, seed=None):
+    """Simulates the given world and yields an observation after each hour.
+
+    Each observation is a dict containing:
+        hours (int): hours simulated in the world
+        infected (int): number of people infected by any virus
+        new_infections (int): number of people who caught a virus they
+            didn't have at the end of the previous hour
+        cures (int): number of viruses people were cured of this hour
+        immune (int): number of people immune to ImmunisableVirus
+        counts (dict): number of people infected by each virus class, keyed by
+            the class name
+        positions (list): (index, x, y) tuples for a random sample of people,
+            only present if sample is greater than 0
+
+    Args:
+        world (World): world to simulate
+        hours (int): number of hours to simulate, if this is None the world
+            is simulated for as long as observations are consumed
+        sample (int): number of people to include in positions each hour
+        seed (int): seed used to choose which people are sampled
+    """
+    rng = random.Random(seed)
+    names = [cls.__name__ for cls in world.viruses]
+    previous = [_virus_classes(person) for person in world.people]
+
+    simulated = 0
+    while hours is None or simulated < hours:
+        world.simulate()
+        simulated += 1
+
+        counts = dict.fromkeys(names, 0)
+        infected = new_infections = cures = 0
+        current = []
+
+        for i, person in enumerate(world.people):
+            classes = _virus_classes(person)
+            current.append(classes)
+
+            if classes:
+                infected += 1
+                for cls in classes:
+                    counts[cls.__name__] = counts.get(cls.__name__, 0) + 1
+
+            # New people have no previous state to compare against
+            before = previous[i] if i < len(previous) else frozenset()
+            if classes - before:
+                new_infections += 1
+            cures += len(before - classes)
+
+        previous = current
+
+        observation = {
+            'hours': world.hours,
+            'infected': infected,
+            'new_infections': new_infections,
+            'cures': cures,
+            'immune': _count_immune(world),
+            'counts': counts,
+        }
+
+        if sample:
+            indices = rng.sample(range(len(world.people)),
+                                 min(sample, len(world.people)))
+            observation['positions'] = [
+                (i, *world.people[i].location) for i in sorted(indices)
+            ]
+
+        yield observation
+
+
+def flatten(observation):
+    """Returns a flat dict of the scalar values in the given observation.
+
+    Each virus count is stored under 'count_' followed by the class name and
+    sampled positions are left out.
+    """
+    row = {
+        key: value
+        for key, value in observation.items()
+        if key not in ('counts', 'positions')
+    }
+    for name, count in observation['counts'].items():
+        row['count_' + name] = count
+    return row
+
+
+def pump(observations, *sinks):
+    """Writes every observation to each of the given sinks and returns the
+    number of observations written.
+    """
+    written = 0
+    for observation in observations:
+        for sink in sinks:
+            sink.write(observation)
+        written += 1
+    return written
+
+
+def _virus_classes(person):
+    """Returns a frozenset of the classes of the given person's viruses."""
+    return frozenset(virus.__class__ for virus in person.viruses)
+
+
+def _count_immune(world):
+    """Returns the number of people in the given world who are immune to
+    ImmunisableVirus.
+    """
+    if ImmunisableVirus not in world.viruses:
+        return 0
+    return len(ImmunisableVirus.immune)
+
+
+class Sink:
+    """Base class for all sinks that consume observations.
+
+    Sinks can be used as context managers, which closes them on exit.
+    """
+
+    def write(self, observation):
+        """Consumes a single observation."""
+        raise NotImplementedError
+
+    def close(self):
+        """Flushes and releases anything held by this sink."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CSVSink(Sink):
+    """Writes flattened observations as rows of a CSV file.
+
+    The columns are taken from the first observation written.
+    """
+
+    def __init__(self, path):
+        """Creates a new sink which writes to the file at the given path."""
+        self.file = open(path, 'w', newline='')
+        self.writer = None
+
+    def write(self, observation):
+        """Writes the given observation as a row."""
+        row = flatten(observation)
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=list(row))
+            self.writer.writeheader()
+        self.writer.writerow(row)
+
+    def close(self):
+        """Closes the underlying file."""
+        self.file.close()
+
+
+class JSONLinesSink(Sink):
+    """Writes each observation as a line of JSON, including any sampled
+    positions.
+    """
+
+    def __init__(self, path):
+        """Creates a new sink which writes to the file at the given path."""
+        self.file = open(path, 'w')
+
+    def write(self, observation):
+        """Writes the given observation as a line."""
+        self.file.write(json.dumps(observation) + '\n')
+
+    def close(self):
+        """Closes the underlying file."""
+        self.file.close()
+
+
+class ColumnarSink(Sink):
+    """Writes flattened observations to a directory containing one binary
+    file per column in the style of Parquet.
+
+    Rows are buffered into groups of row_group rows and each group is
+    appended to every column file at once. Each column file is a sequence of
+    native 64-bit signed integers, and schema.json in the same directory lists
+    the columns and the number of rows written. Columns can be read back with
+    read_column, or with numpy.fromfile(path, dtype=numpy.int64).
+    """
+
+    def __init__(self, directory, row_group=4096):
+        """Creates a new sink which writes to the given directory, creating it
+        if it doesn't exist.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.row_group = row_group
+        self.columns = None
+        self.buffers = None
+        self.rows = 0
+
+    def write(self, observation):
+        """Buffers the given observation, writing out the buffered group once
+        it's full.
+        """
+        row = flatten(observation)
+        if self.columns is None:
+            self.columns = list(row)
+            self.buffers = [array('q') for _ in self.columns]
+            for name in self.columns:
+                open(self._path(name), 'wb').close()
+
+        for buffer, name in zip(self.buffers, self.columns):
+            buffer.append(row.get(name, 0))
+
+        if len(self.buffers[0]) >= self.row_group:
+            self.flush()
+
+    def flush(self):
+        """Appends any buffered rows to the column files."""
+        if not self.buffers or not len(self.buffers[0]):
+            return
+
+        for buffer, name in zip(self.buffers, self.columns):
+            with open(self._path(name), 'ab') as file:
+                buffer.tofile(file)
+
+        self.rows += len(self.buffers[0])
+        self.buffers = [array('q') for _ in self.columns]
+        self._write_schema()
+
+    def close(self):
+        """Writes out any buffered rows."""
+        self.flush()
+
+    def _path(self, name):
+        """Returns the path of the file storing the given column."""
+        return os.path.join(self.directory, name + '.bin')
+
+    def _write_schema(self):
+        """Writes the columns and number of rows to schema.json."""
+        schema = {'columns': self.columns, 'dtype': 'int64', 'rows': self.rows}
+        with open(os.path.join(self.directory, 'schema.json'), 'w') as file:
+            json.dump(schema, file)
+
+
+def read_column(directory, name):
+    """Returns an array of the values in the given column written by a
+    ColumnarSink to the given directory.
+    """
+    values = array('q')
+    with open(os.path.join(directory, name + '.bin'), 'rb') as file:
+        values.frombytes(file.read())
+    return values
+
+
+class RingBufferSink(Sink):
+    """Keeps the most recent flattened observations in memory in a NumPy
+    array, overwriting the oldest once full.
+
+    Requires NumPy.
+    """
+
+    def __init__(self, capacity):
+        """Creates a new sink which holds up to capacity observations."""
+        import numpy
+
+        self.numpy = numpy
+        self.capacity = capacity
+        self.columns = None
+        self.buffer = None
+        self.count = 0
+
+    def write(self, observation):
+        """Stores the given observation in the next slot of the buffer."""
+        row = flatten(observation)
+        if self.buffer is None:
+            self.columns = list(row)
+            self.buffer = self.numpy.zeros((self.capacity, len(self.columns)),
+                                           dtype=self.numpy.int64)
+
+        self.buffer[self.count % self.capacity] = [
+            row.get(name, 0) for name in self.columns
+        ]
+        self.count += 1
+
+    def to_array(self):
+        """Returns a copy of the stored observations from oldest to newest,
+        one row per observation with columns in the order of self.columns.
+        """
+        if self.buffer is None:
+            return self.numpy.zeros((0, 0), dtype=self.numpy.int64)
+        if self.count <= self.capacity:
+            return self.buffer[:self.count].copy()
+        start = self.count % self.capacity
+        return self.numpy.roll(self.buffer, -start, axis=0)
+
+    def column(self, name):
+        """Returns the stored values of the given column from oldest to
+        newest.
+        """
+        return self.to_array()[:, self.columns.index(name)]
+
+
+class ThreadedSink(Sink):
+    """Writes observations to another sink on a background thread.
+
+    Up to maxsize observations are queued, after which write blocks until
+    the wrapped sink catches up.
+    """
+
+    __done = object()
+
+    def __init__(self, sink, maxsize=1024):
+        """Creates a new sink which forwards observations to the given
+        sink.
+        """
+        self.sink = sink
+        self.queue = queue.Queue(maxsize)
+        self.error = None
+        self.thread = threading.Thread(target=self.__consume, daemon=True)
+        self.thread.start()
+
+    def write(self, observation):
+        """Queues the given observation, blocking while the queue is full.
+
+        Raises any error raised by the wrapped sink.
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put(observation)
+
+    def close(self):
+        """Waits for all queued observations to be written and closes the
+        wrapped sink.
+        """
+        self.queue.put(ThreadedSink.__done)
+        self.thread.join()
+        self.sink.close()
+        if self.error is not None:
+            raise self.error
+
+    def __consume(self):
+        """Writes queued observations to the wrapped sink until closed."""
+        while True:
+            observation = self.queue.get()
+            if observation is ThreadedSink.__done:
+                return
+            if self.error is None:
+                try:
+                    self.sink.write(observation)
+                except Exception as error:
+                    self.error = error
@@ -0,0 +1,505 @@
+"""
+Simulates a large world split into tiles across multiple processes.
+
+TiledWorld is a separate engine with its own, array based population rather
+than an option on World, and it only runs batchable viruses.
+
+The world's rectangle is divided into a grid of tiles and each tile is
+simulated by its own worker process, which owns the people currently inside
+it. Every person's state lives in one shared memory block so that ownership
+can move between workers without copying anything:
+
+    x, y, destination x, destination y    float64 per person
+    owner                                  int32 per person (tile index)
+    remaining duration                     int32 per person for each virus
+    immune                                 uint8 per person for each virus
+
+Each hour every worker:
+    1. moves its people and progresses their viruses, following the same
+       rules as Person.update
+    2. hands people who left its tile to the tile they entered (migration),
+       and tells neighbouring tiles which of its people are within reach of
+       their border (halo exchange)
+    3. finds contacts between its people and any infected people in its tile
+       or halo, then waits for every worker to finish looking before
+       applying the new infections
+
+All random numbers are derived from the seed, the person and the hour rather
+than drawn from a shared generator, so a world produces identical results no
+matter how many tiles it's split into. A TiledWorld with tiles=(1, 1) runs in
+the calling process and is the single process reference for any split.
+
+What is guaranteed is that every split of a seeded TiledWorld gives the
+same results. It can't give the same results as World.simulate, which draws
+from the random module in a different order, so it's only checked to give
+the same distribution of epidemic curves as World (see virus_check).
+
+Only batchable viruses (see virus_plugins) can be simulated this way, as
+viruses like ZombieVirus and SnakeVirus need to see every person at once,
+and a ValueError naming the first virus that isn't is raised otherwise.
+"""
+
+import multiprocessing
+import random
+from math import floor, sqrt
+from multiprocessing import shared_memory
+
+from virus_plugins import batch_parameters
+from virus_sim import RainbowVirus, ZebraVirus, ImmunisableVirus
+
+_MASK = (1 << 64) - 1
+
+
+def _mix(z):
+    """Returns a well mixed 64-bit hash of the given integer (SplitMix64)."""
+    z = (z + 0x9E3779B97F4A7C15) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def _uniform(seed, person, hour, draw, a, b):
+    """Returns a random float between a and b which only depends on the given
+    seed, person, hour and draw number.
+    """
+    z = _mix(_mix(_mix(seed ^ person) ^ hour) ^ draw)
+    return a + (b - a) * ((z >> 11) / (1 << 53))
+
+
+class PopulationBuffer:
+    """Arrays describing every person in a tiled world, stored in a single
+    block of shared memory (see the module docstring for the layout).
+    """
+
+    def __init__(self, n, virus_count, name=None):
+        """Creates a new shared memory block for n people and the given number
+        of viruses, or attaches to an existing block if a name is given.
+        """
+        self.n = n
+        self.virus_count = virus_count
+
+        size = n * (4 * 8 + 4 + virus_count * (4 + 1))
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True,
+                                                  size=max(size, 1))
+        else:
+            self.shm = shared_memory.SharedMemory(name)
+        self.name = self.shm.name
+
+        offset = 0
+
+        def view(fmt, itemsize):
+            nonlocal offset
+            start, offset = offset, offset + n * itemsize
+            return self.shm.buf[start:offset].cast(fmt)
+
+        self.x, self.y = view('d', 8), view('d', 8)
+        self.dest_x, self.dest_y = view('d', 8), view('d', 8)
+        self.owner = view('i', 4)
+        self.remaining = [view('i', 4) for _ in range(virus_count)]
+        self.immune = [view('B', 1) for _ in range(virus_count)]
+
+    def close(self, unlink=False):
+        """Releases this process' views of the block, destroying the block as
+        well if unlink is True.
+        """
+        views = [self.x, self.y, self.dest_x, self.dest_y, self.owner]
+        for view in views + self.remaining + self.immune:
+            view.release()
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class TileEngine:
+    """Simulates the people owned by a single tile."""
+
+    def __init__(self, config, tile, population, inboxes=None, barrier=None):
+        """Creates a new engine for the given tile.
+
+        Args:
+            config (dict): attributes of the world shared by every tile
+            tile (int): index of the tile simulated by this engine
+            population (PopulationBuffer): state of every person
+            inboxes (list): queue for each tile used to send migrations and
+                halos, only needed if there's more than one tile
+            barrier: barrier shared by every tile's engine, only needed if
+                there's more than one tile
+        """
+        self.__dict__.update(config)
+        self.tile = tile
+        self.population = population
+        self.inboxes = inboxes
+        self.barrier = barrier
+        self.tile_count = self.columns * self.rows
+        self.owned = [
+            i for i in range(population.n) if population.owner[i] == tile
+        ]
+        self.halo = []
+
+    def tiles_within(self, x, y, reach):
+        """Returns the indices of the tiles which are within reach of the
+        given position.
+        """
+        xmin, ymin = self.tile_at(x - reach, y - reach)
+        xmax, ymax = self.tile_at(x + reach, y + reach)
+        return [
+            column + row * self.columns
+            for column in range(xmin, xmax + 1)
+            for row in range(ymin, ymax + 1)
+        ]
+
+    def tile_at(self, x, y):
+        """Returns the (column, row) of the tile containing the given
+        position.
+        """
+        column = int((x + self.width / 2) / self.tile_width)
+        row = int((y + self.height / 2) / self.tile_height)
+        return (min(max(column, 0), self.columns - 1),
+                min(max(row, 0), self.rows - 1))
+
+    def simulate(self, hour):
+        """Simulates the given hour for this tile's people."""
+        self.update_people(hour)
+        if self.tile_count > 1:
+            self.exchange()
+        infections = self.find_infections()
+
+        # No one can apply infections until everyone has finished looking at
+        # who is infected
+        if self.tile_count > 1:
+            self.barrier.wait()
+
+        for person, virus in infections:
+            self.population.remaining[virus][person] = self.durations[virus]
+
+    def update_people(self, hour):
+        """Moves each of this tile's people and progresses their viruses."""
+        pop = self.population
+        half_radius = self.radius / 2
+        radius_sq = self.radius**2
+        width, height = self.width, self.height
+        low_x = self.radius - width // 2
+        high_x = width - self.radius - width // 2
+        low_y = self.radius - height // 2
+        high_y = height - self.radius - height // 2
+
+        for i in self.owned:
+            x, y = pop.x[i], pop.y[i]
+            dest_x, dest_y = pop.dest_x[i], pop.dest_y[i]
+            dx, dy = dest_x - x, dest_y - y
+            # sqrt is correctly rounded like NumPy's, unlike ** 0.5, so the
+            # array engines in virus_ensemble give exactly the same locations
+            distance = sqrt(dx * dx + dy * dy)
+
+            if distance:
+                step = half_radius / distance if distance > half_radius else 1
+                x += dx * step
+                y += dy * step
+                pop.x[i], pop.y[i] = x, y
+
+            dx, dy = dest_x - x, dest_y - y
+            if dx * dx + dy * dy <= radius_sq:
+                pop.dest_x[i] = _uniform(self.seed, i, hour, 0, low_x, high_x)
+                pop.dest_y[i] = _uniform(self.seed, i, hour, 1, low_y, high_y)
+
+            for v in range(self.virus_count):
+                remaining = pop.remaining[v][i]
+                if remaining:
+                    remaining -= 1
+                    pop.remaining[v][i] = remaining
+                    if remaining == 0 and self.immunising[v]:
+                        pop.immune[v][i] = 1
+
+    def exchange(self):
+        """Sends people who left this tile to the tile they're now in and
+        people near this tile's border to the neighbouring tiles, then
+        receives the same from every other tile.
+        """
+        pop = self.population
+        reach = self.radius * 2
+        migrants = [[] for _ in range(self.tile_count)]
+        halos = [[] for _ in range(self.tile_count)]
+        staying = []
+
+        for i in self.owned:
+            x, y = pop.x[i], pop.y[i]
+            column, row = self.tile_at(x, y)
+            tile = column + row * self.columns
+            if tile != self.tile:
+                pop.owner[i] = tile
+                migrants[tile].append(i)
+            else:
+                staying.append(i)
+
+            # Anyone who has just left can still be within reach of this tile
+            for other in self.tiles_within(x, y, reach):
+                if other != tile:
+                    halos[other].append(i)
+
+        # Every tile gets a message, even if it's empty, so that each tile
+        # knows when it has heard from everyone else
+        for tile in range(self.tile_count):
+            if tile != self.tile:
+                self.inboxes[tile].put((migrants[tile], halos[tile]))
+
+        self.owned = staying
+        self.halo = halos[self.tile]
+        for _ in range(self.tile_count - 1):
+            arrived, halo = self.inboxes[self.tile].get()
+            self.owned += arrived
+            self.halo += halo
+
+        # Keep the same order regardless of who sent what first
+        self.owned.sort()
+
+    def find_infections(self):
+        """Returns a list of (person, virus) pairs for each of this tile's
+        people who is in contact with someone infected by that virus.
+        """
+        pop = self.population
+        cell_size = self.radius * 2
+        reach_sq = cell_size**2
+        viruses = range(self.virus_count)
+
+        # Hash everyone who is infected into cells the size of a contact
+        grid = {}
+        for i in self.owned + self.halo:
+            if any(pop.remaining[v][i] for v in viruses):
+                cell = (floor(pop.x[i] / cell_size),
+                        floor(pop.y[i] / cell_size))
+                grid.setdefault(cell, []).append(i)
+
+        infections = []
+        for j in self.owned:
+            x, y = pop.x[j], pop.y[j]
+            column, row = floor(x / cell_size), floor(y / cell_size)
+            caught = set()
+
+            for cx in (column - 1, column, column + 1):
+                for cy in (row - 1, row, row + 1):
+                    for i in grid.get((cx, cy), ()):
+                        dx, dy = pop.x[i] - x, pop.y[i] - y
+                        if i == j or dx * dx + dy * dy > reach_sq:
+                            continue
+                        for v in viruses:
+                            if pop.remaining[v][i] and not pop.immune[v][j]:
+                                caught.add(v)
+
+            infections.extend((j, v) for v in sorted(caught))
+
+        return infections
+
+
+def _work(config, tile, name, inboxes, barrier, connection):
+    """Runs the engine for the given tile in a worker process, simulating
+    the hours it's asked to until it receives None.
+    """
+    population = PopulationBuffer(config['n'], config['virus_count'], name)
+    engine = TileEngine(config, tile, population, inboxes, barrier)
+
+    # Engines find the people they own from the shared owners, which other
+    # tiles change once they start simulating, so say when this one has
+    connection.send(len(engine.owned))
+    try:
+        while True:
+            request = connection.recv()
+            if request is None:
+                break
+            first, hours = request
+            for hour in range(first, first + hours):
+                engine.simulate(hour)
+            connection.send(len(engine.owned))
+    finally:
+        del engine
+        population.close()
+
+
+class TiledWorld:
+    """A world which is split into tiles that are each simulated in their
+    own process.
+
+    Worlds are created with seeded random numbers, so two worlds created with
+    the same arguments other than tiles will always be in the same state after
+    the same sequence of calls.
+    """
+
+    def __init__(self,
+                 width,
+                 height,
+                 n,
+                 viruses=[RainbowVirus, ZebraVirus, ImmunisableVirus],
+                 tiles=(2, 2),
+                 seed=0,
+                 radius=7):
+        """Creates a new world centered on (0, 0) containing n people.
+
+        Args:
+            width (int): horizontal length of the world in pixels
+            height (int): vertical length of the world in pixels
+            n (int): number of people to add to this world
+            viruses (iterable): virus classes that will be used to infect
+                people in this world
+            tiles (tuple): number of tile columns and rows
+            seed (int): seed for every random number used by this world
+            radius (int): radius of every person in pixels
+
+        Raises:
+            ValueError: width and height must be even
+            ValueError: tiles must be at least two people wide
+            ValueError: virus can't be simulated in array form
+        """
+        if width % 2 != 0 or height % 2 != 0:
+            raise ValueError("width and height must be even")
+
+        columns, rows = tiles
+        if width / columns < radius * 4 or height / rows < radius * 4:
+            raise ValueError("tiles must be at least two people wide")
+
+        self.size = (width, height)
+        self.hours = 0
+        self.viruses = list(viruses)
+        self.rng = random.Random(seed)
+        parameters = batch_parameters(self.viruses)
+        self.config = {
+            'width': width,
+            'height': height,
+            'n': n,
+            'radius': radius,
+            'seed': seed,
+            'columns': columns,
+            'rows': rows,
+            'tile_width': width / columns,
+            'tile_height': height / rows,
+            'virus_count': len(self.viruses),
+            'durations': [p['duration'] for p in parameters],
+            'immunising': [p['immunising'] for p in parameters],
+        }
+
+        self.population = PopulationBuffer(n, len(self.viruses))
+        self.__place_people()
+
+        self.engine = None
+        self.workers = []
+        self.connections = []
+        if columns * rows == 1:
+            self.engine = TileEngine(self.config, 0, self.population)
+        else:
+            self.__start_workers()
+
+    def __place_people(self):
+        """Gives every person a random location and destination and assigns
+        them to the tile they're in.
+        """
+        pop = self.population
+        width, height = self.size
+        radius = self.config['radius']
+        seed = self.config['seed']
+        low_x, high_x = radius - width // 2, width - radius - width // 2
+        low_y, high_y = radius - height // 2, height - radius - height // 2
+        locator = TileEngine(self.config, -1, pop)
+
+        for i in range(pop.n):
+            pop.x[i] = _uniform(seed, i, 0, 0, low_x, high_x)
+            pop.y[i] = _uniform(seed, i, 0, 1, low_y, high_y)
+            pop.dest_x[i] = _uniform(seed, i, 0, 2, low_x, high_x)
+            pop.dest_y[i] = _uniform(seed, i, 0, 3, low_y, high_y)
+            column, row = locator.tile_at(pop.x[i], pop.y[i])
+            pop.owner[i] = column + row * self.config['columns']
+
+    def __start_workers(self):
+        """Starts a worker process for every tile."""
+        context = multiprocessing.get_context()
+        tile_count = self.config['columns'] * self.config['rows']
+        inboxes = [context.Queue() for _ in range(tile_count)]
+        barrier = context.Barrier(tile_count)
+
+        for tile in range(tile_count):
+            parent, child = context.Pipe()
+            worker = context.Process(target=_work,
+                                     args=(self.config, tile,
+                                           self.population.name, inboxes,
+                                           barrier, child),
+                                     daemon=True)
+            worker.start()
+            self.workers.append(worker)
+            self.connections.append(parent)
+
+        # Wait for every engine to be made before any tile starts simulating
+        for connection in self.connections:
+            connection.recv()
+
+    def simulate(self, hours=1):
+        """Simulates the given number of hours in this world."""
+        first = self.hours + 1
+        if self.engine is not None:
+            for hour in range(first, first + hours):
+                self.engine.simulate(hour)
+        else:
+            for connection in self.connections:
+                connection.send((first, hours))
+            for connection in self.connections:
+                connection.recv()
+        self.hours += hours
+
+    def infect_person(self):
+        """Infects a random person in this world with a random virus.
+
+        It is possible for the chosen person to already be infected
+        with a virus.
+        """
+        if not self.viruses:
+            return
+
+        person = self.rng.randrange(self.population.n)
+        virus = self.rng.randrange(len(self.viruses))
+        if not self.population.immune[virus][person]:
+            duration = self.config['durations'][virus]
+            self.population.remaining[virus][person] = duration
+
+    def cure_all(self):
+        """Cures all people in this world."""
+        pop = self.population
+        for v, immunising in enumerate(self.config['immunising']):
+            for i in range(pop.n):
+                if pop.remaining[v][i]:
+                    pop.remaining[v][i] = 0
+                    if immunising:
+                        pop.immune[v][i] = 1
+
+    def count_infected(self):
+        """Returns the number of infected people in this world."""
+        pop = self.population
+        return sum(
+            any(remaining[i] for remaining in pop.remaining)
+            for i in range(pop.n))
+
+    def locations(self):
+        """Returns a list of every person's (x, y) location."""
+        return list(zip(self.population.x, self.population.y))
+
+    def state(self):
+        """Returns a tuple of every person's location, destination, remaining
+        virus durations and immunities, for comparing worlds.
+        """
+        pop = self.population
+        return (pop.x.tolist(), pop.y.tolist(), pop.dest_x.tolist(),
+                pop.dest_y.tolist(), [r.tolist() for r in pop.remaining],
+                [i.tolist() for i in pop.immune])
+
+    def close(self):
+        """Stops this world's workers and releases its shared memory."""
+        for connection in self.connections:
+            connection.send(None)
+        for worker in self.workers:
+            worker.join()
+        self.connections.clear()
+        self.workers.clear()
+        self.engine = None
+        self.population.close(unlink=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,237 @@
+"""
+Records the location and viruses of every person in a World for every hour
+to a memory-mapped file.
+
+Layout of a trajectory file (native byte order):
+
+    offset  type                    contents
+    0       char[4]                 b'VTRJ'
+    4       uint32                  version
+    8       uint64                  n, number of people
+    16      uint64                  first hour recorded
+    24      uint64                  number of hours recorded
+    32      uint64                  number of hours the file has room for
+    40      uint64                  number of viruses
+    48      uint64                  length of the virus names in bytes
+    56      char[1024]              virus class names, separated by commas
+    1080    hour records            one record per hour recorded
+
+Each hour record is n (x, y) float32 pairs followed by n uint32 virus masks,
+where bit i of a mask is set if the person has the i-th virus in the names.
+Records have a fixed size, so any hour, or any person within an hour, can be
+found without reading anything else. The file starts with room for a number
+of hours and doubles in size whenever it runs out of room.
+"""
+
+import mmap
+import struct
+from array import array
+
+from virus_shared import virus_bits, virus_mask
+
+MAGIC = b'VTRJ'
+VERSION = 1
+HEADER = struct.Struct('4sI6Q')
+NAMES_SIZE = 1024
+DATA_OFFSET = HEADER.size + NAMES_SIZE
+
+
+class TrajectoryRecorder:
+    """Appends the state of a world's people to a trajectory file every
+    hour.
+    """
+
+    def __init__(self, path, world, capacity=1024):
+        """Creates a new trajectory file at the given path and records the
+        world's current hour as the first hour.
+
+        Args:
+            path (str): location of the file, replacing any existing file
+            world (World): world to record, must keep the same people for the
+                whole recording
+            capacity (int): number of hours to make room for initially
+
+        Raises:
+            ValueError: can't store more than 32 viruses in a mask
+            ValueError: virus names don't fit in the header
+        """
+        self.world = world
+        self.n = len(world.people)
+        self.bits = virus_bits(world.viruses)
+        self.record_size = self.n * (2 * 4 + 4)
+        self.first_hour = world.hours
+        self.hours = 0
+        self.capacity = max(capacity, 1)
+
+        self.names = ','.join(cls.__name__ for cls in world.viruses).encode()
+        if len(self.names) > NAMES_SIZE:
+            raise ValueError("virus names don't fit in the header")
+
+        self.file = open(path, 'w+b')
+        self.file.truncate(DATA_OFFSET + self.capacity * self.record_size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.map[HEADER.size:HEADER.size + len(self.names)] = self.names
+        self.record(world)
+
+    def attach(self):
+        """Records the world at the end of every hour from now on, using the
+        world's virus update methods.
+        """
+        self.world.on_update_methods.append(self.record)
+
+    def detach(self):
+        """Stops recording the world every hour."""
+        if self.record in self.world.on_update_methods:
+            self.world.on_update_methods.remove(self.record)
+
+    def record(self, world):
+        """Appends the current state of the given world's people.
+
+        Raises:
+            ValueError: world's number of people has changed
+        """
+        people = world.people
+        if len(people) != self.n:
+            raise ValueError("world's number of people has changed")
+
+        if self.hours == self.capacity:
+            self.__grow()
+
+        locations = array('f')
+        for person in people:
+            locations.extend(person.location)
+        masks = array('I', [virus_mask(p, self.bits) for p in people])
+
+        offset = DATA_OFFSET + self.hours * self.record_size
+        middle = offset + self.n * 2 * 4
+        self.map[offset:middle] = locations.tobytes()
+        self.map[middle:offset + self.record_size] = masks.tobytes()
+
+        self.hours += 1
+        self.__write_header()
+
+    def __grow(self):
+        """Doubles the number of hours the file has room for."""
+        self.capacity *= 2
+        self.map.close()
+        self.file.truncate(DATA_OFFSET + self.capacity * self.record_size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+
+    def __write_header(self):
+        """Writes the header for the hours recorded so far."""
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, self.n, self.first_hour,
+                         self.hours, self.capacity, len(self.bits),
+                         len(self.names))
+
+    def close(self):
+        """Stops recording and trims the file to the hours recorded."""
+        self.detach()
+        self.capacity = self.hours
+        self.__write_header()
+        self.map.close()
+        self.file.truncate(DATA_OFFSET + self.hours * self.record_size)
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TrajectoryReader:
+    """Reads any hour or person's track from a trajectory file without
+    loading the rest of the file.
+    """
+
+    def __init__(self, path):
+        """Opens the trajectory file at the given path.
+
+        Raises:
+            ValueError: not a trajectory file
+        """
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.n, self.first_hour, self.hours, _, _, \
+            names_length = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a trajectory file")
+
+        names = self.map[HEADER.size:HEADER.size + names_length]
+        self.virus_names = names.decode().split(',') if names else []
+        self.record_size = self.n * (2 * 4 + 4)
+        self.location_format = struct.Struct('2f')
+        self.mask_format = struct.Struct('I')
+
+    def __len__(self):
+        """Returns the number of hours recorded."""
+        return self.hours
+
+    def __offset(self, hour):
+        """Returns the offset of the record for the given hour.
+
+        Raises:
+            IndexError: hour wasn't recorded
+        """
+        index = hour - self.first_hour
+        if not 0 <= index < self.hours:
+            raise IndexError("hour wasn't recorded")
+        return DATA_OFFSET + index * self.record_size
+
+    def locations(self, hour):
+        """Returns a list of every person's (x, y) location at the given
+        hour.
+        """
+        offset = self.__offset(hour)
+        values = array('f')
+        values.frombytes(self.map[offset:offset + self.n * 2 * 4])
+        return list(zip(values[::2], values[1::2]))
+
+    def masks(self, hour):
+        """Returns an array of every person's virus mask at the given hour."""
+        offset = self.__offset(hour) + self.n * 2 * 4
+        values = array('I')
+        values.frombytes(self.map[offset:offset + self.n * 4])
+        return values
+
+    def person(self, hour, person):
+        """Returns a tuple of the given person's (x, y) location and virus
+        mask at the given hour.
+
+        Raises:
+            IndexError: person wasn't recorded
+            IndexError: hour wasn't recorded
+        """
+        if not 0 <= person < self.n:
+            raise IndexError("person wasn't recorded")
+
+        offset = self.__offset(hour)
+        location = self.location_format.unpack_from(self.map,
+                                                    offset + person * 2 * 4)
+        mask, = self.mask_format.unpack_from(
+            self.map, offset + self.n * 2 * 4 + person * 4)
+        return location, mask
+
+    def track(self, person, start=None, stop=None):
+        """Returns a list of the given person's ((x, y), mask) tuples for
+        each hour from start up to but not including stop, defaulting to
+        every hour recorded.
+        """
+        if not 0 <= person < self.n:
+            raise IndexError("person wasn't recorded")
+
+        start = self.first_hour if start is None else start
+        stop = self.first_hour + self.hours if stop is None else stop
+        return [self.person(hour, person) for hour in range(start, stop)]
+
+    def close(self):
+        """Closes the trajectory file."""
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()